@@ -11,12 +11,54 @@ const int LASER_PIN = 52; // EL01激光头引脚
 Servo panServo;
 Servo tiltServo;
 
-// 初始位置
-int panAngle = 135;   // 270°舵机中点 (270度舵机的中点)
-int tiltAngle = 90;   // 180°舵机中点
+// 舵机标定：角度(0.1°) 线性映射到脉宽(us)，trim 为机械零位微调(0.1°)
+// 默认值与原来 Servo.write() 的映射一致（0~180° → 544~2400us），保证原有瞄准点不变；
+// 重新标定 270° 舵机时按实测修改（例如 0~2700 → 500~2500us）
+struct ServoCalibration {
+  int minTenths;
+  int maxTenths;
+  int minUs;
+  int maxUs;
+  int trimTenths;
+};
+ServoCalibration panCal = {0, 1800, 544, 2400, 0};
+ServoCalibration tiltCal = {0, 1800, 544, 2400, 0};
+
+// 初始位置（单位 0.1°）
+int panAngle = 1350;  // 270°舵机中点 (270度舵机的中点)
+int tiltAngle = 900;  // 180°舵机中点
 bool triggerActive = false; // 触发状态
 bool systemReady = false;   // 系统就绪状态
 
+// 串口帧协议 v1（与 control/gimbal_protocol.py 一致）
+// 0xAA 0x55 | 版本 | 类型 | 序号 | 长度 | 负载 | CRC16 高 | CRC16 低
+// CRC16-CCITT(0x1021, 初值 0xFFFF) 覆盖版本到负载
+const byte SYNC1 = 0xAA;
+const byte SYNC2 = 0x55;
+const byte PROTOCOL_VERSION = 1;
+const byte HEADER_SIZE = 6;
+const byte MAX_PAYLOAD = 16;
+const byte FRAME_MAX = HEADER_SIZE + MAX_PAYLOAD + 2;
+const byte MSG_GIMBAL = 0x01;       // 角度单位 1°（旧格式，仍然兼容）
+const byte MSG_GIMBAL_FINE = 0x02;  // 角度单位 0.1°
+const byte MSG_TELEMETRY = 0x81;  // Mega → 上位机
+const bool DEBUG_ECHO = false;  // 逐帧回显会占用发送缓冲，提高发包频率时保持关闭
+
+byte rxBuf[FRAME_MAX];
+byte rxLen = 0;
+int lastSeq = -1;
+unsigned long framesOk = 0;
+unsigned long crcErrors = 0;
+unsigned long seqGaps = 0;      // 按序号推算丢失的帧数
+unsigned long droppedBytes = 0;
+
+// 遥测：每 TELEMETRY_INTERVAL 发送一帧舵机实际/目标角度、触发/激光状态和主循环耗时
+const unsigned long TELEMETRY_INTERVAL = 50;
+unsigned long lastTelemetryTime = 0;
+unsigned long lastLoopMicros = 0;
+unsigned long maxLoopMicros = 0;    // 本周期内最长的一次主循环
+byte txSeq = 0;
+
 // 通信状态
 unsigned long lastReceiveTime = 0;
 const unsigned long TIMEOUT_MS = 2000;  // 2秒超时
@@ -29,13 +71,22 @@ const unsigned long LASER_DURATION = 2000;  // 激光持续时间2秒
 int laserPower = 255;  // 激光功率 (0-255, 255为最大功率)
 
 // 平滑移动
-int targetPanAngle = 135;
-int targetTiltAngle = 90;
+int targetPanAngle = 1350;
+int targetTiltAngle = 900;
 unsigned long lastMoveTime = 0;
 const unsigned long MOVE_INTERVAL = 20;  // 20ms移动间隔，更平滑
+const int MOVE_STEP = 10;                // 每个间隔最多转 1°（10 个 0.1°）
 
 // 函数声明
+void readSerialFrames();
+void parseRxBuffer();
+void handleFrame(byte type, byte seq, const byte *payload, byte length);
+void applyGimbalCommand(int newPanAngle, int newTiltAngle, byte trigger);
+uint16_t crc16Ccitt(const byte *data, byte length);
+void sendFrame(byte type, const byte *payload, byte length);
+void sendTelemetry();
 void smoothServoMovement();
+void writeServo(Servo &servo, const ServoCalibration &cal, int tenths);
 void updateLEDStatus();
 void controlLaser();
 
@@ -43,8 +94,8 @@ void setup() {
   Serial.begin(115200);  // 设置串口波特率
   
   // 初始化舵机
-  panServo.attach(PAN_PIN);
-  tiltServo.attach(TILT_PIN);
+  panServo.attach(PAN_PIN, panCal.minUs, panCal.maxUs);
+  tiltServo.attach(TILT_PIN, tiltCal.minUs, tiltCal.maxUs);
   
   // 初始化引脚
   pinMode(TRIGGER_PIN, OUTPUT);
@@ -57,8 +108,8 @@ void setup() {
   digitalWrite(LASER_PIN, LOW); // 激光头关闭，输出低电平（继电器默认不吸合）
   
   // 舵机归中
-  panServo.write(panAngle);
-  tiltServo.write(tiltAngle);
+  writeServo(panServo, panCal, panAngle);
+  writeServo(tiltServo, tiltCal, tiltAngle);
   
   // 启动指示 - LED闪烁3次
   for(int i = 0; i < 3; i++) {
@@ -77,61 +128,8 @@ void setup() {
 }
 
 void loop() {
-  // 检查串口通信
-  if (Serial.available() >= 5) {  // 接收5字节数据
-    // 接收数据 (2字节水平 + 2字节垂直 + 1字节触发信号)
-    byte panHigh = Serial.read();
-    byte panLow = Serial.read();
-    byte tiltHigh = Serial.read();
-    byte tiltLow = Serial.read();
-    byte trigger = Serial.read();  // 触发信号
-    
-    // 组合为16位整数
-    int newPanAngle = (panHigh << 8) | panLow;
-    int newTiltAngle = (tiltHigh << 8) | tiltLow;
-    
-    // 调试信息
-    Serial.print("Received: P=");
-    Serial.print(newPanAngle);
-    Serial.print(", T=");
-    Serial.print(newTiltAngle);
-    Serial.print(", Trigger=");
-    Serial.println(trigger);
-    
-    // 限制角度范围
-    newPanAngle = constrain(newPanAngle, 0, 270);
-    newTiltAngle = constrain(newTiltAngle, 0, 180);
-    
-    // 更新目标角度（用于平滑移动）
-    targetPanAngle = newPanAngle;
-    targetTiltAngle = newTiltAngle;
-    
-    // 更新通信状态
-    lastReceiveTime = millis();
-    if (!communicationActive) {
-      communicationActive = true;
-      Serial.println("Communication established!");
-    }
-    
-    // 控制触发信号和激光
-    if (trigger == 1 && !triggerActive) {
-      digitalWrite(TRIGGER_PIN, HIGH);
-      triggerActive = true;
-      Serial.println("TRIGGER ACTIVATED!");
-    } else if (trigger == 0 && triggerActive) {
-      digitalWrite(TRIGGER_PIN, LOW);
-      triggerActive = false;
-      Serial.println("Trigger deactivated");
-    }
-    
-    // 激光手动触发（trigger值为2时）
-    if (trigger == 2 && !laserActive) {
-      laserActive = true;
-      laserStartTime = millis();
-      digitalWrite(LASER_PIN, HIGH);
-      Serial.println("Manual Laser FIRE! (2 seconds)");
-    }
-  }
+  // 检查串口通信：逐字节解析命令帧
+  readSerialFrames();
   
   // 检查通信超时 - 仅用于状态指示，不自动归中
   if (communicationActive && (millis() - lastReceiveTime > TIMEOUT_MS)) {
@@ -148,6 +146,184 @@ void loop() {
   
   // LED状态指示
   updateLEDStatus();
+  
+  // 遥测回传
+  sendTelemetry();
+}
+
+// 读取串口字节并解析，坏帧最多影响当前这一帧
+void readSerialFrames() {
+  while (Serial.available() > 0) {
+    rxBuf[rxLen++] = Serial.read();
+    parseRxBuffer();
+  }
+}
+
+// 丢弃接收缓冲前 n 个字节
+void discardRx(byte n) {
+  memmove(rxBuf, rxBuf + n, rxLen - n);
+  rxLen -= n;
+}
+
+void parseRxBuffer() {
+  while (rxLen > 0) {
+    // 寻找同步头
+    if (rxBuf[0] != SYNC1 || (rxLen >= 2 && rxBuf[1] != SYNC2)) {
+      discardRx(1);
+      droppedBytes++;
+      continue;
+    }
+    if (rxLen < HEADER_SIZE) {
+      return;
+    }
+    byte length = rxBuf[5];
+    if (rxBuf[2] != PROTOCOL_VERSION || length > MAX_PAYLOAD) {
+      // 不是有效帧头，跳过同步头继续找
+      discardRx(2);
+      droppedBytes += 2;
+      continue;
+    }
+    byte total = HEADER_SIZE + length + 2;
+    if (rxLen < total) {
+      return;
+    }
+    uint16_t crc = ((uint16_t)rxBuf[total - 2] << 8) | rxBuf[total - 1];
+    if (crc != crc16Ccitt(rxBuf + 2, total - 4)) {
+      // 校验失败只丢掉同步头，缓冲里剩下的字节可能就是下一帧的开头
+      crcErrors++;
+      discardRx(2);
+      droppedBytes += 2;
+      continue;
+    }
+    handleFrame(rxBuf[3], rxBuf[4], rxBuf + HEADER_SIZE, length);
+    discardRx(total);
+  }
+}
+
+uint16_t crc16Ccitt(const byte *data, byte length) {
+  uint16_t crc = 0xFFFF;
+  for (byte i = 0; i < length; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (byte bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+// 发送一帧；发送缓冲放不下时丢弃本帧，不阻塞主循环
+void sendFrame(byte type, const byte *payload, byte length) {
+  byte frame[FRAME_MAX];
+  byte total = HEADER_SIZE + length + 2;
+  frame[0] = SYNC1;
+  frame[1] = SYNC2;
+  frame[2] = PROTOCOL_VERSION;
+  frame[3] = type;
+  frame[4] = txSeq++;
+  frame[5] = length;
+  memcpy(frame + HEADER_SIZE, payload, length);
+  uint16_t crc = crc16Ccitt(frame + 2, length + 4);
+  frame[total - 2] = crc >> 8;
+  frame[total - 1] = crc & 0xFF;
+  if (Serial.availableForWrite() >= total) {
+    Serial.write(frame, total);
+  }
+}
+
+void putU16(byte *out, unsigned int value) {
+  out[0] = value >> 8;
+  out[1] = value & 0xFF;
+}
+
+// 遥测负载 15 字节：实际 pan/tilt、目标 pan/tilt（0.1°）、状态位、最长循环耗时(us)、CRC 错误数、丢帧数
+// 舵机没有位置反馈，实际角度为平滑移动当前写入舵机的角度
+void sendTelemetry() {
+  unsigned long now = micros();
+  if (lastLoopMicros != 0) {
+    maxLoopMicros = max(maxLoopMicros, now - lastLoopMicros);
+  }
+  lastLoopMicros = now;
+  if (millis() - lastTelemetryTime < TELEMETRY_INTERVAL) {
+    return;
+  }
+  lastTelemetryTime = millis();
+  byte payload[15];
+  putU16(payload, panAngle);
+  putU16(payload + 2, tiltAngle);
+  putU16(payload + 4, targetPanAngle);
+  putU16(payload + 6, targetTiltAngle);
+  payload[8] = (triggerActive ? 0x01 : 0) | (laserActive ? 0x02 : 0) | (communicationActive ? 0x04 : 0);
+  putU16(payload + 9, min(maxLoopMicros, 0xFFFFUL));
+  putU16(payload + 11, min(crcErrors, 0xFFFFUL));
+  putU16(payload + 13, min(seqGaps, 0xFFFFUL));
+  sendFrame(MSG_TELEMETRY, payload, sizeof(payload));
+  maxLoopMicros = 0;
+}
+
+void handleFrame(byte type, byte seq, const byte *payload, byte length) {
+  framesOk++;
+  if (lastSeq >= 0) {
+    seqGaps += (byte)(seq - lastSeq - 1);
+  }
+  lastSeq = seq;
+  
+  if ((type == MSG_GIMBAL || type == MSG_GIMBAL_FINE) && length == 5) {
+    // 负载：2字节水平 + 2字节垂直 + 1字节触发信号
+    int newPanAngle = (payload[0] << 8) | payload[1];
+    int newTiltAngle = (payload[2] << 8) | payload[3];
+    if (type == MSG_GIMBAL) {
+      newPanAngle = constrain(newPanAngle, 0, 270) * 10;
+      newTiltAngle = constrain(newTiltAngle, 0, 180) * 10;
+    }
+    applyGimbalCommand(newPanAngle, newTiltAngle, payload[4]);
+  }
+}
+
+// 角度单位 0.1°
+void applyGimbalCommand(int newPanAngle, int newTiltAngle, byte trigger) {
+  // 调试信息
+  if (DEBUG_ECHO) {
+    Serial.print("Received: P=");
+    Serial.print(newPanAngle);
+    Serial.print(", T=");
+    Serial.print(newTiltAngle);
+    Serial.print(", Trigger=");
+    Serial.println(trigger);
+  }
+  
+  // 限制角度范围
+  newPanAngle = constrain(newPanAngle, 0, 2700);
+  newTiltAngle = constrain(newTiltAngle, 0, 1800);
+  
+  // 更新目标角度（用于平滑移动）
+  targetPanAngle = newPanAngle;
+  targetTiltAngle = newTiltAngle;
+  
+  // 更新通信状态
+  lastReceiveTime = millis();
+  if (!communicationActive) {
+    communicationActive = true;
+    Serial.println("Communication established!");
+  }
+  
+  // 控制触发信号和激光
+  if (trigger == 1 && !triggerActive) {
+    digitalWrite(TRIGGER_PIN, HIGH);
+    triggerActive = true;
+    Serial.println("TRIGGER ACTIVATED!");
+  } else if (trigger == 0 && triggerActive) {
+    digitalWrite(TRIGGER_PIN, LOW);
+    triggerActive = false;
+    Serial.println("Trigger deactivated");
+  }
+  
+  // 激光手动触发（trigger值为2时）
+  if (trigger == 2 && !laserActive) {
+    laserActive = true;
+    laserStartTime = millis();
+    digitalWrite(LASER_PIN, HIGH);
+    Serial.println("Manual Laser FIRE! (2 seconds)");
+  }
 }
 
 // 平滑舵机移动函数
@@ -158,24 +334,24 @@ void smoothServoMovement() {
     // 平滑移动水平舵机
     if (panAngle != targetPanAngle) {
       int diff = targetPanAngle - panAngle;
-      if (abs(diff) <= 1) {
+      if (abs(diff) <= MOVE_STEP) {
         panAngle = targetPanAngle;
       } else {
-        panAngle += (diff > 0) ? 1 : -1;
+        panAngle += (diff > 0) ? MOVE_STEP : -MOVE_STEP;
       }
-      panServo.write(panAngle);
+      writeServo(panServo, panCal, panAngle);
       moved = true;
     }
     
     // 平滑移动垂直舵机
     if (tiltAngle != targetTiltAngle) {
       int diff = targetTiltAngle - tiltAngle;
-      if (abs(diff) <= 1) {
+      if (abs(diff) <= MOVE_STEP) {
         tiltAngle = targetTiltAngle;
       } else {
-        tiltAngle += (diff > 0) ? 1 : -1;
+        tiltAngle += (diff > 0) ? MOVE_STEP : -MOVE_STEP;
       }
-      tiltServo.write(tiltAngle);
+      writeServo(tiltServo, tiltCal, tiltAngle);
       moved = true;
     }
     
@@ -183,6 +359,13 @@ void smoothServoMovement() {
   }
 }
 
+// 按标定把 0.1° 角度换算成脉宽输出，超出标定范围的角度按端点脉宽输出
+void writeServo(Servo &servo, const ServoCalibration &cal, int tenths) {
+  long angle = constrain((long)tenths + cal.trimTenths, (long)cal.minTenths, (long)cal.maxTenths);
+  long us = map(angle, cal.minTenths, cal.maxTenths, cal.minUs, cal.maxUs);
+  servo.writeMicroseconds((int)us);
+}
+
 // LED状态指示函数
 void updateLEDStatus() {
   static unsigned long ledBlinkTime = 0;
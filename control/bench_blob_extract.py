@@ -0,0 +1,136 @@
+"""
+色块提取基准测试
+
+在录制的画面上比较 findContours 轮廓路径和 connectedComponentsWithStats
+连通域路径的耗时与结果差异，用来为当前平台选择 RedTargetDetector.blob_extractor；
+同时比较 HSV 阈值和各量化位数的颜色查表掩膜路径，查表只在更快时才值得开启。
+
+用法：
+    python bench_blob_extract.py 录像.mp4
+    python bench_blob_extract.py 图片目录/ --repeat 5 --lut 5
+"""
+
+import argparse
+import os
+import time
+
+import cv2
+import numpy as np
+
+from red_detector import RedTargetDetector
+
+LOWER_RED1 = np.array([0, 120, 120])
+UPPER_RED1 = np.array([10, 255, 255])
+LOWER_RED2 = np.array([160, 120, 120])
+UPPER_RED2 = np.array([180, 255, 255])
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_frames(path, limit):
+    """读取录像文件或图片目录中的帧"""
+    frames = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(IMAGE_EXTS):
+                image = cv2.imread(os.path.join(path, name))
+                if image is not None:
+                    frames.append(image)
+            if len(frames) >= limit:
+                break
+    else:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    return frames
+
+
+def time_extractor(detector, masks, name, repeat, limit):
+    detector.blob_extractor = name
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [detector.extract_blobs(m, detector.min_area, limit) for m in masks]
+    elapsed = (time.perf_counter() - start) / (repeat * len(masks))
+    return elapsed, results
+
+
+LUT_BITS = (8, 6, 5, 4)
+
+
+def time_masks(detector, frames, lut, repeat, bits=8):
+    detector.enable_lut(lut, bits)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        masks = [detector.build_mask(f) for f in frames]
+    elapsed = (time.perf_counter() - start) / (repeat * len(frames))
+    return elapsed, masks
+
+
+def compare(contour_results, component_results):
+    """统计最大色块的检出一致率和中心/半径偏差"""
+    agree = 0
+    offsets = []
+    radius_diffs = []
+    for a, b in zip(contour_results, component_results):
+        if bool(a) != bool(b):
+            continue
+        agree += 1
+        if a:
+            offsets.append(np.hypot(a[0][0] - b[0][0], a[0][1] - b[0][1]))
+            radius_diffs.append(abs(a[0][2] - b[0][2]))
+    return agree, offsets, radius_diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较轮廓与连通域两种色块提取方式")
+    parser.add_argument("source", help="录像文件或图片目录")
+    parser.add_argument("--frames", type=int, default=300, help="最多读取帧数")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式重复次数")
+    parser.add_argument("--candidates", type=int, default=1, help="每帧提取的色块数（1 为单目标）")
+    parser.add_argument("--lut", type=int, choices=LUT_BITS, help="用该量化位数的颜色查表掩膜比较色块提取")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.frames)
+    if not frames:
+        print(f"没有读到画面: {args.source}")
+        return
+    detector = RedTargetDetector(LOWER_RED1, UPPER_RED1, LOWER_RED2, UPPER_RED2)
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} 帧 {w}x{h}，OpenCV {cv2.__version__}，线程数 {cv2.getNumThreads()}")
+
+    hsv_time, hsv_masks = time_masks(detector, frames, False, args.repeat)
+    print(f"掩膜 HSV:           {hsv_time * 1000:.3f} ms/帧")
+    masks = hsv_masks
+    best = None
+    for bits in LUT_BITS:
+        lut_time, lut_masks = time_masks(detector, frames, True, args.repeat, bits)
+        mismatch = sum(int(np.count_nonzero(a != b)) for a, b in zip(hsv_masks, lut_masks))
+        print(f"掩膜 查表 {bits} 位:     {lut_time * 1000:.3f} ms/帧（不一致像素 {mismatch}）")
+        if lut_time < hsv_time and (best is None or lut_time < best[1]):
+            best = (bits, lut_time)
+        if bits == args.lut:
+            masks = lut_masks
+    detector.enable_lut(False)
+    print("建议 颜色查表关闭" if best is None else f"建议 颜色查表开启，bits={best[0]}")
+
+    contour_time, contour_results = time_extractor(detector, masks, "contour", args.repeat, args.candidates)
+    component_time, component_results = time_extractor(detector, masks, "components", args.repeat, args.candidates)
+    print(f"轮廓 contour:       {contour_time * 1000:.3f} ms/帧")
+    print(f"连通域 components:  {component_time * 1000:.3f} ms/帧")
+
+    agree, offsets, radius_diffs = compare(contour_results, component_results)
+    print(f"检出一致: {agree}/{len(masks)} 帧")
+    if offsets:
+        print(f"中心偏差: 平均 {np.mean(offsets):.2f}px 最大 {np.max(offsets):.2f}px；"
+              f"半径偏差: 平均 {np.mean(radius_diffs):.2f}px")
+    faster = "components" if component_time < contour_time else "contour"
+    print(f"建议 blob_extractor = \"{faster}\"")
+
+
+if __name__ == "__main__":
+    main()
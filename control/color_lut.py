@@ -0,0 +1,131 @@
+"""
+BGR→掩膜查表分类器
+
+把两段红色 HSV 阈值预先烘焙成一张覆盖全部 BGR 颜色的查表，
+检测时一次向量化查表即可得到二值掩膜，代替每帧的 cvtColor(BGR2HSV)、
+两次 inRange 和 bitwise_or。建表按 bits 量化（每个量化格取格中心颜色判定），
+结果以阈值为键缓存到磁盘，下次启动直接加载；缓存读不出来时重新建表，
+写不进去时只跳过缓存，原因记在 cache_error 里。
+
+查表下标为 (r>>s)<<16 | (g>>s)<<8 | (b>>s)（s = 8 - bits），每个通道留在自己的字节里，
+从 BGRA 的 uint32 视图只需一次移位和一次与运算。bits=8 时为完整的 16MB 表，
+按像素随机访问缓存命中差；bits=5 时表为 2MB，实际访问到的只有约 64KB，
+代价是阈值边界附近的颜色按量化格判定。默认不启用，
+bench_blob_extract.py 比较各条掩膜路径的耗时和不一致像素，只在实测更快的平台上开启。
+"""
+
+import hashlib
+import os
+
+import cv2
+import numpy as np
+
+LUT_VERSION = 1
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "bjg_lut")
+
+
+class ColorLUT:
+    """BGR 颜色查表（每个量化格一项，0 或 255）"""
+    def __init__(self, hsv_ranges, bits=8, cache_dir=CACHE_DIR):
+        self.bits = bits
+        self.cache_dir = cache_dir
+        self.hsv_ranges = None
+        self.table = None
+        self.loaded_from_cache = False
+        self.cache_error = None         # 最近一次读写缓存失败的原因
+        self.set_ranges(hsv_ranges)
+
+    def set_ranges(self, hsv_ranges):
+        """hsv_ranges: [(lower, upper), ...]，阈值不变时不重建"""
+        ranges = tuple((tuple(int(v) for v in lo), tuple(int(v) for v in hi)) for lo, hi in hsv_ranges)
+        if ranges == self.hsv_ranges and self.table is not None:
+            return
+        self.hsv_ranges = ranges
+        small = self._load_cache()
+        self.loaded_from_cache = small is not None
+        if small is None:
+            small = self._build_small()
+            self._save_cache(small)
+        self.table = self._expand(small)
+
+    def apply(self, bgr):
+        """返回与 bgr 同尺寸的单通道掩膜"""
+        bgra = cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA)
+        # 小端下 uint32 = B | G<<8 | R<<16 | A<<24，每个字节右移 s 位并去掉 A 即为查表下标
+        idx = bgra.view(np.uint32)[..., 0]
+        q = 8 - self.bits
+        if q:
+            idx >>= q
+        idx &= self._lane_mask()
+        return np.take(self.table, idx)
+
+    def _lane_mask(self):
+        return ((1 << self.bits) - 1) * 0x010101
+
+    def _build_small(self):
+        """在 2^(3*bits) 个量化格中心上按 HSV 阈值判定"""
+        q = 8 - self.bits
+        m = (1 << self.bits) - 1
+        half = (1 << q) >> 1
+        # 下标顺序 r<<2bits | g<<bits | b，与 _expand 一致
+        c = np.arange(1 << (3 * self.bits), dtype=np.uint32)
+        colors = np.empty((c.size, 1, 3), np.uint8)
+        colors[:, 0, 0] = ((c & m) << q) + half
+        colors[:, 0, 1] = (((c >> self.bits) & m) << q) + half
+        colors[:, 0, 2] = ((c >> (2 * self.bits)) << q) + half
+        hsv = cv2.cvtColor(colors, cv2.COLOR_BGR2HSV)
+        mask = np.zeros(hsv.shape[:2], np.uint8)
+        for lower, upper in self.hsv_ranges:
+            mask |= cv2.inRange(hsv, np.array(lower), np.array(upper))
+        return mask.reshape(-1)
+
+    def _expand(self, small):
+        """紧凑表（r<<2bits | g<<bits | b）→ apply 使用的按字节分通道的表"""
+        if self.bits == 8:
+            return small
+        m = (1 << self.bits) - 1
+        c = np.arange(self._lane_mask() + 1, dtype=np.uint32)
+        b = c & 0xFF
+        g = (c >> 8) & 0xFF
+        r = c >> 16
+        table = np.zeros(c.size, np.uint8)
+        # 字节内超出 bits 位的下标 apply 不会用到，保持为 0
+        valid = (b <= m) & (g <= m)
+        table[valid] = small[(r[valid] << (2 * self.bits)) | (g[valid] << self.bits) | b[valid]]
+        return table
+
+    def _cache_path(self):
+        key = repr((LUT_VERSION, self.bits, self.hsv_ranges)).encode("utf-8")
+        return os.path.join(self.cache_dir, f"redlut_{hashlib.sha1(key).hexdigest()[:16]}.npy")
+
+    def _load_cache(self):
+        if not self.cache_dir:
+            return None
+        path = self._cache_path()
+        if not os.path.exists(path):
+            return None
+        try:
+            packed = np.load(path)
+        except (OSError, ValueError, EOFError) as e:
+            # 截断或损坏的缓存当作没有缓存，重建后覆盖
+            self.cache_error = f"读取缓存失败: {e}"
+            return None
+        small = np.unpackbits(packed) * np.uint8(255)
+        if small.size != 1 << (3 * self.bits):
+            self.cache_error = f"缓存大小不符: {path}"
+            return None
+        return small
+
+    def _save_cache(self, small):
+        if not self.cache_dir:
+            return
+        path = self._cache_path()
+        tmp = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 先写临时文件再替换，中途退出不会留下半个缓存
+            with open(tmp, "wb") as f:
+                np.save(f, np.packbits(small > 0))
+            os.replace(tmp, path)
+        except OSError as e:
+            self.cache_error = f"写入缓存失败: {e}"
@@ -0,0 +1,81 @@
+"""
+检测调试视图
+
+调 HSV 阈值时需要看到二值掩膜、追踪窗口和所有候选轮廓。这些中间结果只在选中调试视图时、
+并且只在真正要显示的帧上按当前检测器参数重新计算（显示帧率而不是追踪帧率），
+关闭时追踪线程不做任何额外计算，也不保留中间图像。
+
+视图：
+    off         原始画面
+    mask        二值掩膜（与检测器同一套阈值/查表/形态学）
+    roi         画面 + 最近一次搜索区域
+    candidates  画面 + 所有轮廓，通过面积/半径门限的为绿色，未通过的为灰色
+"""
+
+import cv2
+
+DEBUG_VIEWS = ("off", "mask", "roi", "candidates")
+
+ROI_COLOR = (255, 128, 0)
+PASS_COLOR = (0, 255, 0)
+REJECT_COLOR = (128, 128, 128)
+
+
+class DebugView:
+    """按需生成检测中间结果的调试画面"""
+    def __init__(self, detector):
+        self.detector = detector
+        self.mode = "off"
+        self.rendered = 0
+
+    @property
+    def active(self):
+        return self.mode != "off"
+
+    def set_mode(self, mode):
+        if mode not in DEBUG_VIEWS:
+            raise ValueError(f"未知调试视图: {mode}")
+        self.mode = mode
+
+    def render(self, frame):
+        """返回新的调试画面（不修改 frame），未启用时原样返回 frame"""
+        mode = self.mode
+        if mode == "off":
+            return frame
+        self.rendered += 1
+        if mode == "mask":
+            view = cv2.cvtColor(self.detector.build_mask(frame), cv2.COLOR_GRAY2BGR)
+            self._draw_roi(view)
+        elif mode == "roi":
+            view = frame.copy()
+            self._draw_roi(view)
+        else:
+            view = frame.copy()
+            self._draw_candidates(view, frame)
+        return view
+
+    def _draw_roi(self, view):
+        # last_roi 由追踪线程更新；多进程模式下检测在子进程中，界面进程没有搜索区域
+        roi = self.detector.last_roi
+        if roi is None:
+            cv2.putText(view, "ROI: n/a", (10, view.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, ROI_COLOR, 1)
+            return
+        x0, y0, x1, y1 = roi
+        cv2.rectangle(view, (x0, y0), (x1 - 1, y1 - 1), ROI_COLOR, 2)
+        cv2.putText(view, f"ROI {x1 - x0}x{y1 - y0}", (x0 + 4, max(14, y0 - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, ROI_COLOR, 1)
+
+    def _draw_candidates(self, view, frame):
+        detector = self.detector
+        contours, _ = cv2.findContours(detector.build_mask(frame), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        passed = 0
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            (x, y), radius = cv2.minEnclosingCircle(contour)
+            ok = area > detector.min_area and radius > detector.min_radius
+            color = PASS_COLOR if ok else REJECT_COLOR
+            passed += ok
+            cv2.drawContours(view, [contour], -1, color, 1)
+            if ok or area > detector.min_area / 4:
+                cv2.putText(view, f"{area:.0f}", (int(x + radius) + 2, int(y)), cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
+        cv2.putText(view, f"Contours: {len(contours)}  Pass: {passed}", (10, view.shape[0] - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, PASS_COLOR, 1)
@@ -0,0 +1,108 @@
+"""
+摄像头最新帧采集
+
+采集线程持续从驱动读取图像，只在单槽缓冲中保留最新一帧（带时间戳和序号），
+追踪和显示各自按需取最新帧，避免V4L2队列积压导致处理的是几帧之前的画面。
+"""
+
+import threading
+import time
+
+
+class FrameSlot:
+    """单槽最新帧缓冲（新帧直接覆盖旧帧）"""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._stamp = 0.0
+        self._seq = 0
+        self._taken_seq = 0
+        self.overwritten = 0  # 未被取走就被覆盖的帧数
+
+    def put(self, frame, stamp=None):
+        if stamp is None:
+            stamp = time.monotonic()
+        with self._cond:
+            if self._frame is not None and self._seq != self._taken_seq:
+                self.overwritten += 1
+            self._frame = frame
+            self._stamp = stamp
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, after_seq=None, timeout=None):
+        """取最新帧，返回 (seq, stamp, frame)；无帧时返回 (0, 0.0, None)
+
+        给定 after_seq 时，最多等待 timeout 秒直到出现比它更新的帧；
+        超时仍无新帧则返回当前帧，调用方可通过 seq 是否变化判断。
+        """
+        with self._cond:
+            if after_seq is not None and self._seq == after_seq:
+                self._cond.wait_for(lambda: self._seq != after_seq, timeout)
+            self._taken_seq = self._seq
+            return self._seq, self._stamp, self._frame
+
+    def clear(self):
+        with self._cond:
+            self._frame = None
+            self._cond.notify_all()
+
+
+class LatestFrameCapture:
+    """后台采集线程：不断排空驱动缓冲，把最新帧写入 FrameSlot"""
+    def __init__(self, cap):
+        self.cap = cap
+        self.slot = FrameSlot()
+        self.running = False
+        self.read_count = 0
+        self.fail_count = 0
+        self._thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def read(self, after_seq=None, timeout=0.1):
+        return self.slot.get(after_seq, timeout)
+
+    def _capture_loop(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            stamp = time.monotonic()
+            if not ret:
+                self.fail_count += 1
+                time.sleep(0.01)
+                continue
+            self.read_count += 1
+            self.slot.put(frame, stamp)
+
+
+class AgeMeter:
+    """帧龄统计（指数滑动平均，单位毫秒）"""
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.avg_ms = None
+        self.last_ms = None
+
+    def add(self, stamp, now=None):
+        if now is None:
+            now = time.monotonic()
+        age_ms = (now - stamp) * 1000.0
+        self.last_ms = age_ms
+        if self.avg_ms is None:
+            self.avg_ms = age_ms
+        else:
+            self.avg_ms += self.alpha * (age_ms - self.avg_ms)
+        return age_ms
+
+    def text(self):
+        return "--" if self.avg_ms is None else f"{self.avg_ms:.0f}ms"
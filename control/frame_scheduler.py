@@ -0,0 +1,159 @@
+"""
+自适应跳帧调度
+
+测量追踪和显示两个阶段的单帧耗时（指数滑动平均），据此决定每一帧是否追踪、是否显示：
+负载过高时先降低显示帧率，显示已降到下限仍然超出控制延迟预算时，再降低追踪帧率；
+负载回落后按相反顺序恢复（先恢复追踪，再恢复显示）。所有决策都计入计数器，方便在状态栏观察。
+
+追踪和预览显示的目标帧率分别配置（set_rates）：追踪默认跟随相机帧率，预览默认 15fps，
+自适应调整只会在目标帧率基础上降低、恢复时回到目标帧率，两者互不影响。
+"""
+
+import threading
+import time
+
+
+class FrameScheduler:
+    """追踪/显示跳帧调度器"""
+    def __init__(self, frame_period=1 / 30.0, latency_budget=0.080, display_fps=15.0, track_fps=0,
+                 min_display_fps=5.0, min_track_fps=10.0, alpha=0.2):
+        self.frame_period = frame_period        # 摄像头帧间隔(s)
+        self.latency_budget = latency_budget    # 控制延迟预算：帧龄 + 追踪耗时(s)
+        self.min_display_fps = min_display_fps
+        self.min_track_fps = min_track_fps
+        self.alpha = alpha
+        self.step = 1.25                # 每次调整间隔的倍数
+        self.adapt_period = 0.5         # 两次调整之间的最短时间(s)，避免来回振荡
+        self.high_load = 0.9            # CPU 占用(追踪+显示耗时/时间)超过此值视为过载
+        self.low_load = 0.6             # 低于此值且延迟有余量时恢复
+        self._lock = threading.Lock()
+        self.base_display_interval = frame_period   # 目标显示间隔(s)
+        self.base_track_interval = 0.0              # 目标追踪间隔(s)，0 表示每帧都追踪
+        self.reset()
+        self.set_rates(display_fps, track_fps)
+
+    def set_rates(self, display_fps=None, track_fps=None):
+        """设置预览显示和追踪的目标帧率，track_fps 为 0 表示每个相机帧都追踪"""
+        with self._lock:
+            if display_fps is not None:
+                self.base_display_interval = max(self.frame_period, 1.0 / display_fps)
+                self.max_display_interval = max(self.base_display_interval, 1.0 / self.min_display_fps)
+                self.display_interval = self.base_display_interval
+            if track_fps is not None:
+                self.base_track_interval = 1.0 / track_fps if track_fps > 0 else 0.0
+                self.max_track_interval = max(self.base_track_interval, 1.0 / self.min_track_fps)
+                self.track_interval = self.base_track_interval
+
+    def reset(self):
+        with self._lock:
+            self.track_cost = 0.0           # 追踪单帧耗时(s)
+            self.display_cost = 0.0         # 显示单帧耗时(s)
+            self.track_latency = 0.0        # 帧龄 + 追踪耗时(s)
+            self.display_interval = self.base_display_interval
+            self.track_interval = self.base_track_interval
+            self._last_track = 0.0
+            self._last_display = 0.0
+            self._last_adapt = 0.0
+            self.counters = {
+                "tracked": 0,           # 追踪的帧
+                "track_skipped": 0,     # 按追踪帧率跳过的帧
+                "displayed": 0,         # 显示的帧
+                "display_skipped": 0,   # 按显示帧率跳过的帧
+                "display_throttle": 0,  # 降低显示帧率的次数
+                "track_throttle": 0,    # 降低追踪帧率的次数
+                "recover": 0,           # 恢复帧率的次数
+            }
+
+    def should_track(self, now=None):
+        """新帧到达时调用，返回本帧是否追踪"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            # 留 10% 余量，避免采集抖动使本应处理的帧被丢掉
+            if self.track_interval and now - self._last_track < self.track_interval * 0.9:
+                self.counters["track_skipped"] += 1
+                return False
+            self._last_track = now
+            self.counters["tracked"] += 1
+            return True
+
+    def should_display(self, now=None):
+        """新帧到达显示循环时调用，返回本帧是否显示"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            # 留 10% 余量，避免采集抖动使本应显示的帧被丢掉
+            if now - self._last_display < self.display_interval * 0.9:
+                self.counters["display_skipped"] += 1
+                return False
+            self._last_display = now
+            self.counters["displayed"] += 1
+            return True
+
+    def track_done(self, stamp, start, end=None):
+        """一帧追踪结束：stamp 为采集时间，start/end 为处理起止时间"""
+        if end is None:
+            end = time.monotonic()
+        with self._lock:
+            self.track_cost = self._ema(self.track_cost, end - start)
+            self.track_latency = self._ema(self.track_latency, end - stamp)
+            self._adapt(end)
+
+    def display_done(self, start, end=None):
+        if end is None:
+            end = time.monotonic()
+        with self._lock:
+            self.display_cost = self._ema(self.display_cost, end - start)
+            self._adapt(end)
+
+    def _ema(self, avg, value):
+        if avg == 0.0:
+            return value
+        return avg + self.alpha * (value - avg)
+
+    def load(self):
+        """追踪和显示占用的时间比例"""
+        track_rate = 1.0 / max(self.frame_period, self.track_interval)
+        return self.track_cost * track_rate + self.display_cost / self.display_interval
+
+    def _adapt(self, now):
+        if now - self._last_adapt < self.adapt_period:
+            return
+        self._last_adapt = now
+        load = self.load()
+        if load > self.high_load or self.track_latency > self.latency_budget:
+            # 先丢显示帧，显示已到下限再降追踪帧率
+            if self.display_interval < self.max_display_interval:
+                self.display_interval = min(self.max_display_interval, self.display_interval * self.step)
+                self.counters["display_throttle"] += 1
+            elif self.track_interval < self.max_track_interval:
+                self.track_interval = min(self.max_track_interval,
+                                          max(self.frame_period, self.track_interval) * self.step)
+                self.counters["track_throttle"] += 1
+        elif load < self.low_load and self.track_latency < self.latency_budget * 0.7:
+            # 按相反顺序恢复：先恢复追踪，再恢复显示，都只恢复到目标帧率
+            if self.track_interval > self.base_track_interval:
+                self.track_interval = max(self.base_track_interval, self.track_interval / self.step)
+                if self.track_interval <= max(self.base_track_interval, self.frame_period * 1.05):
+                    self.track_interval = self.base_track_interval
+                self.counters["recover"] += 1
+            elif self.display_interval > self.base_display_interval:
+                self.display_interval = max(self.base_display_interval, self.display_interval / self.step)
+                self.counters["recover"] += 1
+
+    def snapshot(self):
+        """返回计数器和当前决策的副本"""
+        with self._lock:
+            data = dict(self.counters)
+            data["display_fps"] = 1.0 / self.display_interval
+            data["track_fps"] = 1.0 / max(self.frame_period, self.track_interval)
+            data["track_ms"] = self.track_cost * 1000.0
+            data["display_ms"] = self.display_cost * 1000.0
+            data["latency_ms"] = self.track_latency * 1000.0
+            return data
+
+    def text(self):
+        s = self.snapshot()
+        return (f"调度: 显示 {s['display_fps']:.0f}fps/{s['display_ms']:.0f}ms "
+                f"追踪 {s['track_fps']:.0f}fps/{s['track_ms']:.0f}ms "
+                f"丢帧 显示 {s['display_skipped']} 追踪 {s['track_skipped']}")
@@ -0,0 +1,88 @@
+"""
+云台命令输出级
+
+云台串口会被多处写入：摇杆控制循环每 50ms 一次、追踪每帧一次，以及 Tk 线程里的
+激光/归中按钮，其中大部分是重复的相同角度。每个串口一个输出级，只保存最新的期望状态
+(pan, tilt, trigger)，作为 SerialTransport 的最新值通道：状态变化时立即发送，
+状态不变时只按保活周期重发，被跳过的重复命令和未发出就被新命令覆盖的命令都计数。
+
+激光（TRIGGER_LASER）是一次性动作，不参与合并，直接走传输的高优先级通道。
+"""
+
+import threading
+import time
+
+from gimbal_protocol import GimbalEncoder, TRIGGER_LASER, ANGLE_SCALE, angle_units
+
+
+class GimbalOutput:
+    """单个云台串口的最新值输出级"""
+    def __init__(self, transport, keepalive=0.5):
+        self.transport = transport
+        self.keepalive = keepalive      # 状态不变时的重发间隔(s)
+        self.encoder = GimbalEncoder()
+        self._lock = threading.Lock()
+        self._pending = None            # (最新的期望状态, 提交时间)
+        self._last_sent = None
+        self._last_time = 0.0
+        self.counters = {
+            "submitted": 0,     # 提交的命令
+            "sent": 0,          # 经最新值通道发出的帧
+            "keepalive": 0,     # 其中的保活重发
+            "suppressed": 0,    # 与上次发出的状态相同而跳过
+            "coalesced": 0,     # 发出前被更新的命令覆盖
+        }
+        # 帧在写线程里编码，序号与实际发送顺序一致；同一串口上的原始字节命令不经过编码器
+        transport.framer = lambda state: self.encoder.encode(*state)
+        transport.set_source(self)
+
+    def set(self, pan, tilt, trigger=0):
+        """任意线程调用：提交期望状态，立即返回"""
+        # 按帧内的 0.1° 精度比较
+        state = (angle_units(pan) / ANGLE_SCALE, angle_units(tilt) / ANGLE_SCALE, trigger)
+        with self._lock:
+            self.counters["submitted"] += 1
+            if trigger != TRIGGER_LASER:
+                if self._pending is not None:
+                    self.counters["coalesced"] += 1
+                if state == self._last_sent:
+                    # 与已发出的状态相同，连同被覆盖的旧命令一起不发
+                    self._pending = None
+                    self.counters["suppressed"] += 1
+                    return
+                self._pending = (state, time.monotonic())
+        if trigger == TRIGGER_LASER:
+            self.transport.send_urgent(state, frame=True)
+        else:
+            self.transport.wake()
+
+    def poll(self, now):
+        """写线程调用：返回待发送的 (状态, 提交时间)，没有需要发送的返回 None"""
+        with self._lock:
+            if self._pending is not None:
+                entry, self._pending = self._pending, None
+            elif self._last_sent is not None and now - self._last_time >= self.keepalive:
+                entry = (self._last_sent, now)
+                self.counters["keepalive"] += 1
+            else:
+                return None
+            self._last_sent = entry[0]
+            self._last_time = now
+            self.counters["sent"] += 1
+            return entry
+
+    def wait_time(self, now):
+        with self._lock:
+            if self._pending is not None:
+                return 0.0
+            if self._last_sent is None:
+                return None
+            return max(0.0, self.keepalive - (now - self._last_time))
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def text(self):
+        s = self.snapshot()
+        return f"云台: 发送 {s['sent']} 抑制 {s['suppressed']} 合并 {s['coalesced']}"
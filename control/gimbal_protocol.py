@@ -0,0 +1,158 @@
+"""
+云台串口协议
+
+上位机 → Mega 的命令按帧发送（v1）：
+
+    0xAA 0x55 | 版本 | 类型 | 序号 | 长度 | 负载(长度字节) | CRC16 高 | CRC16 低
+
+CRC16 为 CCITT-FALSE（多项式 0x1021，初值 0xFFFF），覆盖版本到负载的所有字节。
+接收端逐字节解析，校验失败时从坏帧同步头之后的缓冲字节里重新寻找同步头，
+丢字节/多字节最多影响当前这一帧，不会让后面的帧整体错位。
+
+MSG_GIMBAL_FINE 负载 5 字节：pan 高字节、pan 低字节、tilt 高字节、tilt 低字节、trigger，
+角度单位 0.1°；MSG_GIMBAL 为同样布局的旧格式（单位 1°），Mega 仍然兼容。
+trigger: 0 无动作，1 触发信号保持，2 手动激光发射（持续 2 秒）。
+
+Mega → 上位机每 50ms 一帧 MSG_TELEMETRY，负载 15 字节（大端）：实际 pan/tilt、目标 pan/tilt（0.1°）、
+状态位（bit0 触发，bit1 激光，bit2 通信正常）、最长主循环耗时(us)、CRC 错误数、丢帧数。
+Mega 的文本状态行夹在帧之间，解析时按非帧字节跳过。
+"""
+
+import struct
+from collections import namedtuple
+
+SYNC1 = 0xAA
+SYNC2 = 0x55
+PROTOCOL_VERSION = 1
+HEADER_SIZE = 6                 # 同步头 2 + 版本 + 类型 + 序号 + 长度
+CRC_SIZE = 2
+MAX_PAYLOAD = 16
+
+MSG_GIMBAL = 0x01
+MSG_GIMBAL_FINE = 0x02
+MSG_TELEMETRY = 0x81
+
+# stamp 为上位机收到该帧的时间(time.monotonic)
+Telemetry = namedtuple("Telemetry", [
+    "stamp", "pan", "tilt", "target_pan", "target_tilt",
+    "trigger", "laser", "link", "loop_us", "crc_errors", "seq_gaps",
+])
+_TELEMETRY = struct.Struct(">HHHHBHHH")
+
+ANGLE_SCALE = 10                # 帧内角度单位：0.1°
+
+TRIGGER_NONE = 0
+TRIGGER_FIRE = 1
+TRIGGER_LASER = 2
+
+PAN_MIN, PAN_MAX = 0, 270
+TILT_MIN, TILT_MAX = 0, 180
+PAN_CENTER, TILT_CENTER = 135, 90
+
+
+def clamp_angles(pan, tilt):
+    return max(PAN_MIN, min(PAN_MAX, pan)), max(TILT_MIN, min(TILT_MAX, tilt))
+
+
+def angle_units(angle):
+    """角度(°) → 帧内单位，四舍五入到 0.1°"""
+    return int(round(angle * ANGLE_SCALE))
+
+
+def crc16_ccitt(data, crc=0xFFFF):
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+    return crc
+
+
+def encode_frame(msg_type, payload, seq=0):
+    """把负载打包成一帧"""
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"负载过长: {len(payload)}")
+    body = bytes([PROTOCOL_VERSION, msg_type, seq & 0xFF, len(payload)]) + bytes(payload)
+    crc = crc16_ccitt(body)
+    return bytes([SYNC1, SYNC2]) + body + bytes([crc >> 8, crc & 0xFF])
+
+
+def encode_gimbal(pan, tilt, trigger=TRIGGER_NONE, seq=0):
+    """编码一条云台命令，角度精度 0.1°"""
+    pan_int = angle_units(pan) & 0xFFFF
+    tilt_int = angle_units(tilt) & 0xFFFF
+    payload = bytes([
+        (pan_int >> 8) & 0xFF,
+        pan_int & 0xFF,
+        (tilt_int >> 8) & 0xFF,
+        tilt_int & 0xFF,
+        trigger
+    ])
+    return encode_frame(MSG_GIMBAL_FINE, payload, seq)
+
+
+def decode_telemetry(payload, stamp):
+    """解析 MSG_TELEMETRY 负载，长度不对时返回 None"""
+    if len(payload) != _TELEMETRY.size:
+        return None
+    pan, tilt, target_pan, target_tilt, flags, loop_us, crc_errors, seq_gaps = _TELEMETRY.unpack(payload)
+    return Telemetry(stamp, pan / ANGLE_SCALE, tilt / ANGLE_SCALE,
+                     target_pan / ANGLE_SCALE, target_tilt / ANGLE_SCALE,
+                     bool(flags & 0x01), bool(flags & 0x02), bool(flags & 0x04), loop_us, crc_errors, seq_gaps)
+
+
+class GimbalEncoder:
+    """每个串口一个，自动递增帧序号"""
+    def __init__(self):
+        self.seq = 0
+
+    def encode(self, pan, tilt, trigger=TRIGGER_NONE):
+        data = encode_gimbal(pan, tilt, trigger, self.seq)
+        self.seq = (self.seq + 1) & 0xFF
+        return data
+
+
+class FrameParser:
+    """逐字节解析帧，与 Mega 端的解析逻辑一致（用于回读和测试）"""
+    def __init__(self):
+        self.buf = bytearray()
+        self.crc_errors = 0
+        self.dropped_bytes = 0
+
+    def feed(self, data):
+        """输入收到的字节，返回解析出的 [(类型, 序号, 负载), ...]"""
+        self.buf.extend(data)
+        frames = []
+        buf = self.buf
+        while True:
+            start = buf.find(bytes([SYNC1, SYNC2]))
+            if start < 0:
+                # 保留末尾可能是同步头前半个的字节
+                keep = 1 if buf[-1:] == bytes([SYNC1]) else 0
+                self.dropped_bytes += len(buf) - keep
+                del buf[:len(buf) - keep]
+                break
+            if start:
+                self.dropped_bytes += start
+                del buf[:start]
+            if len(buf) < HEADER_SIZE:
+                break
+            version, msg_type, seq, length = buf[2], buf[3], buf[4], buf[5]
+            if version != PROTOCOL_VERSION or length > MAX_PAYLOAD:
+                # 不是有效帧头，跳过这个同步头继续找
+                self.dropped_bytes += 2
+                del buf[:2]
+                continue
+            total = HEADER_SIZE + length + CRC_SIZE
+            if len(buf) < total:
+                break
+            crc = (buf[total - 2] << 8) | buf[total - 1]
+            if crc != crc16_ccitt(buf[2:total - 2]):
+                # 校验失败只丢掉同步头，后面的字节里可能就是下一帧的开头
+                self.crc_errors += 1
+                self.dropped_bytes += 2
+                del buf[:2]
+                continue
+            frames.append((msg_type, seq, bytes(buf[HEADER_SIZE:total - 2])))
+            del buf[:total]
+        return frames
@@ -0,0 +1,78 @@
+"""
+云台遥测读取
+
+Mega 每 50ms 回传一帧 MSG_TELEMETRY（舵机实际/目标角度、触发/激光状态、主循环耗时、
+收包错误计数）。读取线程持续排空云台串口（否则 Mega 的发送缓冲和驱动缓冲会被填满），
+解析出的遥测放入环形缓冲，最新一帧可交给追踪控制作为舵机的真实位置。
+Mega 的文本状态行不是帧，解析时跳过，只计入丢弃字节数。
+"""
+
+import threading
+import time
+from collections import deque
+
+from gimbal_protocol import FrameParser, MSG_TELEMETRY, decode_telemetry
+
+
+class TelemetryReader:
+    """读取云台串口的遥测帧"""
+    def __init__(self, ser, size=256, on_telemetry=None):
+        self.ser = ser
+        self.on_telemetry = on_telemetry    # on_telemetry(Telemetry)，在读取线程中调用
+        self.history = deque(maxlen=size)   # 最近的遥测，旧的自动丢弃
+        self.parser = FrameParser()
+        self.frames = 0
+        self.error = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.5):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self, max_age=None):
+        """最新一帧遥测，超过 max_age 秒或没有时返回 None"""
+        try:
+            telemetry = self.history[-1]
+        except IndexError:
+            return None
+        if max_age is not None and time.monotonic() - telemetry.stamp > max_age:
+            return None
+        return telemetry
+
+    def _run(self):
+        while self._running:
+            try:
+                # 有数据就全部读出，没有时阻塞等 1 字节（受串口 timeout 限制）
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                self.error = str(e)
+                return
+            if not data:
+                continue
+            stamp = time.monotonic()
+            for msg_type, seq, payload in self.parser.feed(data):
+                if msg_type != MSG_TELEMETRY:
+                    continue
+                telemetry = decode_telemetry(payload, stamp)
+                if telemetry is None:
+                    continue
+                self.frames += 1
+                self.history.append(telemetry)
+                if self.on_telemetry:
+                    self.on_telemetry(telemetry)
+
+    def text(self):
+        t = self.latest(max_age=0.5)
+        if t is None:
+            return "遥测: 无"
+        state = ("触发 " if t.trigger else "") + ("激光 " if t.laser else "")
+        return (f"遥测: 舵机 {t.pan:.1f}°/{t.tilt:.1f}° → {t.target_pan:.1f}°/{t.target_tilt:.1f}° {state}"
+                f"循环 {t.loop_us}us 错帧 {t.crc_errors} 丢帧 {t.seq_gaps}")
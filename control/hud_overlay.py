@@ -0,0 +1,71 @@
+"""
+HUD 叠加层
+
+准星和中心容差圈不随帧变化，按画面尺寸只绘制一次到缓存的叠加图和掩膜里，
+每帧用一次 np.copyto(where=掩膜) 合成（只处理掩膜外接矩形区域）。
+目标圈、连线、预测瞄准点和文字等动态元素只在真正要显示的帧上绘制，
+仅用于追踪的帧不做任何绘制。
+"""
+
+import cv2
+import numpy as np
+
+HUD_GREEN = (0, 255, 0)
+HUD_RED = (0, 0, 255)
+HUD_CYAN = (255, 255, 0)
+HUD_MAGENTA = (255, 0, 255)
+HUD_YELLOW = (0, 255, 255)
+HUD_ORANGE = (0, 165, 255)
+
+
+class HudOverlay:
+    """追踪画面的 HUD 绘制"""
+    def __init__(self, tolerance):
+        self.tolerance = tolerance      # 中心容差圈半径(px)
+        self._static_key = None
+        self._static = None             # (y0, y1, x0, x1, 叠加图, 掩膜)
+
+    def _static_layer(self, height, width):
+        key = (height, width, self.tolerance)
+        if key != self._static_key:
+            overlay = np.zeros((height, width, 3), np.uint8)
+            cx, cy = width // 2, height // 2
+            cv2.line(overlay, (cx - 15, cy), (cx + 15, cy), HUD_GREEN, 2)
+            cv2.line(overlay, (cx, cy - 15), (cx, cy + 15), HUD_GREEN, 2)
+            cv2.circle(overlay, (cx, cy), self.tolerance, HUD_GREEN, 1)
+            mask = overlay.any(axis=2)
+            ys, xs = np.nonzero(mask)
+            y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+            self._static = (y0, y1, x0, x1,
+                            overlay[y0:y1, x0:x1].copy(), mask[y0:y1, x0:x1, None].copy())
+            self._static_key = key
+        return self._static
+
+    def compose(self, frame, result=None, tracks=(), pinned_id=None):
+        """在 frame 上原地叠加 HUD 并返回 frame"""
+        height, width = frame.shape[:2]
+        y0, y1, x0, x1, overlay, mask = self._static_layer(height, width)
+        np.copyto(frame[y0:y1, x0:x1], overlay, where=mask)
+        for track_id, x, y, radius, seen in tracks:
+            # 多目标模式：所有候选目标及其 ID，锁定的目标用橙色
+            color = HUD_ORANGE if track_id == pinned_id else HUD_YELLOW
+            cv2.circle(frame, (int(x), int(y)), int(radius), color, 2 if seen else 1)
+            cv2.putText(frame, f"#{track_id}", (int(x - radius), int(y - radius) - 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        if result is None or not result.found:
+            return frame
+        center_x, center_y = width // 2, height // 2
+        tx, ty = int(result.x), int(result.y)
+        color = HUD_GREEN if result.distance <= self.tolerance else HUD_RED
+        cv2.circle(frame, (tx, ty), int(result.radius), color, 2)
+        cv2.circle(frame, (tx, ty), 3, color, -1)
+        cv2.line(frame, (tx, ty), (center_x, center_y), HUD_CYAN, 1)
+        if result.horizon > 0:
+            # 预测瞄准点
+            ax, ay = int(result.aim_x), int(result.aim_y)
+            cv2.drawMarker(frame, (ax, ay), HUD_MAGENTA, cv2.MARKER_TILTED_CROSS, 12, 2)
+            cv2.line(frame, (tx, ty), (ax, ay), HUD_MAGENTA, 1)
+            cv2.putText(frame, f"Lead: {result.horizon * 1000:.0f}ms", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.5, HUD_MAGENTA, 1)
+        cv2.putText(frame, f"Distance: {result.distance:.1f}px", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, HUD_CYAN, 1)
+        if result.trigger:
+            cv2.putText(frame, "TARGET LOCKED!", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, HUD_RED, 2)
+        return frame
@@ -7,9 +7,12 @@ import tkinter as tk
 from tkinter import ttk, Canvas
 import threading
 from collections import deque
-from PIL import Image, ImageTk
 import math
 import tkinter.messagebox
+from frame_capture import LatestFrameCapture, FrameSlot, AgeMeter
+from video_display import VideoDisplay
+from gimbal_protocol import GimbalEncoder
+from gimbal_telemetry import TelemetryReader
 
 # 全局美化参数
 GLOBAL_FONT = ("微软雅黑", 13)
@@ -33,6 +36,10 @@ class JoystickControlUI:
     def __init__(self):
         try:
             self.ser = serial.Serial('com14', 115200, timeout=1)
+            self.gimbal_encoder = GimbalEncoder()   # 云台命令帧序号
+            # Mega 每 50ms 回传遥测，读取线程持续排空接收缓冲
+            self.gimbal_telemetry = TelemetryReader(self.ser)
+            self.gimbal_telemetry.start()
             time.sleep(2)
         except:
             print("❌ 串口连接失败，请检查COM端口")
@@ -46,6 +53,13 @@ class JoystickControlUI:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         self.cap.set(cv2.CAP_PROP_FPS, 30)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        # 采集线程持续排空驱动缓冲，追踪与显示各自取最新帧
+        self.capture = LatestFrameCapture(self.cap)
+        self.display_slot = FrameSlot()
+        self.track_age = AgeMeter()
+        self.display_age = AgeMeter()
         
         self.pan_angle = 135
         self.tilt_angle = 90
@@ -64,9 +78,14 @@ class JoystickControlUI:
         
         self.setup_gui()
         
+        self.capture.start()
+        
         self.video_thread = threading.Thread(target=self.video_stream, daemon=True)
         self.video_thread.start()
         
+        self.tracking_thread = threading.Thread(target=self.tracking_loop, daemon=True)
+        self.tracking_thread.start()
+        
         self.control_thread = threading.Thread(target=self.control_loop, daemon=True)
         self.control_thread.start()
     
@@ -192,6 +211,7 @@ class JoystickControlUI:
         self.video_label = tk.Label(left_frame, background="#000000")
         # 关键：不使用fill=tk.X，改为fill=tk.BOTH但不expand，便于高度受控
         self.video_label.pack(side=tk.TOP, fill=tk.BOTH, expand=False, padx=14, pady=(0, 10))
+        self.video_display = VideoDisplay(self.video_label)
         self.left_frame = left_frame  # 保存引用，便于后续获取尺寸
 
         # 绑定left_frame尺寸变化事件，动态调整video_label最大高度
@@ -216,7 +236,7 @@ class JoystickControlUI:
         self.joystick_canvas.bind("<B1-Motion>", self.joystick_drag)
         self.joystick_canvas.bind("<ButtonRelease-1>", self.joystick_release)
 
-        self.draw_joystick()
+        self.build_joystick()
 
         joystick_info = ttk.Label(joystick_frame,
                                  text="拖拽圆点控制方向",
@@ -301,13 +321,12 @@ class JoystickControlUI:
             return
         self.update_video_display()
     
-    def draw_joystick(self):
-        """绘制遥感"""
+    def build_joystick(self):
+        """创建遥感图元，只在初始化时调用"""
         self.joystick_canvas.delete("all")
 
         center_x, center_y = JOYSTICK_SIZE // 2, JOYSTICK_SIZE // 2
         outer_radius = JOYSTICK_OUTER_RADIUS
-        inner_radius = JOYSTICK_INNER_RADIUS
 
         # 外圆（操作区）
         self.joystick_canvas.create_oval(center_x - outer_radius, center_y - outer_radius,
@@ -332,6 +351,20 @@ class JoystickControlUI:
         self.joystick_canvas.create_text(center_x + outer_radius + JOYSTICK_LABEL_OFFSET, center_y,
                                          text="右", fill='#ffffff', font=JOYSTICK_FONT)
 
+        # 圆点和坐标文字保留图元 ID，拖动时只改坐标/文字
+        self.joystick_knob = self.joystick_canvas.create_oval(center_x, center_y, center_x, center_y,
+                                                              outline='#ffffff', width=JOYSTICK_DOT_WIDTH, fill='#4CAF50')
+        self.joystick_coord = self.joystick_canvas.create_text(center_x, center_y + outer_radius + JOYSTICK_COORD_OFFSET,
+                                                               text="", fill='#ffffff', font=JOYSTICK_COORD_FONT)
+        self.joystick_drawn = (None, None, None)
+        self.draw_joystick()
+
+    def draw_joystick(self):
+        """更新遥感圆点和坐标显示"""
+        center_x, center_y = JOYSTICK_SIZE // 2, JOYSTICK_SIZE // 2
+        outer_radius = JOYSTICK_OUTER_RADIUS
+        inner_radius = JOYSTICK_INNER_RADIUS
+
         # 圆点
         if self.joystick_active:
             inner_x = center_x - self.joystick_x * (outer_radius - inner_radius)
@@ -340,16 +373,19 @@ class JoystickControlUI:
         else:
             inner_x, inner_y = center_x, center_y
             color = '#4CAF50'
-
-        self.joystick_canvas.create_oval(inner_x - inner_radius, inner_y - inner_radius,
-                                         inner_x + inner_radius, inner_y + inner_radius,
-                                         outline='#ffffff', width=JOYSTICK_DOT_WIDTH, fill=color)
-
-        # 坐标显示
         coord_text = f"X:{self.joystick_x:.2f}, Y:{self.joystick_y:.2f}"
-        self.joystick_canvas.create_text(center_x, center_y + outer_radius + JOYSTICK_COORD_OFFSET,
-                                         text=coord_text, fill='#ffffff',
-                                         font=JOYSTICK_COORD_FONT)
+
+        # 只更新发生变化的部分
+        last_pos, last_color, last_text = self.joystick_drawn
+        pos = (int(inner_x), int(inner_y))
+        if pos != last_pos:
+            self.joystick_canvas.coords(self.joystick_knob, pos[0] - inner_radius, pos[1] - inner_radius,
+                                        pos[0] + inner_radius, pos[1] + inner_radius)
+        if color != last_color:
+            self.joystick_canvas.itemconfig(self.joystick_knob, fill=color)
+        if coord_text != last_text:
+            self.joystick_canvas.itemconfig(self.joystick_coord, text=coord_text)
+        self.joystick_drawn = (pos, color, coord_text)
     
     def joystick_press(self, event):
         """遥感按下"""
@@ -409,21 +445,25 @@ class JoystickControlUI:
             time.sleep(0.02)  # 50Hz控制频率
     
     def video_stream(self):
-        """视频流处理"""
+        """视频流显示（追踪模式显示标注结果，否则显示最新采集帧）"""
         frame_count = 0
         start_time = time.time()
         self._latest_frame = None  # 缓存最新帧
+        last_slot, last_seq = None, 0
 
         while self.running:
-            ret, frame = self.cap.read()
-            if not ret:
+            slot = self.display_slot if self.tracking_mode else self.capture.slot
+            if slot is not last_slot:
+                last_slot, last_seq = slot, 0
+            seq, stamp, frame = slot.get(last_seq, timeout=0.1)
+            if seq == last_seq:
+                continue
+            last_seq = seq
+            if frame is None:
                 continue
 
             frame_count += 1
-
-            # 如果是追踪模式，处理追踪
-            if self.tracking_mode:
-                frame = self.process_tracking(frame)
+            self.display_age.add(stamp)
 
             # 缓存最新帧
             self._latest_frame = frame
@@ -431,17 +471,32 @@ class JoystickControlUI:
             # 调用自适应显示
             self.update_video_display()
 
-            # 更新FPS
+            # 更新FPS和帧龄
             if frame_count % 30 == 0:
                 elapsed = time.time() - start_time
                 fps = frame_count / elapsed
                 if hasattr(self, 'fps_label'):
-                    self.fps_label.configure(text=f"FPS: {fps:.1f}")
+                    self.fps_label.configure(text=f"FPS: {fps:.1f}  帧龄: 追踪 {self.track_age.text()} / 显示 {self.display_age.text()}")
                 frame_count = 0
                 start_time = time.time()
 
             time.sleep(0.033)  # 约30FPS
     
+    def tracking_loop(self):
+        """追踪处理：每来一帧新图像处理一次，帧龄 = 开始处理时刻 - 采集时刻"""
+        last_seq = 0
+        while self.running:
+            if not self.tracking_mode:
+                time.sleep(0.02)
+                continue
+            seq, stamp, frame = self.capture.read(last_seq, timeout=0.1)
+            if frame is None or seq == last_seq:
+                continue
+            last_seq = seq
+            self.track_age.add(stamp)
+            annotated = self.process_tracking(frame.copy())
+            self.display_slot.put(annotated, stamp)
+    
     def process_tracking(self, frame):
         """处理追踪逻辑（与之前相同）"""
         height, width = frame.shape[:2]
@@ -594,9 +649,6 @@ class JoystickControlUI:
     def send_command(self, pan, tilt, trigger, laser_trigger=False):
         """发送控制命令"""
         try:
-            pan_int = int(pan) & 0xFFFF
-            tilt_int = int(tilt) & 0xFFFF
-
             # 确定触发信号值
             trigger_value = 0
             if laser_trigger:
@@ -604,15 +656,7 @@ class JoystickControlUI:
             elif trigger:
                 trigger_value = 1  # 普通触发
 
-            data = bytes([
-                (pan_int >> 8) & 0xFF,
-                pan_int & 0xFF,
-                (tilt_int >> 8) & 0xFF,
-                tilt_int & 0xFF,
-                trigger_value
-            ])
-
-            self.ser.write(data)
+            self.ser.write(self.gimbal_encoder.encode(pan, tilt, trigger_value))
 
             # 操作日志
             print(f"发送命令: pan={pan}, tilt={tilt}, trigger={trigger_value}")
@@ -639,6 +683,7 @@ class JoystickControlUI:
             self.trigger_counter = 0
             self.stable_frames = 0
             self.stability_history.clear()
+            self.display_slot.clear()
     
     def fire_laser(self):
         """手动发射激光（优化异常保护与UI恢复）"""
@@ -696,8 +741,12 @@ class JoystickControlUI:
         time.sleep(0.1)
         
         # 关闭资源
+        if hasattr(self, 'capture'):
+            self.capture.stop()
         if hasattr(self, 'cap'):
             self.cap.release()
+        if hasattr(self, 'gimbal_telemetry'):
+            self.gimbal_telemetry.stop(0)
         if hasattr(self, 'ser'):
             self.ser.close()
         
@@ -747,12 +796,6 @@ class JoystickControlUI:
         target_w = min(target_w, max_w)
         target_h = min(target_h, max_h)
 
-        # 转换为Tkinter可显示的格式
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_pil = Image.fromarray(frame_rgb)
-        frame_pil = frame_pil.resize((target_w, target_h), Image.Resampling.LANCZOS)
-        frame_tk = ImageTk.PhotoImage(frame_pil)
-
         # 只在尺寸变化时设置，防止递归死循环
         if hasattr(self, 'video_label'):
             prev_size = getattr(self, '_prev_video_size', (None, None))
@@ -761,8 +804,8 @@ class JoystickControlUI:
                 self.video_label.configure(width=target_w, height=target_h)
                 self._resizing = False
                 self._prev_video_size = (target_w, target_h)
-            self.video_label.configure(image=frame_tk)
-            self.video_label.image = frame_tk
+            # 复用缓冲和 PhotoImage 原地更新，尺寸一致时不缩放
+            self.video_display.show(frame, (target_w, target_h))
 
 class SimpleFilter:
     """简单滤波器"""
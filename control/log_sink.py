@@ -0,0 +1,107 @@
+"""
+日志输出
+
+原来的 log() 每次都清空日志框、把 200 行全部重新插入，串口每发一条命令都要重绘一遍。
+LogSink 在任意线程写入时只把新行放进待刷新队列，主线程每 100ms 最多刷新一次：
+只追加新行，超出上限时从顶部一次删除多余的行。同时由后台线程把全部日志
+写入文件（不限行数），界面和调用线程都不会因写日志而阻塞。
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+import tkinter as tk
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+
+class LogSink:
+    """批量刷新的日志框 + 异步文件日志"""
+    def __init__(self, root, max_lines=200, flush_ms=100, log_dir=LOG_DIR, prefix="control"):
+        self.root = root
+        self.widget = None
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self.widget_lines = 0           # 日志框当前的文本行数（一条消息可能含多行）
+        # 待写入日志框的消息；积压超过上限时 deque 自动丢弃最旧的，反正刷新后也会被裁掉
+        self._pending = deque(maxlen=max_lines)
+        self._after_id = None
+        self._file_queue = None
+        self._file_thread = None
+        self.path = None
+        if log_dir:
+            self.path = os.path.join(log_dir, f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+            self._file_queue = queue.Queue()
+            self._file_thread = threading.Thread(target=self._file_loop, args=(log_dir,), daemon=True)
+            self._file_thread.start()
+
+    def attach(self, widget):
+        """绑定日志框（state 为 DISABLED 的 tk.Text）并开始定时刷新"""
+        self.widget = widget
+        if self._after_id is None:
+            self._after_id = self.root.after(self.flush_ms, self._tick)
+
+    def write(self, message):
+        """任意线程调用，返回带时间戳的日志行"""
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n"
+        self._pending.append(line)
+        if self._file_queue is not None:
+            self._file_queue.put(line)
+        return line
+
+    def flush(self):
+        """主线程调用：把积压的新行追加到日志框"""
+        if self.widget is None or not self._pending:
+            return
+        lines = []
+        while self._pending:
+            try:
+                lines.append(self._pending.popleft())
+            except IndexError:
+                break
+        self.widget.config(state=tk.NORMAL)
+        self.widget.insert(tk.END, "".join(lines))
+        self.widget_lines += sum(line.count("\n") for line in lines)
+        excess = self.widget_lines - self.max_lines
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+            self.widget_lines -= excess
+        self.widget.see(tk.END)
+        self.widget.config(state=tk.DISABLED)
+
+    def _tick(self):
+        try:
+            self.flush()
+        finally:
+            self._after_id = self.root.after(self.flush_ms, self._tick)
+
+    def _file_loop(self, log_dir):
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            f = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            self._file_queue = None
+            return
+        with f:
+            while True:
+                line = self._file_queue.get()
+                if line is None:
+                    break
+                f.write(line)
+                # 队列暂时取空时才落盘，连续写入时合并成一次 flush
+                if self._file_queue.empty():
+                    f.flush()
+
+    def close(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self._file_queue is not None:
+            self._file_queue.put(None)
+            self._file_thread.join(1.0)
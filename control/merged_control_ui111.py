@@ -10,7 +10,10 @@ from collections import deque
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-from PIL import Image, ImageTk
+from frame_capture import LatestFrameCapture, FrameSlot, AgeMeter
+from video_display import VideoDisplay
+from gimbal_protocol import GimbalEncoder, TRIGGER_LASER
+from gimbal_telemetry import TelemetryReader
 
 # DPI感知与字体多平台兼容
 def get_dpi_scaling(root):
@@ -124,12 +127,18 @@ class MergedControlUI:
         # 独立串口
         self.motion_ser = None
         self.gimbal_ser = None
+        self.gimbal_telemetry = None    # 云台串口读取线程，排空 Mega 回传的遥测
         self.motion_confirmed_port = None
         self.motion_confirmed_baud = None
         self.gimbal_confirmed_port = None
         self.gimbal_confirmed_baud = None
+        self.gimbal_encoder = GimbalEncoder()   # 云台命令帧序号
 
         self.cap = None
+        self.capture = None
+        self.display_slot = FrameSlot()
+        self.track_age = AgeMeter()
+        self.display_age = AgeMeter()
         self.pan_angle = 135
         self.tilt_angle = 90
         self.tracking_mode = False
@@ -340,6 +349,7 @@ class MergedControlUI:
         ttk.Label(parent, text="📹 实时图传", style="Title.TLabel").pack(pady=(scale_size(self.root,10), scale_size(self.root,6)), anchor="w")
         self.video_label = ttk.Label(parent, background=BG_COLOR)
         self.video_label.pack(fill=tk.BOTH, expand=False, padx=scale_size(self.root,10), pady=(0, scale_size(self.root,10)))
+        self.video_display = VideoDisplay(self.video_label)
         status_frame = ttk.Labelframe(parent, text="📊 系统状态", style="Section.TLabelframe")
         status_frame.pack(fill=tk.X, padx=scale_size(self.root,10), pady=(scale_size(self.root,10), 0))
         self.status_text = ttk.Label(status_frame, text="串口/摄像头/云台状态", style="Accent.TLabel", anchor="w")
@@ -388,7 +398,7 @@ class MergedControlUI:
         self.joystick_canvas.bind("<Button-1>", self.joystick_press)
         self.joystick_canvas.bind("<B1-Motion>", self.joystick_drag)
         self.joystick_canvas.bind("<ButtonRelease-1>", self.joystick_release)
-        self.draw_joystick()
+        self.build_joystick()
         ttk.Button(parent, text="📍 云台归中", command=self.center_camera).pack(fill=tk.X, padx=scale_size(self.root,18), pady=(scale_size(self.root,10), scale_size(self.root,6)))
         self.tracking_button = ttk.Button(parent, text="🔴 开启追踪", command=self.toggle_tracking)
         self.tracking_button.pack(fill=tk.X, padx=scale_size(self.root,18), pady=(0, scale_size(self.root,6)))
@@ -451,6 +461,9 @@ class MergedControlUI:
 
     def toggle_gimbal_connection(self):
         if self.gimbal_ser:
+            # 读取线程可能阻塞在 read 上，关闭串口后自行退出，不在 Tk 线程里等待
+            self.gimbal_telemetry.stop(0)
+            self.gimbal_telemetry = None
             try:
                 self.gimbal_ser.close()
             except Exception:
@@ -468,6 +481,8 @@ class MergedControlUI:
                 return
             try:
                 self.gimbal_ser = serial.Serial(port, baudrate, timeout=1)
+                self.gimbal_telemetry = TelemetryReader(self.gimbal_ser)
+                self.gimbal_telemetry.start()
                 self.gimbal_connect_btn.config(text="🔌 断开", style="Error.TButton")
                 self.gimbal_status_label.config(text="● 已连接", style="Success.TLabel")
                 self.log(f"云台串口连接成功: {port}@{baudrate}")
@@ -533,11 +548,11 @@ class MergedControlUI:
             button.config(style="TButton")
 
     # 云台遥感
-    def draw_joystick(self):
+    def build_joystick(self):
+        # 完整重建摇杆图元，只在初始化和窗口缩放时调用
         self.joystick_canvas.delete("all")
         cx, cy = JOYSTICK_SIZE // 2, JOYSTICK_SIZE // 2
         outer = JOYSTICK_OUTER_RADIUS
-        inner = JOYSTICK_INNER_RADIUS
         self.joystick_canvas.create_oval(cx - outer, cy - outer, cx + outer, cy + outer, outline=GRAY_COLOR, width=JOYSTICK_LINE_WIDTH, fill=SECONDARY_COLOR)
         self.joystick_canvas.create_line(cx - outer + 12, cy, cx + outer - 12, cy, fill=PRIMARY_COLOR, width=2)
         self.joystick_canvas.create_line(cx, cy - outer + 12, cx, cy + outer - 12, fill=PRIMARY_COLOR, width=2)
@@ -547,6 +562,17 @@ class MergedControlUI:
         self.joystick_canvas.create_text(cx, cy + outer + JOYSTICK_LABEL_OFFSET, text="下", fill=FG_COLOR, font=label_font)
         self.joystick_canvas.create_text(cx - outer - JOYSTICK_LABEL_OFFSET, cy, text="左", fill=FG_COLOR, font=label_font)
         self.joystick_canvas.create_text(cx + outer + JOYSTICK_LABEL_OFFSET, cy, text="右", fill=FG_COLOR, font=label_font)
+        # 摇杆头和坐标文字保留图元 ID，拖动时只改坐标/文字
+        self.joystick_knob = self.joystick_canvas.create_oval(cx, cy, cx, cy, outline=FG_COLOR, width=JOYSTICK_DOT_WIDTH, fill=SUCCESS_COLOR)
+        coord_font = (FONT_FAMILIES, scale_size(self.root, 10))
+        self.joystick_coord = self.joystick_canvas.create_text(cx, cy + outer + JOYSTICK_COORD_OFFSET, text="", fill=FG_COLOR, font=coord_font)
+        self.joystick_drawn = (None, None, None)
+        self.draw_joystick()
+
+    def draw_joystick(self):
+        cx, cy = JOYSTICK_SIZE // 2, JOYSTICK_SIZE // 2
+        outer = JOYSTICK_OUTER_RADIUS
+        inner = JOYSTICK_INNER_RADIUS
         if self.joystick_active:
             ix = cx - self.joystick_x * (outer - inner)
             iy = cy + self.joystick_y * (outer - inner)
@@ -554,10 +580,17 @@ class MergedControlUI:
         else:
             ix, iy = cx, cy
             color = SUCCESS_COLOR
-        self.joystick_canvas.create_oval(ix - inner, iy - inner, ix + inner, iy + inner, outline=FG_COLOR, width=JOYSTICK_DOT_WIDTH, fill=color)
         coord_text = f"X:{self.joystick_x:.2f}, Y:{self.joystick_y:.2f}"
-        coord_font = (FONT_FAMILIES, scale_size(self.root, 10))
-        self.joystick_canvas.create_text(cx, cy + outer + JOYSTICK_COORD_OFFSET, text=coord_text, fill=FG_COLOR, font=coord_font)
+        # 只更新发生变化的部分
+        last_pos, last_color, last_text = self.joystick_drawn
+        pos = (int(ix), int(iy))
+        if pos != last_pos:
+            self.joystick_canvas.coords(self.joystick_knob, pos[0] - inner, pos[1] - inner, pos[0] + inner, pos[1] + inner)
+        if color != last_color:
+            self.joystick_canvas.itemconfig(self.joystick_knob, fill=color)
+        if coord_text != last_text:
+            self.joystick_canvas.itemconfig(self.joystick_coord, text=coord_text)
+        self.joystick_drawn = (pos, color, coord_text)
 
     def joystick_press(self, event):
         self.joystick_active = True
@@ -603,16 +636,7 @@ class MergedControlUI:
     def send_gimbal_cmd(self, pan, tilt, trigger=0):
         if self.gimbal_ser:
             try:
-                pan_int = int(pan) & 0xFFFF
-                tilt_int = int(tilt) & 0xFFFF
-                data = bytes([
-                    (pan_int >> 8) & 0xFF,
-                    pan_int & 0xFF,
-                    (tilt_int >> 8) & 0xFF,
-                    tilt_int & 0xFF,
-                    trigger
-                ])
-                self.gimbal_ser.write(data)
+                self.gimbal_ser.write(self.gimbal_encoder.encode(pan, tilt, trigger))
             except Exception as e:
                 self.log(f"云台命令发送失败: {e}")
 
@@ -627,6 +651,7 @@ class MergedControlUI:
             self.trigger_counter = 0
             self.stable_frames = 0
             self.stability_history.clear()
+            self.display_slot.clear()
 
     def fire_laser(self):
         if self.laser_firing or not self.gimbal_ser:
@@ -634,16 +659,7 @@ class MergedControlUI:
         self.laser_firing = True
         self.laser_button.configure(text="🔥 发射中...", state='disabled')
         try:
-            pan_int = int(self.pan_angle) & 0xFFFF
-            tilt_int = int(self.tilt_angle) & 0xFFFF
-            data = bytes([
-                (pan_int >> 8) & 0xFF,
-                pan_int & 0xFF,
-                (tilt_int >> 8) & 0xFF,
-                tilt_int & 0xFF,
-                2
-            ])
-            self.gimbal_ser.write(data)
+            self.gimbal_ser.write(self.gimbal_encoder.encode(self.pan_angle, self.tilt_angle, TRIGGER_LASER))
             self.log("激光发射命令已发送")
         except Exception as e:
             self.log(f"激光命令发送失败: {e}")
@@ -671,29 +687,52 @@ class MergedControlUI:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         self.cap.set(cv2.CAP_PROP_FPS, 30)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # 采集线程持续排空驱动缓冲，追踪与显示各自取最新帧
+        self.capture = LatestFrameCapture(self.cap)
+        self.capture.start()
+        self.tracking_thread = threading.Thread(target=self.tracking_loop, daemon=True)
+        self.tracking_thread.start()
         frame_count = 0
         start_time = time.time()
+        last_slot, last_seq = None, 0
         while self.running and self.cap:
-            ret, frame = self.cap.read()
-            if not ret:
+            # 追踪模式显示带标注的追踪结果，否则直接显示最新采集帧
+            slot = self.display_slot if self.tracking_mode else self.capture.slot
+            if slot is not last_slot:
+                last_slot, last_seq = slot, 0
+            seq, stamp, frame = slot.get(last_seq, timeout=0.1)
+            if seq == last_seq:
+                continue
+            last_seq = seq
+            if frame is None:
                 continue
+            self.display_age.add(stamp)
             frame_count += 1
-            if self.tracking_mode:
-                frame = self.process_tracking(frame)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_pil = Image.fromarray(frame_rgb)
-            frame_pil = frame_pil.resize((640, 480), Image.Resampling.LANCZOS)
-            frame_tk = ImageTk.PhotoImage(frame_pil)
-            self.video_label.configure(image=frame_tk)
-            self.video_label.image = frame_tk
+            self.video_display.show(frame, (640, 480))
             if frame_count % 30 == 0:
                 elapsed = time.time() - start_time
                 fps = frame_count / elapsed
-                self.status_text.config(text=f"FPS: {fps:.1f}")
+                self.status_text.config(text=f"FPS: {fps:.1f}  帧龄: 追踪 {self.track_age.text()} / 显示 {self.display_age.text()}")
                 frame_count = 0
                 start_time = time.time()
             time.sleep(0.033)
 
+    def tracking_loop(self):
+        # 每来一帧新图像就处理一次，帧龄 = 开始处理时刻 - 采集时刻
+        last_seq = 0
+        while self.running and self.capture:
+            if not self.tracking_mode:
+                time.sleep(0.02)
+                continue
+            seq, stamp, frame = self.capture.read(last_seq, timeout=0.1)
+            if frame is None or seq == last_seq:
+                continue
+            last_seq = seq
+            self.track_age.add(stamp)
+            annotated = self.process_tracking(frame.copy())
+            self.display_slot.put(annotated, stamp)
+
     # 追踪处理
     def process_tracking(self, frame):
         height, width = frame.shape[:2]
@@ -835,8 +874,12 @@ class MergedControlUI:
 
     def close_application(self):
         self.running = False
+        if self.capture:
+            self.capture.stop()
         if self.cap:
             self.cap.release()
+        if self.gimbal_telemetry:
+            self.gimbal_telemetry.stop(0)
         if self.motion_ser:
             self.motion_ser.close()
         if self.gimbal_ser:
@@ -914,7 +957,7 @@ class MergedControlUI:
             if hasattr(self, "joystick_canvas"):
                 joy_size = max(120, int(220 * self.scale_factor))
                 self.joystick_canvas.config(width=joy_size, height=joy_size)
-                self.draw_joystick()
+                self.build_joystick()
             self.update_widget_scale()
 
 if __name__ == "__main__":
@@ -6,11 +6,24 @@ import cv2
 import numpy as np
 import serial
 import serial.tools.list_ports
-from collections import deque
-from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-from PIL import Image, ImageTk
+from frame_capture import LatestFrameCapture, FrameSlot, AgeMeter
+from frame_scheduler import FrameScheduler
+from video_display import VideoDisplay
+from ui_dispatcher import UIDispatcher
+from log_sink import LogSink
+from hud_overlay import HudOverlay
+from debug_view import DebugView
+from sdl_video import SdlVideoWindow
+from gimbal_protocol import TRIGGER_LASER
+from gimbal_output import GimbalOutput
+from serial_transport import SerialTransport
+from gimbal_telemetry import TelemetryReader
+from red_detector import RedTargetDetector
+from tracking_control import TrackingController, TrackingResult
+from target_association import MultiTargetTracker
+from tracking_pipeline import TrackingPipeline
 
 # DPI感知与字体多平台兼容
 def get_dpi_scaling(root):
@@ -45,6 +58,15 @@ def scale_size(root, base):
 # emoji字体备选
 EMOJI_FONT = ("Segoe UI Emoji", "Apple Color Emoji", "Noto Color Emoji", "Arial Unicode MS", "sans-serif")
 
+# 多进程流水线模式：python merged_control_ui222.py --pipeline
+PIPELINE_MODE = "--pipeline" in sys.argv
+# SDL 视频窗口（需要 pygame）：python merged_control_ui222.py --sdl
+SDL_VIDEO = "--sdl" in sys.argv
+
+# 窗口缩放：尺寸稳定多久后再重排(ms)，缩放比例取整步长
+RESIZE_SETTLE_MS = 150
+SCALE_STEP = 0.05
+
 # Joystick参数
 JOYSTICK_SIZE = 220
 JOYSTICK_OUTER_RADIUS = 85
@@ -54,51 +76,6 @@ JOYSTICK_DOT_WIDTH = 5
 JOYSTICK_LABEL_OFFSET = 18
 JOYSTICK_COORD_OFFSET = 30
 
-class SimpleFilter:
-    def __init__(self, size=6):
-        self.values = deque(maxlen=size)
-    def add(self, value):
-        self.values.append(value)
-    def get_filtered(self):
-        if not self.values:
-            return None
-        sorted_vals = sorted(self.values)
-        if len(sorted_vals) > 4:
-            trimmed = sorted_vals[1:-1]
-            return sum(trimmed) / len(trimmed)
-        else:
-            return sum(sorted_vals) / len(sorted_vals)
-
-class StablePID:
-    def __init__(self, kp, ki, kd):
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
-        self.prev_error = 0
-        self.integral = 0
-    def compute(self, error):
-        if abs(error) < 0.015:
-            error = 0
-        self.integral = 0
-        derivative = error - self.prev_error
-        error_magnitude = abs(error)
-        if error_magnitude > 0.3:
-            adaptive_kp = self.kp * 0.8
-            adaptive_kd = self.kd * 1.2
-        elif error_magnitude > 0.1:
-            adaptive_kp = self.kp
-            adaptive_kd = self.kd
-        else:
-            adaptive_kp = self.kp * 1.2
-            adaptive_kd = self.kd * 1.5
-        output = adaptive_kp * error + self.ki * self.integral + adaptive_kd * derivative
-        if error_magnitude > 0.3:
-            output = max(-0.25, min(0.25, output))
-        else:
-            output = max(-0.4, min(0.4, output))
-        self.prev_error = error
-        return output
-
 class MergedControlUI:
     def __init__(self):
         self._key_release_timers = {}
@@ -108,6 +85,12 @@ class MergedControlUI:
         self.base_width = 1500
         self.base_height = 900
         self.scale_factor = 1.0
+        self._pending_size = (self.base_width, self.base_height)
+        self._resize_after_id = None
+        self._applied_scale = None          # 已应用样式的缩放档位
+        self._applied_styles = {}
+        self._applied_btn_padding = None
+        self._style_cache = {}
         self.root.geometry(f"{self.base_width}x{self.base_height}")
         self.root.configure(bg=BG_COLOR)
         self.root.option_add("*Font", font(BASE_SIZE))
@@ -130,8 +113,21 @@ class MergedControlUI:
         self.motion_confirmed_baud = None
         self.gimbal_confirmed_port = None
         self.gimbal_confirmed_baud = None
+        # 每个串口一个单写者传输，所有线程只往它的队列里放命令
+        self.motion_link = None
+        self.gimbal_link = None
+        self.gimbal_output = None   # 云台命令输出级：只保留最新状态，变化或保活时才发送
+        self.gimbal_telemetry = None    # 云台串口读取线程，解析 Mega 回传的遥测
 
         self.cap = None
+        self.capture = None
+        self.pipeline = None
+        self.last_hud = None        # 多进程模式下最近的 (追踪结果, 轨迹摘要, 锁定 ID)
+        # 追踪线程放入 (原始帧, 追踪结果, 轨迹摘要, 锁定 ID)，HUD 只在显示时绘制
+        self.display_slot = FrameSlot()
+        self.track_age = AgeMeter()
+        self.display_age = AgeMeter()
+        self.scheduler = FrameScheduler()
         self.pan_angle = 135
         self.tilt_angle = 90
         self.tracking_mode = False
@@ -140,7 +136,7 @@ class MergedControlUI:
         self.joystick_active = False
         self.joystick_x = 0
         self.joystick_y = 0
-        self.log_lines = deque(maxlen=200)
+        self.log_sink = LogSink(self.root, max_lines=200, prefix="merged_control")
 # 主Frame外包裹一层白色背景Frame用于居中和填充
         self.bg_frame = tk.Frame(self.root, bg="#fff")
         self.bg_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
@@ -231,6 +227,18 @@ class MergedControlUI:
         style.configure("Connect.TButton", font=font(BASE_SIZE, "bold"), foreground="white", background=SUCCESS_COLOR, borderwidth=0)
         style.configure("Disconnect.TButton", font=font(BASE_SIZE, "bold"), foreground="white", background=DISABLED_COLOR, borderwidth=0)
 
+        # 界面更新分发：工作线程只 publish，主线程定时应用
+        self.ui = UIDispatcher(self.root)
+        self.ui.register("video", self.show_video_frame, dedupe=False)
+        self.ui.register("status", lambda text: self.status_text.config(text=text))
+        self.ui.register("angle", self.show_angle)
+        self.ui.register("target", lambda text: self.target_label.config(text=text))
+        self.ui.register("pin", lambda text: self.pin_label.config(text=text))
+        self.ui.start()
+        self.sdl_video = None
+        if SDL_VIDEO:
+            self.start_sdl_video()
+
         # 线程
         self.video_thread = threading.Thread(target=self.video_stream, daemon=True)
         self.video_thread.start()
@@ -251,25 +259,14 @@ class MergedControlUI:
         self.upper_red1 = np.array([10, 255, 255])
         self.lower_red2 = np.array([160, 120, 120])
         self.upper_red2 = np.array([180, 255, 255])
-        self.KP = 0.4
-        self.KI = 0.0
-        self.KD = 0.9
-        self.CENTER_TOLERANCE = 18
-        self.TRIGGER_THRESHOLD = 0.06
-        self.TRIGGER_DELAY = 12
-        self.MAX_ANGLE_CHANGE = 4.0
-        self.DEAD_ZONE = 1.0
-        self.x_filter = SimpleFilter(6)
-        self.y_filter = SimpleFilter(6)
-        self.pan_filter = SimpleFilter(4)
-        self.tilt_filter = SimpleFilter(4)
-        self.pan_pid = StablePID(self.KP, self.KI, self.KD)
-        self.tilt_pid = StablePID(self.KP, self.KI, self.KD)
-        self.last_pan = 135
-        self.last_tilt = 90
-        self.trigger_counter = 0
-        self.stability_history = deque(maxlen=10)
-        self.stable_frames = 0
+        # 颜色查表默认关闭：640x480 下查表反而比 cvtColor + inRange 慢，
+        # 先用 bench_blob_extract.py 在本机比较，更快时再在界面中开启
+        self.detector = RedTargetDetector(self.lower_red1, self.upper_red1, self.lower_red2, self.upper_red2)
+        self.controller = TrackingController()
+        self.multi_target = MultiTargetTracker()
+        self.multi_target_mode = False
+        self.hud = HudOverlay(self.controller.CENTER_TOLERANCE)
+        self.debug_view = DebugView(self.detector)
 
     # 左侧区域
     def setup_left(self, parent):
@@ -402,9 +399,20 @@ class MergedControlUI:
 
     # 中间区域
     def setup_center(self, parent):
-        ttk.Label(parent, text="📹 实时图传", style="Title.TLabel").pack(pady=(scale_size(self.root,10), scale_size(self.root,6)), anchor="w")
+        title_row = ttk.Frame(parent)
+        title_row.pack(fill=tk.X, pady=(scale_size(self.root,10), scale_size(self.root,6)))
+        ttk.Label(title_row, text="📹 实时图传", style="Title.TLabel").pack(side=tk.LEFT)
+        # 调试视图：只在选中时按显示帧率计算掩膜/搜索窗口/候选轮廓
+        self.debug_view_names = {"画面": "off", "掩膜": "mask", "搜索窗口": "roi", "候选轮廓": "candidates"}
+        self.debug_view_var = tk.StringVar(value="画面")
+        debug_combo = ttk.Combobox(title_row, textvariable=self.debug_view_var, values=list(self.debug_view_names), width=8, state="readonly")
+        debug_combo.pack(side=tk.RIGHT, padx=scale_size(self.root,10))
+        debug_combo.bind("<<ComboboxSelected>>", self.on_debug_view_selected)
+        ttk.Label(title_row, text="调试视图:").pack(side=tk.RIGHT)
         self.video_label = ttk.Label(parent, background=BG_COLOR)
         self.video_label.pack(padx=scale_size(self.root,10), pady=(0, scale_size(self.root,10)), anchor="center")
+        self.video_label.bind("<Button-1>", self.on_video_click)
+        self.video_display = VideoDisplay(self.video_label)
         status_frame = ttk.Labelframe(parent, text="📊 系统状态", style="Section.TLabelframe")
         status_frame.pack(fill=tk.X, padx=scale_size(self.root,10), pady=(scale_size(self.root,10), 0))
         self.status_text = ttk.Label(status_frame, text="串口/摄像头/云台状态", style="Accent.TLabel", anchor="w")
@@ -418,6 +426,7 @@ class MergedControlUI:
                                 bg=BG_COLOR, insertbackground=PRIMARY_COLOR, selectbackground=PRIMARY_COLOR,
                                 wrap=tk.WORD, state=tk.DISABLED, relief=tk.FLAT, bd=0)
         self.log_text.pack(fill=tk.BOTH, expand=True)
+        self.log_sink.attach(self.log_text)
         self.target_label = ttk.Label(status_frame, text="目标: 未检测", style="Accent.TLabel")
         self.target_label.pack(anchor="w", padx=scale_size(self.root,6), pady=(0, scale_size(self.root,2)))
         self.angle_label_center = ttk.Label(status_frame, text="角度: 135°, 90°", style="Success.TLabel")
@@ -453,12 +462,62 @@ class MergedControlUI:
         self.joystick_canvas.bind("<Button-1>", self.joystick_press)
         self.joystick_canvas.bind("<B1-Motion>", self.joystick_drag)
         self.joystick_canvas.bind("<ButtonRelease-1>", self.joystick_release)
-        self.draw_joystick()
+        self.build_joystick()
         ttk.Button(parent, text="📍 云台归中", command=self.center_camera).pack(fill=tk.X, padx=scale_size(self.root,18), pady=(scale_size(self.root,10), scale_size(self.root,6)))
         self.tracking_button = ttk.Button(parent, text="🔴 开启追踪", command=self.toggle_tracking)
         self.tracking_button.pack(fill=tk.X, padx=scale_size(self.root,18), pady=(0, scale_size(self.root,6)))
         self.laser_button = ttk.Button(parent, text="🔴 发射激光", command=self.fire_laser)
         self.laser_button.pack(fill=tk.X, padx=scale_size(self.root,18), pady=(0, scale_size(self.root,6)))
+        # 检测设置
+        detect_frame = ttk.Labelframe(parent, text="🎯 检测设置", style="Section.TLabelframe")
+        detect_frame.pack(fill=tk.X, padx=scale_size(self.root,10), pady=scale_size(self.root,6))
+        self.roi_var = tk.BooleanVar(value=self.detector.roi_enabled)
+        ttk.Checkbutton(detect_frame, text="追踪窗口搜索", variable=self.roi_var, command=self.toggle_roi_search).grid(row=0, column=0, columnspan=2, padx=scale_size(self.root,8), pady=scale_size(self.root,4), sticky="w")
+        ttk.Label(detect_frame, text="金字塔:").grid(row=1, column=0, padx=(scale_size(self.root,8), scale_size(self.root,2)), pady=scale_size(self.root,4), sticky="w")
+        self.pyramid_var = tk.StringVar(value="关闭")
+        pyramid_combo = ttk.Combobox(detect_frame, textvariable=self.pyramid_var, values=["关闭", "2x", "4x"], width=6, state="readonly")
+        pyramid_combo.grid(row=1, column=1, padx=(0, scale_size(self.root,8)), pady=scale_size(self.root,4), sticky="w")
+        pyramid_combo.bind("<<ComboboxSelected>>", self.on_pyramid_selected)
+        self.lut_var = tk.BooleanVar(value=self.detector.color_lut is not None)
+        ttk.Checkbutton(detect_frame, text="颜色查表", variable=self.lut_var, command=self.toggle_color_lut).grid(row=2, column=0, columnspan=2, padx=scale_size(self.root,8), pady=scale_size(self.root,4), sticky="w")
+        self.multi_var = tk.BooleanVar(value=self.multi_target_mode)
+        ttk.Checkbutton(detect_frame, text="多目标（点击画面锁定）", variable=self.multi_var, command=self.toggle_multi_target).grid(row=3, column=0, columnspan=2, padx=scale_size(self.root,8), pady=scale_size(self.root,4), sticky="w")
+        self.pin_label = ttk.Label(detect_frame, text="锁定: 无", style="TLabel")
+        self.pin_label.grid(row=4, column=0, padx=scale_size(self.root,8), pady=(0, scale_size(self.root,4)), sticky="w")
+        ttk.Button(detect_frame, text="解除锁定", command=self.unpin_target).grid(row=4, column=1, padx=(0, scale_size(self.root,8)), pady=(0, scale_size(self.root,4)), sticky="w")
+        ttk.Label(detect_frame, text="色块提取:").grid(row=5, column=0, padx=(scale_size(self.root,8), scale_size(self.root,2)), pady=scale_size(self.root,4), sticky="w")
+        self.extractor_var = tk.StringVar(value="轮廓")
+        extractor_combo = ttk.Combobox(detect_frame, textvariable=self.extractor_var, values=["轮廓", "连通域"], width=6, state="readonly")
+        extractor_combo.grid(row=5, column=1, padx=(0, scale_size(self.root,8)), pady=scale_size(self.root,4), sticky="w")
+        extractor_combo.bind("<<ComboboxSelected>>", self.on_extractor_selected)
+        # 帧率：追踪/控制与预览显示分开设置
+        rate_frame = ttk.Labelframe(parent, text="🎞️ 帧率", style="Section.TLabelframe")
+        rate_frame.pack(fill=tk.X, padx=scale_size(self.root,10), pady=scale_size(self.root,6))
+        ttk.Label(rate_frame, text="追踪:").grid(row=0, column=0, padx=(scale_size(self.root,8), scale_size(self.root,2)), pady=scale_size(self.root,4), sticky="w")
+        self.track_fps_var = tk.StringVar(value="相机")
+        track_fps_combo = ttk.Combobox(rate_frame, textvariable=self.track_fps_var, values=["相机", "20", "15", "10"], width=6, state="readonly")
+        track_fps_combo.grid(row=0, column=1, padx=(0, scale_size(self.root,8)), pady=scale_size(self.root,4), sticky="w")
+        track_fps_combo.bind("<<ComboboxSelected>>", self.on_rate_selected)
+        ttk.Label(rate_frame, text="预览:").grid(row=1, column=0, padx=(scale_size(self.root,8), scale_size(self.root,2)), pady=scale_size(self.root,4), sticky="w")
+        self.display_fps_var = tk.StringVar(value="15")
+        display_fps_combo = ttk.Combobox(rate_frame, textvariable=self.display_fps_var, values=["30", "15", "10", "5"], width=6, state="readonly")
+        display_fps_combo.grid(row=1, column=1, padx=(0, scale_size(self.root,8)), pady=scale_size(self.root,4), sticky="w")
+        display_fps_combo.bind("<<ComboboxSelected>>", self.on_rate_selected)
+        # 预测瞄准（延迟补偿）
+        latency = self.controller.latency
+        lead_frame = ttk.Labelframe(parent, text="⏱️ 预测瞄准", style="Section.TLabelframe")
+        lead_frame.pack(fill=tk.X, padx=scale_size(self.root,10), pady=scale_size(self.root,6))
+        lead_frame.grid_columnconfigure(1, weight=1)
+        self.lead_var = tk.BooleanVar(value=latency.enabled)
+        ttk.Checkbutton(lead_frame, text="延迟补偿", variable=self.lead_var, command=self.on_latency_changed).grid(row=0, column=0, columnspan=2, padx=scale_size(self.root,8), pady=scale_size(self.root,4), sticky="w")
+        ttk.Label(lead_frame, text="补偿比例:").grid(row=1, column=0, padx=(scale_size(self.root,8), scale_size(self.root,2)), sticky="w")
+        self.lead_gain_var = tk.DoubleVar(value=latency.gain)
+        ttk.Scale(lead_frame, from_=0.0, to=1.5, variable=self.lead_gain_var, command=self.on_latency_changed).grid(row=1, column=1, padx=(0, scale_size(self.root,8)), sticky="ew")
+        ttk.Label(lead_frame, text="附加延迟:").grid(row=2, column=0, padx=(scale_size(self.root,8), scale_size(self.root,2)), sticky="w")
+        self.lead_extra_var = tk.DoubleVar(value=latency.extra * 1000)
+        ttk.Scale(lead_frame, from_=0.0, to=150.0, variable=self.lead_extra_var, command=self.on_latency_changed).grid(row=2, column=1, padx=(0, scale_size(self.root,8)), sticky="ew")
+        self.lead_label = ttk.Label(lead_frame, text=f"比例 {latency.gain:.2f} / 附加 {latency.extra * 1000:.0f}ms", style="TLabel")
+        self.lead_label.grid(row=3, column=0, columnspan=2, padx=scale_size(self.root,8), pady=(0, scale_size(self.root,4)), sticky="w")
         self.angle_label = ttk.Label(parent, text="角度: 135°, 90°", style="Success.TLabel")
         self.angle_label.pack(pady=(scale_size(self.root,10), 0))
 
@@ -487,6 +546,8 @@ class MergedControlUI:
 
     def toggle_motion_connection(self):
         if self.motion_ser:
+            self.motion_link.stop()
+            self.motion_link = None
             try:
                 self.motion_ser.close()
             except Exception:
@@ -504,6 +565,8 @@ class MergedControlUI:
                 return
             try:
                 self.motion_ser = serial.Serial(port, baudrate, timeout=1)
+                self.motion_link = SerialTransport(self.motion_ser, "运动", on_error=lambda e: self.log(f"运动串口发送失败: {e}"))
+                self.motion_link.start()
                 self.motion_connect_btn.config(text="⛔ 断开", style="Disconnect.TButton")
                 self.motion_status_label.config(text="● 已连接", style="Success.TLabel")
                 self.log(f"运动串口连接成功: {port}@{baudrate}")
@@ -516,6 +579,12 @@ class MergedControlUI:
 
     def toggle_gimbal_connection(self):
         if self.gimbal_ser:
+            self.gimbal_link.stop()
+            self.gimbal_link = None
+            self.gimbal_output = None
+            # 读取线程可能阻塞在 read 上，关闭串口后自行退出，不在 Tk 线程里等待
+            self.gimbal_telemetry.stop(0)
+            self.gimbal_telemetry = None
             try:
                 self.gimbal_ser.close()
             except Exception:
@@ -533,6 +602,11 @@ class MergedControlUI:
                 return
             try:
                 self.gimbal_ser = serial.Serial(port, baudrate, timeout=1)
+                self.gimbal_link = SerialTransport(self.gimbal_ser, "云台", on_error=lambda e: self.log(f"云台命令发送失败: {e}"))
+                self.gimbal_output = GimbalOutput(self.gimbal_link)
+                self.gimbal_link.start()
+                self.gimbal_telemetry = TelemetryReader(self.gimbal_ser, on_telemetry=self.on_gimbal_telemetry)
+                self.gimbal_telemetry.start()
                 self.gimbal_connect_btn.config(text="🔌 断开", style="Error.TButton")
                 self.gimbal_status_label.config(text="● 已连接", style="Success.TLabel")
                 self.log(f"云台串口连接成功: {port}@{baudrate}")
@@ -544,25 +618,26 @@ class MergedControlUI:
                 self.log(f"云台串口连接失败: {e}")
 
     # 控制命令
-    def send_command(self, command, description, target="motion"):
-        ser = self.motion_ser if target == "motion" else self.gimbal_ser
-        if ser:
-            try:
-                msg = command.strip() + '\n'
-                ser.write(msg.encode('utf-8'))
-                self.log(f"发送命令: {command} ({description})")
-                return True
-            except Exception as e:
-                self.log(f"串口发送失败: {e}")
+    def send_command(self, command, description, target="motion", urgent=False, flush=False):
+        # 只入队，由串口的写线程写出；写出失败由传输的 on_error 记录
+        link = self.motion_link if target == "motion" else self.gimbal_link
+        if link:
+            msg = (command.strip() + '\n').encode('utf-8')
+            queued = link.send_urgent(msg, flush) if urgent else link.send(msg)
+            if not queued:
+                self.log(f"发送失败: {command} ({description}) - 发送队列已满")
                 return False
+            self.log(f"发送命令: {command} ({description})")
+            return True
         else:
             self.log(f"发送失败: {command} ({description}) - 串口未连接")
             return False
 
     def emergency_stop(self):
         self.log("🛑 执行紧急停止!")
-        self.send_command("TS", "履带停止", target="motion")
-        self.send_command("WS", "推进器停止", target="motion")
+        # 走高优先级通道，并丢弃尚未写出的普通运动命令
+        self.send_command("TS", "履带停止", target="motion", urgent=True, flush=True)
+        self.send_command("WS", "推进器停止", target="motion", urgent=True)
 
     def software_reset(self):
         result = messagebox.askyesno("确认复位", "确定要执行软件复位吗？\n\n这将重启STM32控制器，所有设备将停止工作。", icon='warning')
@@ -598,11 +673,11 @@ class MergedControlUI:
             button.config(style="TButton")
 
     # 云台遥感
-    def draw_joystick(self):
+    def build_joystick(self):
+        # 完整重建摇杆图元，只在初始化和窗口缩放时调用
         self.joystick_canvas.delete("all")
         cx, cy = JOYSTICK_SIZE // 2, JOYSTICK_SIZE // 2
         outer = JOYSTICK_OUTER_RADIUS
-        inner = JOYSTICK_INNER_RADIUS
         self.joystick_canvas.create_oval(cx - outer, cy - outer, cx + outer, cy + outer, outline=GRAY_COLOR, width=JOYSTICK_LINE_WIDTH, fill=SECONDARY_COLOR)
         self.joystick_canvas.create_line(cx - outer + 12, cy, cx + outer - 12, cy, fill=PRIMARY_COLOR, width=2)
         self.joystick_canvas.create_line(cx, cy - outer + 12, cx, cy + outer - 12, fill=PRIMARY_COLOR, width=2)
@@ -612,6 +687,17 @@ class MergedControlUI:
         self.joystick_canvas.create_text(cx, cy + outer + JOYSTICK_LABEL_OFFSET, text="下", fill=FG_COLOR, font=label_font)
         self.joystick_canvas.create_text(cx - outer - JOYSTICK_LABEL_OFFSET, cy, text="左", fill=FG_COLOR, font=label_font)
         self.joystick_canvas.create_text(cx + outer + JOYSTICK_LABEL_OFFSET, cy, text="右", fill=FG_COLOR, font=label_font)
+        # 摇杆头和坐标文字保留图元 ID，拖动时只改坐标/文字
+        self.joystick_knob = self.joystick_canvas.create_oval(cx, cy, cx, cy, outline=FG_COLOR, width=JOYSTICK_DOT_WIDTH, fill=SUCCESS_COLOR)
+        coord_font = (FONT_FAMILIES, scale_size(self.root, 10))
+        self.joystick_coord = self.joystick_canvas.create_text(cx, cy + outer + JOYSTICK_COORD_OFFSET, text="", fill=FG_COLOR, font=coord_font)
+        self.joystick_drawn = (None, None, None)
+        self.draw_joystick()
+
+    def draw_joystick(self):
+        cx, cy = JOYSTICK_SIZE // 2, JOYSTICK_SIZE // 2
+        outer = JOYSTICK_OUTER_RADIUS
+        inner = JOYSTICK_INNER_RADIUS
         if self.joystick_active:
             ix = cx - self.joystick_x * (outer - inner)
             iy = cy + self.joystick_y * (outer - inner)
@@ -619,10 +705,17 @@ class MergedControlUI:
         else:
             ix, iy = cx, cy
             color = SUCCESS_COLOR
-        self.joystick_canvas.create_oval(ix - inner, iy - inner, ix + inner, iy + inner, outline=FG_COLOR, width=JOYSTICK_DOT_WIDTH, fill=color)
         coord_text = f"X:{self.joystick_x:.2f}, Y:{self.joystick_y:.2f}"
-        coord_font = (FONT_FAMILIES, scale_size(self.root, 10))
-        self.joystick_canvas.create_text(cx, cy + outer + JOYSTICK_COORD_OFFSET, text=coord_text, fill=FG_COLOR, font=coord_font)
+        # 只更新发生变化的部分
+        last_pos, last_color, last_text = self.joystick_drawn
+        pos = (int(ix), int(iy))
+        if pos != last_pos:
+            self.joystick_canvas.coords(self.joystick_knob, pos[0] - inner, pos[1] - inner, pos[0] + inner, pos[1] + inner)
+        if color != last_color:
+            self.joystick_canvas.itemconfig(self.joystick_knob, fill=color)
+        if coord_text != last_text:
+            self.joystick_canvas.itemconfig(self.joystick_coord, text=coord_text)
+        self.joystick_drawn = (pos, color, coord_text)
 
     def joystick_press(self, event):
         self.joystick_active = True
@@ -661,57 +754,155 @@ class MergedControlUI:
                 self.pan_angle = max(0, min(270, self.pan_angle))
                 self.tilt_angle = max(0, min(180, self.tilt_angle))
                 self.send_gimbal_cmd(self.pan_angle, self.tilt_angle)
-                self.angle_label.config(text=f"角度: {self.pan_angle:.0f}°, {self.tilt_angle:.0f}°")
-                self.angle_label_center.config(text=f"角度: {self.pan_angle:.0f}°, {self.tilt_angle:.0f}°")
+                self.ui.publish("angle", f"角度: {self.pan_angle:.0f}°, {self.tilt_angle:.0f}°")
             time.sleep(0.05)
 
     def send_gimbal_cmd(self, pan, tilt, trigger=0):
-        if self.gimbal_ser:
-            try:
-                pan_int = int(pan) & 0xFFFF
-                tilt_int = int(tilt) & 0xFFFF
-                data = bytes([
-                    (pan_int >> 8) & 0xFF,
-                    pan_int & 0xFF,
-                    (tilt_int >> 8) & 0xFF,
-                    tilt_int & 0xFF,
-                    trigger
-                ])
-                self.gimbal_ser.write(data)
-            except Exception as e:
-                self.log(f"云台命令发送失败: {e}")
+        # 任意线程调用，只更新输出级的最新状态，由输出级的线程决定是否发送
+        output = self.gimbal_output
+        if output:
+            output.set(pan, tilt, trigger)
+
+    def on_gimbal_telemetry(self, telemetry):
+        # 在遥测读取线程中调用：舵机实际角度交给追踪控制估计剩余转动时间
+        if self.pipeline:
+            self.pipeline.send("servo", (telemetry.pan, telemetry.tilt, telemetry.stamp))
+        else:
+            self.controller.set_servo_position(telemetry.pan, telemetry.tilt, telemetry.stamp)
+
+    def link_text(self):
+        parts = [obj.text() for obj in (self.gimbal_telemetry, self.gimbal_output, self.gimbal_link, self.motion_link) if obj]
+        return "".join(f"  {part}" for part in parts)
 
     def toggle_tracking(self):
         self.tracking_mode = not self.tracking_mode
         if self.tracking_mode:
+            self.controller.pan_angle = self.pan_angle
+            self.controller.tilt_angle = self.tilt_angle
+            if self.pipeline:
+                self.pipeline.send("tracking", (True, self.pan_angle, self.tilt_angle))
             self.tracking_button.configure(text="🟢 关闭追踪")
             self.log("追踪模式已开启")
         else:
             self.tracking_button.configure(text="🔴 开启追踪")
             self.log("追踪模式已关闭")
-            self.trigger_counter = 0
-            self.stable_frames = 0
-            self.stability_history.clear()
+            self.controller.reset()
+            self.display_slot.clear()
+            self.detector.reset()
+            self.last_hud = None
+            if self.pipeline:
+                self.pipeline.send("tracking", (False, self.pan_angle, self.tilt_angle))
+
+    def toggle_roi_search(self):
+        self.detector.roi_enabled = self.roi_var.get()
+        self.detector.reset()
+        if self.pipeline:
+            self.pipeline.send("roi", self.detector.roi_enabled)
+        self.log("追踪窗口搜索已" + ("开启" if self.detector.roi_enabled else "关闭"))
+
+    def on_pyramid_selected(self, event=None):
+        value = self.pyramid_var.get()
+        self.detector.pyramid_factor = 1 if value == "关闭" else int(value.rstrip("x"))
+        if self.pipeline:
+            self.pipeline.send("pyramid", self.detector.pyramid_factor)
+        self.log(f"金字塔检测: {value}")
+
+    def on_extractor_selected(self, event=None):
+        value = self.extractor_var.get()
+        self.detector.blob_extractor = "components" if value == "连通域" else "contour"
+        if self.pipeline:
+            self.pipeline.send("extractor", self.detector.blob_extractor)
+        self.log(f"色块提取: {value}")
+
+    def toggle_multi_target(self):
+        self.multi_target_mode = self.multi_var.get()
+        self.multi_target.reset()
+        self.controller.target.reset()
+        self.ui.publish("pin", "锁定: 无")
+        if self.pipeline:
+            self.pipeline.send("multi", self.multi_target_mode)
+        self.log("多目标模式已" + ("开启" if self.multi_target_mode else "关闭"))
+
+    def on_video_click(self, event):
+        # 画面固定 640x480 居中显示，换算为图像坐标
+        x = event.x - (self.video_label.winfo_width() - 640) / 2
+        y = event.y - (self.video_label.winfo_height() - 480) / 2
+        self.pin_target_at(x, y)
+
+    def pin_target_at(self, x, y):
+        # Tk 画面点击和 SDL 窗口点击（SDL 线程）共用
+        if not self.multi_target_mode:
+            return
+        if self.pipeline:
+            self.pipeline.send("pin", (x, y))
+            self.log(f"请求锁定 ({x:.0f}, {y:.0f}) 附近的目标")
+            return
+        track_id = self.multi_target.pin_nearest(x, y)
+        if track_id is None:
+            self.log("点击位置附近没有目标")
+        else:
+            self.controller.target.reset()
+            self.ui.publish("pin", f"锁定: #{track_id}")
+            self.log(f"已锁定目标 #{track_id}")
+
+    def unpin_target(self):
+        self.multi_target.unpin()
+        if self.pipeline:
+            self.pipeline.send("pin", None)
+        self.ui.publish("pin", "锁定: 无")
+        self.log("已解除目标锁定")
+
+    def on_debug_view_selected(self, event=None):
+        value = self.debug_view_var.get()
+        self.debug_view.set_mode(self.debug_view_names[value])
+        self.log(f"调试视图: {value}")
+
+    def on_rate_selected(self, event=None):
+        track = self.track_fps_var.get()
+        track_fps = 0 if track == "相机" else int(track)
+        display_fps = int(self.display_fps_var.get())
+        self.scheduler.set_rates(display_fps=display_fps, track_fps=track_fps)
+        if self.pipeline:
+            self.pipeline.send("track_fps", track_fps)
+        self.log(f"帧率: 追踪 {track}{'' if track_fps == 0 else 'fps'} / 预览 {display_fps}fps")
+
+    def on_latency_changed(self, value=None):
+        latency = self.controller.latency
+        latency.enabled = self.lead_var.get()
+        latency.gain = round(self.lead_gain_var.get(), 2)
+        latency.extra = round(self.lead_extra_var.get()) / 1000.0
+        self.lead_label.config(text=f"比例 {latency.gain:.2f} / 附加 {latency.extra * 1000:.0f}ms")
+        if self.pipeline:
+            self.pipeline.send("latency", (latency.enabled, latency.gain, latency.extra))
+
+    def toggle_color_lut(self):
+        enabled = self.lut_var.get()
+        try:
+            self.detector.enable_lut(enabled)
+        except Exception as e:
+            # 建表失败时检测器仍走 HSV，复选框跟着复位
+            self.detector.enable_lut(False)
+            self.lut_var.set(False)
+            self.log(f"颜色查表开启失败: {e}")
+            return
+        if self.pipeline:
+            self.pipeline.send("lut", enabled)
+        if enabled:
+            color_lut = self.detector.color_lut
+            source = "磁盘缓存" if color_lut.loaded_from_cache else "新建"
+            self.log(f"颜色查表已开启（{source}）")
+            if color_lut.cache_error:
+                self.log(f"颜色查表缓存: {color_lut.cache_error}")
+        else:
+            self.log("颜色查表已关闭")
 
     def fire_laser(self):
         if self.laser_firing or not self.gimbal_ser:
             return
         self.laser_firing = True
         self.laser_button.configure(text="🔥 发射中...", state='disabled')
-        try:
-            pan_int = int(self.pan_angle) & 0xFFFF
-            tilt_int = int(self.tilt_angle) & 0xFFFF
-            data = bytes([
-                (pan_int >> 8) & 0xFF,
-                pan_int & 0xFF,
-                (tilt_int >> 8) & 0xFF,
-                tilt_int & 0xFF,
-                2
-            ])
-            self.gimbal_ser.write(data)
-            self.log("激光发射命令已发送")
-        except Exception as e:
-            self.log(f"激光命令发送失败: {e}")
+        self.send_gimbal_cmd(self.pan_angle, self.tilt_angle, TRIGGER_LASER)
+        self.log("激光发射命令已发送")
         self.root.after(2000, self.laser_finished)
 
     def laser_finished(self):
@@ -723,12 +914,14 @@ class MergedControlUI:
             self.pan_angle = 135
             self.tilt_angle = 90
             self.send_gimbal_cmd(135, 90)
-            self.angle_label.config(text="角度: 135°, 90°")
-            self.angle_label_center.config(text="角度: 135°, 90°")
+            self.ui.publish("angle", "角度: 135°, 90°")
             self.log("云台归中")
 
     # 视频流
     def video_stream(self):
+        if PIPELINE_MODE:
+            self.pipeline_stream()
+            return
         self.cap = cv2.VideoCapture(0, cv2.CAP_V4L2)
         if not self.cap.isOpened():
             self.log("无法打开摄像头")
@@ -736,143 +929,199 @@ class MergedControlUI:
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         self.cap.set(cv2.CAP_PROP_FPS, 30)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # 采集线程持续排空驱动缓冲，追踪与显示各自取最新帧
+        self.capture = LatestFrameCapture(self.cap)
+        self.capture.start()
+        self.tracking_thread = threading.Thread(target=self.tracking_loop, daemon=True)
+        self.tracking_thread.start()
         frame_count = 0
         start_time = time.time()
+        last_slot, last_seq = None, 0
         while self.running and self.cap:
-            ret, frame = self.cap.read()
-            if not ret:
+            # 追踪模式显示带标注的追踪结果，否则直接显示最新采集帧
+            slot = self.display_slot if self.tracking_mode else self.capture.slot
+            if slot is not last_slot:
+                last_slot, last_seq = slot, 0
+            seq, stamp, frame = slot.get(last_seq, timeout=0.1)
+            if seq == last_seq:
+                continue
+            last_seq = seq
+            if frame is None:
+                continue
+            # 显示帧率由调度器决定，过载时先丢显示帧
+            if not self.scheduler.should_display():
+                continue
+            hud = None
+            if slot is self.display_slot:
+                frame, *hud = frame
+            if self.debug_view.active:
+                # 调试视图在原始帧上计算（HUD 的颜色不能混进掩膜），返回新图像
+                frame = self.debug_view.render(frame)
+            elif hud is not None:
+                # 原始帧仍被采集缓冲引用，在副本上叠加 HUD
+                frame = frame.copy()
+            if hud is not None:
+                frame = self.hud.compose(frame, *hud)
+            self.display_age.add(stamp)
+            frame_count += 1
+            self.present_frame(frame)
+            if frame_count % 30 == 0:
+                elapsed = time.time() - start_time
+                fps = frame_count / elapsed
+                self.ui.publish("status", f"FPS: {fps:.1f}  帧龄: 追踪 {self.track_age.text()} / 显示 {self.display_age.text()}  {self.scheduler.text()}{self.link_text()}")
+                frame_count = 0
+                start_time = time.time()
+
+    def tracking_loop(self):
+        # 每来一帧新图像就处理一次，帧龄 = 开始处理时刻 - 采集时刻
+        last_seq = 0
+        while self.running and self.capture:
+            if not self.tracking_mode:
+                time.sleep(0.02)
+                continue
+            seq, stamp, frame = self.capture.read(last_seq, timeout=0.1)
+            if frame is None or seq == last_seq:
+                continue
+            last_seq = seq
+            # 调度器在显示已降到下限仍超出延迟预算时降低追踪帧率
+            if not self.scheduler.should_track():
+                continue
+            track_start = time.monotonic()
+            self.track_age.add(stamp, track_start)
+            result, tracks, pinned_id = self.process_tracking(frame, stamp)
+            self.display_slot.put((frame, result, tracks, pinned_id), stamp)
+            self.scheduler.track_done(stamp, track_start)
+
+    # 多进程流水线：采集和追踪在子进程中，界面进程只负责显示和发送云台命令
+    def pipeline_stream(self):
+        self.pipeline = TrackingPipeline(camera_index=0)
+        self.pipeline.start({
+            "thresholds": (self.lower_red1, self.upper_red1, self.lower_red2, self.upper_red2),
+            "roi": self.detector.roi_enabled,
+            "pyramid": self.detector.pyramid_factor,
+            "extractor": self.detector.blob_extractor,
+            "lut": self.detector.color_lut is not None,
+            "latency": (self.controller.latency.enabled, self.controller.latency.gain, self.controller.latency.extra),
+            "multi": self.multi_target_mode,
+            "track_fps": 0 if self.track_fps_var.get() == "相机" else int(self.track_fps_var.get()),
+        })
+        self.log("多进程追踪流水线已启动")
+        self.tracking_thread = threading.Thread(target=self.pipeline_result_loop, daemon=True)
+        self.tracking_thread.start()
+        frame_count = 0
+        start_time = time.time()
+        last_seq = 0
+        while self.running and self.pipeline:
+            seq, stamp, frame = self.pipeline.latest_frame()
+            if frame is None or seq == last_seq:
+                time.sleep(0.005)
+                continue
+            last_seq = seq
+            if not self.scheduler.should_display():
                 continue
+            self.display_age.add(stamp)
             frame_count += 1
+            if self.debug_view.active:
+                frame = self.debug_view.render(frame)
             if self.tracking_mode:
-                frame = self.process_tracking(frame)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_pil = Image.fromarray(frame_rgb)
-            frame_pil = frame_pil.resize((640, 480), Image.Resampling.LANCZOS)
-            frame_tk = ImageTk.PhotoImage(frame_pil)
-            self.video_label.configure(image=frame_tk)
-            self.video_label.image = frame_tk
+                hud = self.last_hud
+                if hud is None:
+                    self.hud.compose(frame)
+                else:
+                    self.hud.compose(frame, *hud)
+            self.present_frame(frame)
             if frame_count % 30 == 0:
                 elapsed = time.time() - start_time
                 fps = frame_count / elapsed
-                self.status_text.config(text=f"FPS: {fps:.1f}")
+                self.ui.publish("status", f"FPS: {fps:.1f}  帧龄: 追踪 {self.track_age.text()} / 显示 {self.display_age.text()}  {self.scheduler.text()}{self.link_text()}  (多进程)")
                 frame_count = 0
                 start_time = time.time()
-            time.sleep(0.033)
+
+    def pipeline_result_loop(self):
+        while self.running and self.pipeline:
+            record = self.pipeline.get_result(timeout=0.1)
+            if record is None:
+                continue
+            seq, stamp, proc_time, values, tracks, pinned_id = record
+            if not self.tracking_mode:
+                continue
+            now = time.monotonic()
+            self.track_age.add(stamp, now)
+            # 追踪在子进程中进行，这里只把耗时计入调度，用于决定显示帧率
+            self.scheduler.track_done(stamp, now - proc_time, now)
+            if self.multi_target_mode:
+                self.ui.publish("pin", f"锁定: #{pinned_id}" if pinned_id else "锁定: 无")
+            result = TrackingResult(*values)
+            self.last_hud = (result, tracks, pinned_id)
+            self.apply_tracking_result(result)
 
     # 追踪处理
-    def process_tracking(self, frame):
+    def process_tracking(self, frame, stamp=None):
+        """检测 + PID，不在 frame 上绘制；返回 (追踪结果, 轨迹摘要, 锁定 ID) 供显示时叠加 HUD"""
         height, width = frame.shape[:2]
-        center_x, center_y = width // 2, height // 2
-        cv2.line(frame, (center_x-15, center_y), (center_x+15, center_y), (0, 255, 0), 2)
-        cv2.line(frame, (center_x, center_y-15), (center_x, center_y+15), (0, 255, 0), 2)
-        cv2.circle(frame, (center_x, center_y), self.CENTER_TOLERANCE, (0, 255, 0), 1)
-        x, y, radius = self.detect_red_target(frame)
-        trigger = False
-        if x is not None:
-            self.x_filter.add(x)
-            self.y_filter.add(y)
-            filtered_x = self.x_filter.get_filtered()
-            filtered_y = self.y_filter.get_filtered()
-            if filtered_x is not None and filtered_y is not None:
-                error_x = (filtered_x - center_x) / center_x
-                error_y = (filtered_y - center_y) / center_y
-                pan_output = self.pan_pid.compute(error_x)
-                tilt_output = self.tilt_pid.compute(error_y)
-                distance = np.sqrt((filtered_x - center_x)**2 + (filtered_y - center_y)**2)
-                if distance > 40:
-                    control_strength_pan = 70
-                    control_strength_tilt = 55
-                elif distance > 20:
-                    control_strength_pan = 60
-                    control_strength_tilt = 48
-                else:
-                    control_strength_pan = 50
-                    control_strength_tilt = 40
-                target_pan = 135 - pan_output * control_strength_pan
-                target_tilt = 90 + tilt_output * control_strength_tilt
-                self.pan_filter.add(target_pan)
-                self.tilt_filter.add(target_tilt)
-                filtered_pan = self.pan_filter.get_filtered()
-                filtered_tilt = self.tilt_filter.get_filtered()
-                if filtered_pan is not None and filtered_tilt is not None:
-                    smooth_pan = self.smooth_angle(filtered_pan, self.last_pan)
-                    smooth_tilt = self.smooth_angle(filtered_tilt, self.last_tilt)
-                    self.pan_angle = max(0, min(270, smooth_pan))
-                    self.tilt_angle = max(0, min(180, smooth_tilt))
-                    self.last_pan = self.pan_angle
-                    self.last_tilt = self.tilt_angle
-                    self.angle_label.config(text=f"角度: {self.pan_angle:.0f}°, {self.tilt_angle:.0f}°")
-                    self.angle_label_center.config(text=f"角度: {self.pan_angle:.0f}°, {self.tilt_angle:.0f}°")
-                self.stability_history.append(distance)
-                if len(self.stability_history) >= 5:
-                    recent_distances = list(self.stability_history)[-5:]
-                    distance_variance = np.var(recent_distances)
-                    if distance_variance < 2.0:
-                        self.stable_frames += 1
-                    else:
-                        self.stable_frames = 0
-                if (abs(error_x) < self.TRIGGER_THRESHOLD and 
-                    abs(error_y) < self.TRIGGER_THRESHOLD and 
-                    radius > 20 and
-                    self.stable_frames > 5):
-                    self.trigger_counter += 1
-                    if self.trigger_counter >= self.TRIGGER_DELAY:
-                        trigger = True
-                else:
-                    self.trigger_counter = max(0, self.trigger_counter - 1)
-                color = (0, 255, 0) if distance <= self.CENTER_TOLERANCE else (0, 0, 255)
-                cv2.circle(frame, (int(filtered_x), int(filtered_y)), int(radius), color, 2)
-                cv2.circle(frame, (int(filtered_x), int(filtered_y)), 3, color, -1)
-                cv2.line(frame, (int(filtered_x), int(filtered_y)), (center_x, center_y), (255, 255, 0), 1)
-                cv2.putText(frame, f"Distance: {distance:.1f}px", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
-                if trigger:
-                    cv2.putText(frame, "TARGET LOCKED!", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-                self.target_label.config(text=f"目标: 距离{distance:.1f}px")
-            self.send_gimbal_cmd(self.pan_angle, self.tilt_angle, 1 if trigger else 0)
+        tracks, pinned_id = [], None
+        if self.multi_target_mode:
+            x, y, radius, switched = self.multi_target.measure(self.detector.detect_candidates(frame))
+            if switched:
+                self.controller.target.reset()
+            tracks = self.multi_target.records()
+            pinned_id = self.multi_target.pinned_id
+            if pinned_id is None:
+                self.ui.publish("pin", "锁定: 无")
         else:
-            self.trigger_counter = 0
-            self.stable_frames = 0
-            self.stability_history.clear()
-            self.target_label.config(text="目标: 未检测")
-            self.send_gimbal_cmd(self.pan_angle, self.tilt_angle, 0)
-        return frame
+            x, y, radius = self.detect_red_target(frame)
+        result = self.controller.update(x, y, radius, width, height, stamp)
+        if result.found:
+            self.detector.set_hint(result.x, result.y, result.radius)
+        self.apply_tracking_result(result)
+        return result, tracks, pinned_id
+
+    def apply_tracking_result(self, result):
+        if result.found:
+            self.pan_angle = result.pan
+            self.tilt_angle = result.tilt
+            self.ui.publish("angle", f"角度: {self.pan_angle:.1f}°, {self.tilt_angle:.1f}°")
+            state = "外推" if result.coasting else "距离"
+            self.ui.publish("target", f"目标: {state}{result.distance:.1f}px  提前量 {result.horizon * 1000:.0f}ms")
+        else:
+            self.ui.publish("target", "目标: 未检测")
+        self.send_gimbal_cmd(self.pan_angle, self.tilt_angle, 1 if result.trigger else 0)
+
+    def start_sdl_video(self):
+        window = SdlVideoWindow(size=(640, 480), on_click=self.pin_target_at,
+                                on_frame_done=self.scheduler.display_done)
+        if window.start():
+            self.sdl_video = window
+            self.video_label.configure(text="视频在 SDL 窗口中显示")
+            self.log(f"SDL 视频窗口已启动（{window.backend}）")
+        else:
+            self.log(f"SDL 视频窗口不可用，改用界面内显示: {window.error}")
+
+    def present_frame(self, frame):
+        # SDL 窗口在自己的线程里显示，不经过 Tk 事件循环
+        if self.sdl_video is not None:
+            self.sdl_video.show(frame)
+        else:
+            self.ui.publish("video", frame)
+
+    # 以下在主线程由 UIDispatcher 调用
+    def show_video_frame(self, frame):
+        start = time.monotonic()
+        self.video_display.show(frame, (640, 480))
+        self.scheduler.display_done(start)
+
+    def show_angle(self, text):
+        self.angle_label.config(text=text)
+        self.angle_label_center.config(text=text)
 
     def detect_red_target(self, frame):
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask1 = cv2.inRange(hsv, self.lower_red1, self.upper_red1)
-        mask2 = cv2.inRange(hsv, self.lower_red2, self.upper_red2)
-        mask = cv2.bitwise_or(mask1, mask2)
-        kernel = np.ones((3, 3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            max_contour = max(contours, key=cv2.contourArea)
-            area = cv2.contourArea(max_contour)
-            if area > 200:
-                ((x, y), radius) = cv2.minEnclosingCircle(max_contour)
-                if radius > 8:
-                    return x, y, radius
-        return None, None, None
-
-    def smooth_angle(self, new_angle, last_angle):
-        diff = new_angle - last_angle
-        if abs(diff) < self.DEAD_ZONE:
-            return last_angle
-        if abs(diff) > self.MAX_ANGLE_CHANGE:
-            return last_angle + (self.MAX_ANGLE_CHANGE if diff > 0 else -self.MAX_ANGLE_CHANGE)
-        return new_angle
+        return self.detector.detect(frame)
 
     # 日志
     def log(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
-        self.log_lines.append(log_message)
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.insert(tk.END, ''.join(self.log_lines))
-        self.log_text.see(tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        # 任意线程可调用：日志框每 100ms 批量追加一次，完整日志异步写入 logs/
+        self.log_sink.write(message)
 
     # 键盘快捷键
     def on_key_press(self, event):
@@ -909,8 +1158,21 @@ class MergedControlUI:
 
     def close_application(self):
         self.running = False
+        self.ui.stop()
+        if self.sdl_video is not None:
+            self.sdl_video.stop()
+        self.log_sink.close()
+        if self.capture:
+            self.capture.stop()
+        if self.pipeline:
+            self.pipeline.stop()
         if self.cap:
             self.cap.release()
+        for link in (self.motion_link, self.gimbal_link):
+            if link:
+                link.stop()
+        if self.gimbal_telemetry:
+            self.gimbal_telemetry.stop(0)
         if self.motion_ser:
             self.motion_ser.close()
         if self.gimbal_ser:
@@ -963,51 +1225,78 @@ class MergedControlUI:
         self.root.mainloop()
 
     def on_window_resize(self, event):
-        # 只在主窗口变化时响应
+        # 只在主窗口变化时响应；拖动窗口边缘时会连续触发，等尺寸稳定后再统一缩放
         if event.widget == self.root:
-            w, h = event.width, event.height
-            scale_w = w / self.base_width
-            scale_h = h / self.base_height
-            self.scale_factor = min(scale_w, scale_h)
-            # 动态调整ttk.Style字体和按钮样式
-            style = ttk.Style(self.root)
-            size = max(8, int(BASE_SIZE * self.scale_factor))
-            btn_ipadx = int(16 * self.scale_factor)
-            btn_ipady = int(8 * self.scale_factor)
-            btn_padx = int(8 * self.scale_factor)
-            btn_pady = int(6 * self.scale_factor)
-            style.configure("TLabel", font=(FONT_FAMILIES, size))
-            style.configure("Title.TLabel", font=(FONT_FAMILIES, size+4, "bold"))
-            style.configure("Section.TLabelframe", font=(FONT_FAMILIES, size+1, "bold"))
-            style.configure("Section.TLabelframe.Label", font=(FONT_FAMILIES, size+1, "bold"))
-            style.configure("TButton", font=(FONT_FAMILIES, size, "bold"), padding=(btn_ipadx, btn_ipady))
-            style.configure("Accent.TLabel", font=(FONT_FAMILIES, size+1, "bold"))
-            style.configure("Error.TLabel", font=(FONT_FAMILIES, size+1, "bold"))
-            style.configure("Success.TLabel", font=(FONT_FAMILIES, size+1, "bold"))
-            style.configure("Normal.TLabel", font=(FONT_FAMILIES, size+1, "bold"))
-            style.configure("Success.TButton", font=(FONT_FAMILIES, size, "bold"), padding=(btn_ipadx, btn_ipady))
-            style.configure("Error.TButton", font=(FONT_FAMILIES, size, "bold"), padding=(btn_ipadx, btn_ipady))
-            style.configure("Connect.TButton", font=(FONT_FAMILIES, size, "bold"), padding=(btn_ipadx, btn_ipady))
-            style.configure("Disconnect.TButton", font=(FONT_FAMILIES, size, "bold"), padding=(btn_ipadx, btn_ipady))
-            # 居中主内容Frame
-            offset_x = int((w - self.base_width * self.scale_factor) / 2)
-            offset_y = int((h - self.base_height * self.scale_factor) / 2)
-            self.main_frame.place(x=offset_x, y=offset_y,
-                                 width=int(self.base_width * self.scale_factor),
-                                 height=int(self.base_height * self.scale_factor))
-            # 递归调整所有按钮的padx/pady
+            self._pending_size = (event.width, event.height)
+            if self._resize_after_id is not None:
+                self.root.after_cancel(self._resize_after_id)
+            self._resize_after_id = self.root.after(RESIZE_SETTLE_MS, self.apply_window_resize)
+
+    def apply_window_resize(self):
+        self._resize_after_id = None
+        w, h = self._pending_size
+        # 缩放比例按 SCALE_STEP 向下取整：缩放后的布局不会超出窗口，窗口尺寸微调时也不会触发整套样式重设
+        scale = min(w / self.base_width, h / self.base_height)
+        self.scale_factor = max(SCALE_STEP, round(math.floor(scale / SCALE_STEP + 1e-9) * SCALE_STEP, 2))
+        # 居中主内容Frame（开销很小，每次都做）
+        offset_x = int((w - self.base_width * self.scale_factor) / 2)
+        offset_y = int((h - self.base_height * self.scale_factor) / 2)
+        self.main_frame.place(x=offset_x, y=offset_y,
+                             width=int(self.base_width * self.scale_factor),
+                             height=int(self.base_height * self.scale_factor))
+        if self.scale_factor == self._applied_scale:
+            return
+        self._applied_scale = self.scale_factor
+        styles, btn_padding = self.style_set(self.scale_factor)
+        # 动态调整ttk.Style字体和按钮样式，只重设和当前不同的样式
+        style = ttk.Style(self.root)
+        for name, options in styles.items():
+            if self._applied_styles.get(name) != options:
+                style.configure(name, **options)
+                self._applied_styles[name] = options
+        # 递归调整所有按钮的padx/pady
+        if btn_padding != self._applied_btn_padding:
+            self._applied_btn_padding = btn_padding
             def update_button_padding(widget):
                 for child in widget.winfo_children():
                     if isinstance(child, ttk.Button):
-                        child.configure(padding=(btn_padx, btn_pady))
+                        child.configure(padding=btn_padding)
                     update_button_padding(child)
             update_button_padding(self.main_frame)
-            # 动态调整摇杆Canvas尺寸并重绘
-            if hasattr(self, "joystick_canvas"):
-                joy_size = max(120, int(220 * self.scale_factor))
-                self.joystick_canvas.config(width=joy_size, height=joy_size)
-                self.draw_joystick()
-            self.update_widget_scale()
+        # 动态调整摇杆Canvas尺寸并重绘
+        if hasattr(self, "joystick_canvas"):
+            joy_size = max(120, int(220 * self.scale_factor))
+            self.joystick_canvas.config(width=joy_size, height=joy_size)
+            self.build_joystick()
+        self.update_widget_scale()
+
+    def style_set(self, scale):
+        """按缩放档位缓存的样式参数，返回 ({样式名: 选项}, 按钮 padding)"""
+        cached = self._style_cache.get(scale)
+        if cached is not None:
+            return cached
+        size = max(8, int(BASE_SIZE * scale))
+        btn_ipad = (int(16 * scale), int(8 * scale))
+        label = {"font": (FONT_FAMILIES, size + 1, "bold")}
+        button = {"font": (FONT_FAMILIES, size, "bold"), "padding": btn_ipad}
+        styles = {
+            "TLabel": {"font": (FONT_FAMILIES, size)},
+            "Title.TLabel": {"font": (FONT_FAMILIES, size + 4, "bold")},
+            "Section.TLabelframe": label,
+            "Section.TLabelframe.Label": label,
+            "TButton": button,
+            "Accent.TLabel": label,
+            "Error.TLabel": label,
+            "Success.TLabel": label,
+            "Normal.TLabel": label,
+            "Success.TButton": button,
+            "Error.TButton": button,
+            "Connect.TButton": button,
+            "Disconnect.TButton": button,
+        }
+        cached = (styles, (int(8 * scale), int(6 * scale)))
+        self._style_cache[scale] = cached
+        return cached
 
 if __name__ == "__main__":
     app = MergedControlUI()
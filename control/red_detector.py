@@ -0,0 +1,269 @@
+"""
+红色目标检测
+
+在原来整帧 HSV 阈值 + 形态学 + 轮廓的基础上，增加追踪窗口(ROI)模式：
+只在上一帧滤波位置附近的区域内搜索，丢失时窗口逐步放大，
+连续丢失 N 帧后退回整帧搜索，使每帧检测开销随目标大小而不是画面大小变化。
+
+金字塔模式：先在 2x/4x 缩小的图像上阈值化找候选区域，再只在胜出区域的
+外接矩形内按原分辨率精确计算质心和半径，面积/半径门限按缩放比例换算。
+
+多目标模式：detect_candidates 返回所有合格色块（按面积取前 max_candidates 个），
+供 target_association 做跨帧关联。
+
+色块提取有两种实现：findContours 轮廓（默认）和 connectedComponentsWithStats
+连通域统计，后者一次得到面积、质心和外接矩形，可用 bench_blob_extract.py 在
+录制的画面上比较两者，按平台选用更快的一种。
+
+查表模式：用 ColorLUT 预烘焙的 BGR 查表一次得到颜色掩膜，替代 HSV 双 inRange。
+"""
+
+import cv2
+import numpy as np
+
+from color_lut import ColorLUT
+
+
+class RedTargetDetector:
+    """红色目标检测器"""
+    def __init__(self, lower_red1, upper_red1, lower_red2, upper_red2,
+                 min_area=200, min_radius=8):
+        self.lower_red1 = lower_red1
+        self.upper_red1 = upper_red1
+        self.lower_red2 = lower_red2
+        self.upper_red2 = upper_red2
+        self.min_area = min_area
+        self.min_radius = min_radius
+        self.kernel = np.ones((3, 3), np.uint8)
+
+        # 追踪窗口参数
+        self.roi_enabled = True
+        self.roi_min_half = 48      # 窗口最小半边长(px)
+        self.roi_radius_scale = 3.0  # 窗口半边长 = 目标半径 * scale
+        self.roi_grow = 1.6         # 每丢失一帧窗口放大倍数
+        self.roi_max_misses = 3     # 连续丢失多少帧后退回整帧搜索
+
+        # 金字塔参数（1 表示关闭，2/4 为粗检测缩小倍数）
+        self.pyramid_factor = 1
+        self.coarse_area_ratio = 0.5  # 粗检测面积门限放宽比例，避免漏掉原分辨率下合格的目标
+
+        # 色块提取方式："contour" 轮廓 / "components" 连通域统计
+        self.blob_extractor = "contour"
+
+        # 多目标模式每帧最多保留的候选数
+        self.max_candidates = 6
+
+        # 颜色查表（None 表示使用 HSV 双 inRange）
+        self.color_lut = None
+
+        self.hint = None            # 上一帧滤波位置 (x, y, radius)
+        self.misses = 0
+        self.last_roi = None        # 最近一次搜索区域 (x0, y0, x1, y1)
+        self.roi_searches = 0
+        self.full_searches = 0
+
+    def set_thresholds(self, lower_red1, upper_red1, lower_red2, upper_red2):
+        self.lower_red1 = lower_red1
+        self.upper_red1 = upper_red1
+        self.lower_red2 = lower_red2
+        self.upper_red2 = upper_red2
+        if self.color_lut is not None:
+            self.color_lut.set_ranges(self._hsv_ranges())
+
+    def enable_lut(self, enabled=True, bits=8):
+        """开启/关闭颜色查表，开启时按当前阈值建表（有磁盘缓存时直接加载）"""
+        if enabled:
+            if self.color_lut is None or self.color_lut.bits != bits:
+                self.color_lut = ColorLUT(self._hsv_ranges(), bits=bits)
+        else:
+            self.color_lut = None
+
+    def _hsv_ranges(self):
+        return [(self.lower_red1, self.upper_red1), (self.lower_red2, self.upper_red2)]
+
+    def set_hint(self, x, y, radius):
+        """更新追踪窗口中心（一般为滤波后的目标位置）"""
+        self.hint = (x, y, radius)
+
+    def reset(self):
+        self.hint = None
+        self.misses = 0
+        self.last_roi = None
+
+    def detect(self, frame):
+        """返回 (x, y, radius)，未检测到时返回 (None, None, None)"""
+        height, width = frame.shape[:2]
+        roi = self._search_window(width, height)
+        if roi is not None:
+            self.roi_searches += 1
+            x0, y0, x1, y1 = roi
+            result, cut = self._detect_region(frame[y0:y1, x0:x1], x0, y0, roi, width, height)
+            if result is not None:
+                self.misses = 0
+                return result
+            if not cut:
+                self.misses += 1
+                if self.misses <= self.roi_max_misses:
+                    return None, None, None
+            # 窗口内连续丢失或目标被窗口截断，本帧直接退回整帧搜索
+        self.full_searches += 1
+        self.last_roi = (0, 0, width, height)
+        result, _ = self._detect_region(frame, 0, 0, None, width, height)
+        if result is not None:
+            self.misses = 0
+            return result
+        self.hint = None
+        return None, None, None
+
+    def detect_candidates(self, frame):
+        """整帧检测所有合格色块，返回 [(x, y, radius, area, (bx, by, bw, bh)), ...]，按面积降序"""
+        if self.pyramid_factor > 1:
+            blobs = self._coarse_candidates(frame)
+        else:
+            blobs = [(b, 0, 0) for b in self.extract_blobs(self.build_mask(frame), self.min_area, self.max_candidates)]
+        candidates = []
+        for (x, y, radius, area, (rx, ry, rw, rh)), bx, by in blobs:
+            if area <= self.min_area or radius <= self.min_radius:
+                continue
+            candidates.append((x + bx, y + by, radius, area, (rx + bx, ry + by, rw, rh)))
+        candidates.sort(key=lambda c: c[3], reverse=True)
+        return candidates
+
+    def _coarse_candidates(self, frame):
+        """金字塔模式下的多候选：缩小图上取前 N 个色块，逐个在原分辨率细化"""
+        f = self.pyramid_factor
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (max(1, w // f), max(1, h // f)), interpolation=cv2.INTER_NEAREST)
+        coarse_min = self.min_area * self.coarse_area_ratio / (f * f)
+        blobs = []
+        pad = 2 * f
+        for coarse in self.extract_blobs(self.build_mask(small), coarse_min, self.max_candidates):
+            cx, cy, cw, ch = coarse[4]
+            x0 = max(0, cx * f - pad)
+            y0 = max(0, cy * f - pad)
+            x1 = min(w, (cx + cw) * f + pad)
+            y1 = min(h, (cy + ch) * f + pad)
+            fine = self._largest_blob(self.build_mask(frame[y0:y1, x0:x1]))
+            if fine is not None:
+                blobs.append((fine, x0, y0))
+        return blobs
+
+    def extract_blobs(self, mask, min_area=0, limit=None):
+        """返回面积大于 min_area 的色块 [(x, y, radius, area, (bx, by, bw, bh)), ...]，
+        按面积降序，最多 limit 个，坐标相对 mask"""
+        if self.blob_extractor == "components":
+            return self._component_blobs(mask, min_area, limit)
+        return self._contour_blobs(mask, min_area, limit)
+
+    @staticmethod
+    def _contour_blobs(mask, min_area, limit):
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        scored = [(cv2.contourArea(c), c) for c in contours]
+        scored = [item for item in scored if item[0] > min_area]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        blobs = []
+        for area, contour in scored[:limit]:
+            ((x, y), radius) = cv2.minEnclosingCircle(contour)
+            blobs.append((x, y, radius, area, cv2.boundingRect(contour)))
+        return blobs
+
+    @staticmethod
+    def _component_blobs(mask, min_area, limit):
+        """连通域统计：面积为像素数，中心为质心，半径取外接矩形长边的一半"""
+        # 16 位标签图比默认的 32 位快很多；掩膜经过开运算，色块数远小于 65535
+        n, _, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+            mask, 8, cv2.CV_16U, cv2.CCL_DEFAULT)
+        if n <= 1:
+            return []
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        keep = np.flatnonzero(areas > min_area)
+        keep = keep[np.argsort(areas[keep])[::-1]][:limit]
+        blobs = []
+        for i in keep + 1:
+            bx, by, bw, bh, area = (int(v) for v in stats[i])
+            blobs.append((float(centroids[i, 0]), float(centroids[i, 1]), max(bw, bh) / 2.0,
+                          float(area), (bx, by, bw, bh)))
+        return blobs
+
+    def _largest_blob(self, mask):
+        blobs = self.extract_blobs(mask, -1, 1)
+        return blobs[0] if blobs else None
+
+    def _search_window(self, width, height):
+        if not self.roi_enabled or self.hint is None or self.misses > self.roi_max_misses:
+            return None
+        x, y, radius = self.hint
+        half = max(self.roi_min_half, radius * self.roi_radius_scale)
+        half *= self.roi_grow ** self.misses
+        x0 = max(0, int(x - half))
+        y0 = max(0, int(y - half))
+        x1 = min(width, int(x + half) + 1)
+        y1 = min(height, int(y + half) + 1)
+        if x1 - x0 >= width and y1 - y0 >= height:
+            return None
+        self.last_roi = (x0, y0, x1, y1)
+        return x0, y0, x1, y1
+
+    def _detect_region(self, region, ox, oy, roi, width, height):
+        """返回 (结果, 是否被窗口截断)"""
+        if self.pyramid_factor > 1:
+            blob, bx, by = self._coarse_to_fine(region)
+        else:
+            blob, bx, by = self._largest_blob(self.build_mask(region)), 0, 0
+        if blob is None:
+            return None, False
+        x, y, radius, area, (rx, ry, rw, rh) = blob
+        if roi is not None:
+            if self._touches_cut((rx + bx, ry + by, rw, rh), roi, width, height):
+                # 目标被窗口边缘截断，质心和半径不可靠，交给整帧搜索
+                return None, True
+        if area <= self.min_area:
+            return None, False
+        if radius <= self.min_radius:
+            return None, False
+        return (x + bx + ox, y + by + oy, radius), False
+
+    def _coarse_to_fine(self, region):
+        """缩小图上找候选，原分辨率下只在候选外接矩形内精确计算
+
+        返回 (色块, 色块坐标相对 region 的偏移 x, y)
+        """
+        f = self.pyramid_factor
+        h, w = region.shape[:2]
+        small = cv2.resize(region, (max(1, w // f), max(1, h // f)), interpolation=cv2.INTER_NEAREST)
+        coarse = self._largest_blob(self.build_mask(small))
+        if coarse is None:
+            return None, 0, 0
+        # 粗检测门限：面积按 f^2 换算并适当放宽，最终门限在原分辨率下判断
+        if coarse[3] * f * f <= self.min_area * self.coarse_area_ratio:
+            return None, 0, 0
+        cx, cy, cw, ch = coarse[4]
+        pad = 2 * f
+        x0 = max(0, cx * f - pad)
+        y0 = max(0, cy * f - pad)
+        x1 = min(w, (cx + cw) * f + pad)
+        y1 = min(h, (cy + ch) * f + pad)
+        fine = self._largest_blob(self.build_mask(region[y0:y1, x0:x1]))
+        return fine, x0, y0
+
+    def build_mask(self, bgr):
+        color_lut = self.color_lut
+        if color_lut is not None:
+            mask = color_lut.apply(bgr)
+        else:
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+            mask1 = cv2.inRange(hsv, self.lower_red1, self.upper_red1)
+            mask2 = cv2.inRange(hsv, self.lower_red2, self.upper_red2)
+            mask = cv2.bitwise_or(mask1, mask2)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+        return mask
+
+    @staticmethod
+    def _touches_cut(rect, roi, width, height):
+        """外接矩形是否贴住了窗口的内侧边（画面本身的边缘不算）"""
+        bx, by, bw, bh = rect
+        x0, y0, x1, y1 = roi
+        rw, rh = x1 - x0, y1 - y0
+        return ((bx <= 0 and x0 > 0) or (by <= 0 and y0 > 0) or
+                (bx + bw >= rw and x1 < width) or (by + bh >= rh and y1 < height))
@@ -0,0 +1,122 @@
+"""
+SDL 视频窗口（可选）
+
+Tk 的 Label 显示 30fps 的 640x480 画面开销较大，而且要和按钮事件共用 Tk 事件循环。
+启用后摄像头画面（含 HUD）改由独立线程中的 SDL 窗口显示，Tk 界面只保留控制面板：
+优先用 SDL 渲染器 + 流式纹理（可用时走 GPU），创建失败时退回 SDL 软件表面。
+依赖 pygame（SDL2 绑定），未安装时 SDL_AVAILABLE 为 False，由调用方退回 Tk 显示。
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+try:
+    import pygame
+    SDL_AVAILABLE = True
+except ImportError:
+    pygame = None
+    SDL_AVAILABLE = False
+
+
+class SdlVideoWindow:
+    """在独立线程中运行的 SDL 视频窗口，show() 只替换待显示的最新帧"""
+    def __init__(self, size=(640, 480), title="实时图传", on_click=None, on_frame_done=None):
+        self.size = size
+        self.title = title
+        self.on_click = on_click            # on_click(x, y)，在 SDL 线程中调用
+        self.on_frame_done = on_frame_done  # on_frame_done(开始时间)，用于统计显示耗时
+        self.backend = None                 # "renderer" 或 "software"
+        self.error = None
+        self._frame = None
+        self._event = threading.Event()
+        self._ready = threading.Event()
+        self._running = False
+        self._thread = None
+        self.presented = 0
+
+    def start(self, timeout=3.0):
+        """启动窗口线程，返回是否创建成功"""
+        if not SDL_AVAILABLE:
+            self.error = "未安装 pygame"
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self.backend is not None
+
+    def show(self, frame):
+        """任意线程调用：提交一帧 BGR 图像（调用后不要再修改该图像）"""
+        self._frame = frame
+        self._event.set()
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        self._event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _open(self):
+        w, h = self.size
+        # 共享同一块 RGB 缓冲的 SDL 表面，每帧只做一次颜色转换
+        self._rgb = np.zeros((h, w, 3), np.uint8)
+        self._surface = pygame.image.frombuffer(self._rgb, (w, h), "RGB")
+        try:
+            from pygame._sdl2.video import Window, Renderer, Texture
+            self._window = Window(self.title, size=(w, h))
+            self._renderer = Renderer(self._window, accelerated=1, vsync=False)
+            self._texture = Texture(self._renderer, (w, h), streaming=True)
+            self.backend = "renderer"
+        except Exception:
+            # 没有可用的渲染器时退回软件表面
+            self._screen = pygame.display.set_mode((w, h))
+            pygame.display.set_caption(self.title)
+            self.backend = "software"
+
+    def _present(self, frame):
+        w, h = self.size
+        if frame.shape[1] != w or frame.shape[0] != h:
+            frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        if self.backend == "renderer":
+            self._texture.update(self._surface)
+            self._renderer.clear()
+            self._texture.draw()
+            self._renderer.present()
+        else:
+            self._screen.blit(self._surface, (0, 0))
+            pygame.display.flip()
+        self.presented += 1
+
+    def _run(self):
+        try:
+            pygame.display.init()
+            self._open()
+        except Exception as e:
+            self.error = str(e)
+            self.backend = None
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            while self._running:
+                for event in pygame.event.get():
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.on_click:
+                        self.on_click(*event.pos)
+                # 等新帧，同时保证至少每 50ms 处理一次窗口事件
+                if not self._event.wait(0.05):
+                    continue
+                self._event.clear()
+                frame, self._frame = self._frame, None
+                if frame is None:
+                    continue
+                start = time.monotonic()
+                self._present(frame)
+                if self.on_frame_done:
+                    self.on_frame_done(start)
+        finally:
+            pygame.display.quit()
@@ -0,0 +1,141 @@
+"""
+单写者串口传输
+
+每个串口一个传输对象，只有它的写线程调用 ser.write，视频线程、控制线程和 Tk 回调
+都只往队列里放命令，不会再出现两条命令的字节交错写出。按优先级取命令：
+
+    urgent    高优先级（紧急停止、激光），排在所有普通命令之前，可同时清空其余队列
+    normal    普通命令，先进先出，有界队列，满了拒绝新命令并计数
+    source    最新值通道（流式设定值），由外部对象（如 GimbalOutput）提供，
+              写线程空闲时调用 source.poll(now) 取最新值，只保留一个
+
+framer 只用于最新值通道和入队时标记 frame=True 的命令，其余命令按原样写出，
+同一个串口上的原始文本命令不会被送进编码器。
+每条命令记录入队到写出完成的延迟，按通道统计平均值和最大值。
+"""
+
+import threading
+import time
+from collections import deque
+
+LANES = ("urgent", "normal", "source")
+
+
+class SerialTransport:
+    """单个串口的写线程和优先级队列"""
+    def __init__(self, ser, name="", framer=None, max_queue=32, on_error=None, alpha=0.1):
+        self.ser = ser
+        self.name = name
+        self.framer = framer            # framer(命令) -> bytes，在写出时调用，帧序号按实际发送顺序递增；只用于需要编码的命令
+        self.max_queue = max_queue
+        self.on_error = on_error        # on_error(异常)，在写线程中调用
+        self.alpha = alpha
+        self.source = None              # 最新值通道
+        self._urgent = deque()
+        self._normal = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self.counters = {"sent": 0, "rejected": 0, "flushed": 0, "errors": 0}
+        self.latency = {lane: [0.0, 0.0] for lane in LANES}   # 通道 -> [平均, 最大](s)
+
+    def set_source(self, source):
+        """source 需提供 poll(now) -> (命令, 入队时间) 或 None，以及 wait_time(now) -> 秒数或 None"""
+        with self._cond:
+            self.source = source
+            self._cond.notify()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def send(self, item, frame=False):
+        """普通命令入队，队列满时返回 False；frame 为 True 时写出前经 framer 编码"""
+        with self._cond:
+            return self._put(self._normal, item, frame)
+
+    def send_urgent(self, item, flush=False, frame=False):
+        """高优先级命令，flush 为 True 时丢弃所有尚未写出的普通命令"""
+        # 清空和入队在同一次加锁内完成，其他线程的普通命令不会插在紧急命令前面
+        with self._cond:
+            if flush:
+                self.counters["flushed"] += len(self._normal)
+                self._normal.clear()
+            return self._put(self._urgent, item, frame)
+
+    def wake(self):
+        """最新值通道有新值时调用"""
+        with self._cond:
+            self._cond.notify()
+
+    def _put(self, queue, item, frame):
+        # 调用方持有 self._cond
+        if len(queue) >= self.max_queue:
+            self.counters["rejected"] += 1
+            return False
+        queue.append((item, time.monotonic(), frame))
+        self._cond.notify()
+        return True
+
+    def _next(self, now):
+        if self._urgent:
+            return "urgent", self._urgent.popleft()
+        if self._normal:
+            return "normal", self._normal.popleft()
+        if self.source is not None:
+            entry = self.source.poll(now)
+            if entry is not None:
+                return "source", entry + (True,)
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    now = time.monotonic()
+                    lane, entry = self._next(now)
+                    if entry is not None:
+                        break
+                    wait = self.source.wait_time(now) if self.source is not None else None
+                    self._cond.wait(0.5 if wait is None else min(wait, 0.5))
+            item, stamp, frame = entry
+            try:
+                self.ser.write(self.framer(item) if frame and self.framer else item)
+            except Exception as e:
+                with self._cond:
+                    self.counters["errors"] += 1
+                if self.on_error:
+                    self.on_error(e)
+                continue
+            delay = time.monotonic() - stamp
+            with self._cond:
+                self.counters["sent"] += 1
+                stat = self.latency[lane]
+                stat[0] = delay if stat[0] == 0.0 else stat[0] + self.alpha * (delay - stat[0])
+                stat[1] = max(stat[1], delay)
+
+    def snapshot(self):
+        with self._cond:
+            data = dict(self.counters)
+            for lane, (avg, peak) in self.latency.items():
+                data[f"{lane}_ms"] = avg * 1000.0
+                data[f"{lane}_max_ms"] = peak * 1000.0
+            data["queued"] = len(self._urgent) + len(self._normal)
+            return data
+
+    def text(self):
+        s = self.snapshot()
+        return (f"{self.name}链路: 紧急 {s['urgent_ms']:.1f}/{s['urgent_max_ms']:.1f}ms "
+                f"普通 {s['normal_ms']:.1f}/{s['normal_max_ms']:.1f}ms "
+                f"设定值 {s['source_ms']:.1f}/{s['source_max_ms']:.1f}ms")
@@ -0,0 +1,165 @@
+"""
+多目标关联
+
+为每帧的所有合格红色色块维护跨帧 ID：按上一帧位置做最近邻 + IoU 门限的贪心匹配，
+候选数和轨迹数都有上限，每帧开销固定。操作员可以锁定（pin）某个 ID，
+追踪控制只跟随被锁定或当前正在跟随的目标，画面中出现更大的红色物体也不会跳锁。
+
+关联在追踪线程中进行，锁定来自 Tk/SDL 的点击回调，轨迹表和锁定/跟随 ID 都在同一把锁下读写。
+"""
+
+import math
+import threading
+
+
+class Track:
+    """一条目标轨迹"""
+    def __init__(self, track_id, candidate):
+        self.id = track_id
+        self.hits = 0
+        self.misses = 0
+        self.assign(candidate)
+
+    def assign(self, candidate):
+        self.x, self.y, self.radius, self.area, self.bbox = candidate
+        self.hits += 1
+        self.misses = 0
+
+    def as_record(self):
+        return (self.id, self.x, self.y, self.radius, self.misses == 0)
+
+
+def bbox_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    if inter == 0:
+        return 0.0
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class MultiTargetTracker:
+    """最近邻/IoU 多目标关联"""
+    def __init__(self, max_tracks=8, max_distance=80.0, min_iou=0.1, max_misses=5, min_hits=2):
+        self.max_tracks = max_tracks
+        self.max_distance = max_distance  # 中心距离门限(px)，实际门限不小于 2 倍半径
+        self.min_iou = min_iou
+        self.max_misses = max_misses      # 连续多少帧未匹配后删除轨迹
+        self.min_hits = min_hits          # 自动选择目标前至少连续命中帧数
+        self.enabled = False              # 是否处于多目标模式
+        self.tracks = []
+        self.next_id = 1
+        self.pinned_id = None             # 操作员锁定的 ID
+        self.selected_id = None           # 当前跟随的 ID
+        self._lock = threading.RLock()
+
+    def reset(self):
+        with self._lock:
+            self.tracks = []
+            self.selected_id = None
+            self.pinned_id = None
+
+    def pin(self, track_id):
+        with self._lock:
+            if any(t.id == track_id for t in self.tracks):
+                self.pinned_id = track_id
+                self.selected_id = track_id
+                return True
+            return False
+
+    def unpin(self):
+        with self._lock:
+            self.pinned_id = None
+
+    def pin_nearest(self, x, y):
+        """锁定离 (x, y) 最近的轨迹，返回其 ID（可在界面线程调用）"""
+        with self._lock:
+            best = None
+            best_d = None
+            for t in self.tracks:
+                d = math.hypot(t.x - x, t.y - y)
+                if d <= max(t.radius * 2, 30) and (best_d is None or d < best_d):
+                    best, best_d = t, d
+            if best is None:
+                return None
+            self.pin(best.id)
+            return best.id
+
+    def update(self, candidates):
+        """输入本帧候选，返回存活轨迹列表"""
+        with self._lock:
+            return self._update(candidates)
+
+    def _update(self, candidates):
+        pairs = []
+        for ti, t in enumerate(self.tracks):
+            gate = max(self.max_distance, t.radius * 2)
+            for ci, c in enumerate(candidates):
+                d = math.hypot(c[0] - t.x, c[1] - t.y)
+                iou = bbox_iou(t.bbox, c[4])
+                if d <= gate or iou >= self.min_iou:
+                    # IoU 高的优先，其次距离近的
+                    pairs.append((d * (1.0 - iou), ti, ci))
+        pairs.sort(key=lambda p: p[0])
+        used_tracks = set()
+        used_cands = set()
+        # 当前跟随的轨迹先匹配（沿用上一帧的分配）
+        selected = [p for p in pairs if self.tracks[p[1]].id == self.selected_id]
+        for _, ti, ci in selected + pairs:
+            if ti in used_tracks or ci in used_cands:
+                continue
+            self.tracks[ti].assign(candidates[ci])
+            used_tracks.add(ti)
+            used_cands.add(ci)
+        for ti, t in enumerate(self.tracks):
+            if ti not in used_tracks:
+                t.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        for ci, c in enumerate(candidates):
+            if ci in used_cands or len(self.tracks) >= self.max_tracks:
+                continue
+            self.tracks.append(Track(self.next_id, c))
+            self.next_id += 1
+        alive = {t.id for t in self.tracks}
+        if self.pinned_id is not None and self.pinned_id not in alive:
+            self.pinned_id = None
+        if self.selected_id is not None and self.selected_id not in alive:
+            self.selected_id = None
+        return self.tracks
+
+    def select(self):
+        """返回本帧要跟随的轨迹：锁定 ID > 当前跟随 ID > 面积最大的已确认轨迹"""
+        with self._lock:
+            return self._select()
+
+    def _select(self):
+        by_id = {t.id: t for t in self.tracks}
+        if self.pinned_id is not None:
+            self.selected_id = self.pinned_id
+            return by_id.get(self.pinned_id)
+        if self.selected_id in by_id:
+            return by_id[self.selected_id]
+        confirmed = [t for t in self.tracks if t.misses == 0 and t.hits >= self.min_hits]
+        if not confirmed:
+            return None
+        best = max(confirmed, key=lambda t: t.area)
+        self.selected_id = best.id
+        return best
+
+    def measure(self, candidates):
+        """关联并选择目标，返回 (x, y, radius, 是否换了目标)；所选目标本帧未出现时 x 为 None"""
+        with self._lock:
+            previous = self.selected_id
+            self._update(candidates)
+            track = self._select()
+            switched = track is not None and previous is not None and track.id != previous
+            if track is None or track.misses > 0:
+                return None, None, None, switched
+            return track.x, track.y, track.radius, switched
+
+    def records(self):
+        """HUD/回传用的轨迹摘要 [(id, x, y, radius, 本帧是否出现), ...]"""
+        with self._lock:
+            return [t.as_record() for t in self.tracks]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# control/ 下的模块按同目录方式互相导入（from color_lut import ColorLUT）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,87 @@
+"""连通域统计提取色块的正确性，以及与轮廓提取的一致性"""
+
+import cv2
+import numpy as np
+import pytest
+
+from red_detector import RedTargetDetector
+
+
+def make_detector(extractor):
+    detector = RedTargetDetector(np.array([0, 120, 120]), np.array([10, 255, 255]),
+                                 np.array([160, 120, 120]), np.array([180, 255, 255]))
+    detector.blob_extractor = extractor
+    return detector
+
+
+def scene():
+    """大小不同、互不接触的圆和矩形"""
+    mask = np.zeros((480, 640), np.uint8)
+    cv2.circle(mask, (120, 100), 40, 255, -1)
+    cv2.circle(mask, (400, 300), 25, 255, -1)
+    cv2.rectangle(mask, (500, 40), (579, 89), 255, -1)     # 80x50
+    cv2.rectangle(mask, (60, 380), (69, 389), 255, -1)     # 10x10
+    return mask
+
+
+def test_components_rectangle_exact():
+    mask = np.zeros((100, 120), np.uint8)
+    mask[20:50, 30:90] = 255
+    blobs = make_detector("components").extract_blobs(mask)
+    assert len(blobs) == 1
+    x, y, radius, area, rect = blobs[0]
+    assert area == 30 * 60
+    assert rect == (30, 20, 60, 30)
+    assert (x, y) == pytest.approx((59.5, 34.5))
+    assert radius == 30.0
+
+
+def test_components_sorted_filtered_limited():
+    detector = make_detector("components")
+    blobs = detector.extract_blobs(scene())
+    areas = [b[3] for b in blobs]
+    assert len(blobs) == 4
+    assert areas == sorted(areas, reverse=True)
+    assert blobs[0][4] == (80, 60, 81, 81)
+    # 10x10 的方块被 min_area 过滤，limit 只保留最大的两个
+    assert len(detector.extract_blobs(scene(), min_area=100)) == 3
+    assert [b[3] for b in detector.extract_blobs(scene(), limit=2)] == areas[:2]
+
+
+def test_components_empty_mask():
+    assert make_detector("components").extract_blobs(np.zeros((50, 50), np.uint8)) == []
+
+
+def test_components_agree_with_contours():
+    mask = scene()
+    contour = make_detector("contour").extract_blobs(mask)
+    components = make_detector("components").extract_blobs(mask)
+    assert len(contour) == len(components)
+    for a, b in zip(contour, components):
+        assert a[4] == b[4]                                     # 外接矩形一致
+        assert a[0] == pytest.approx(b[0], abs=1.0)
+        assert a[1] == pytest.approx(b[1], abs=1.0)
+        if b[4][2] == b[4][3]:
+            assert a[2] == pytest.approx(b[2], abs=1.5)
+        else:
+            # 矩形：最小外接圆半径为半对角线，连通域取长边的一半
+            assert b[2] <= a[2]
+        # 轮廓面积按多边形计算，比像素数略小
+        assert a[3] <= b[3] and a[3] == pytest.approx(b[3], rel=0.1, abs=40)
+
+
+def test_largest_blob_agrees_on_frames():
+    rng = np.random.default_rng(0)
+    contour, components = make_detector("contour"), make_detector("components")
+    for _ in range(20):
+        frame = np.zeros((240, 320, 3), np.uint8)
+        # 三个互不重叠的圆，半径各不相同，最大的一块是确定的
+        radii = rng.choice(np.arange(6, 36), 3, replace=False)
+        for cx, radius in zip((50, 160, 270), radii):
+            center = (int(cx + rng.integers(-10, 11)), int(rng.integers(40, 200)))
+            cv2.circle(frame, center, int(radius), (0, 0, 255), -1)
+        mask = contour.build_mask(frame)
+        a, b = contour._largest_blob(mask), components._largest_blob(mask)
+        assert a[4] == b[4]
+        assert a[0] == pytest.approx(b[0], abs=1.0)
+        assert a[1] == pytest.approx(b[1], abs=1.0)
@@ -0,0 +1,89 @@
+"""查表掩膜与 HSV 双 inRange 掩膜逐像素一致"""
+
+import cv2
+import numpy as np
+import pytest
+
+from color_lut import ColorLUT
+
+LOWER_RED1, UPPER_RED1 = np.array([0, 120, 120]), np.array([10, 255, 255])
+LOWER_RED2, UPPER_RED2 = np.array([160, 120, 120]), np.array([180, 255, 255])
+RANGES = [(LOWER_RED1, UPPER_RED1), (LOWER_RED2, UPPER_RED2)]
+
+
+def hsv_mask(bgr):
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+    return cv2.bitwise_or(cv2.inRange(hsv, LOWER_RED1, UPPER_RED1), cv2.inRange(hsv, LOWER_RED2, UPPER_RED2))
+
+
+@pytest.fixture(scope="module")
+def lut():
+    return ColorLUT(RANGES, bits=8, cache_dir=None)
+
+
+def test_random_pixels_match_hsv(lut):
+    rng = np.random.default_rng(0)
+    bgr = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    assert np.array_equal(lut.apply(bgr), hsv_mask(bgr))
+
+
+def test_every_color_matches_hsv(lut):
+    # 全部 2^24 种颜色排成一张 4096x4096 的图
+    c = np.arange(1 << 24, dtype=np.uint32)
+    bgr = np.stack([c & 0xFF, (c >> 8) & 0xFF, c >> 16], axis=-1).astype(np.uint8).reshape(4096, 4096, 3)
+    assert np.array_equal(lut.apply(bgr), hsv_mask(bgr))
+
+
+def test_non_contiguous_input(lut):
+    rng = np.random.default_rng(1)
+    frame = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    region = frame[10:90, 20:130]
+    assert np.array_equal(lut.apply(region), hsv_mask(region))
+
+
+def test_cache_roundtrip(tmp_path):
+    first = ColorLUT(RANGES, bits=8, cache_dir=str(tmp_path))
+    assert not first.loaded_from_cache
+    second = ColorLUT(RANGES, bits=8, cache_dir=str(tmp_path))
+    assert second.loaded_from_cache
+    assert np.array_equal(first.table, second.table)
+
+
+def test_set_ranges_rebuilds():
+    bgr = np.zeros((4, 4, 3), np.uint8)
+    bgr[:] = (0, 255, 0)    # 纯绿
+    lut = ColorLUT(RANGES, bits=8, cache_dir=None)
+    assert not lut.apply(bgr).any()
+    lut.set_ranges([(np.array([50, 100, 100]), np.array([70, 255, 255]))])
+    assert lut.apply(bgr).all()
+
+
+@pytest.mark.parametrize("bits", [4, 5, 6])
+def test_quantised_table_matches_cell_centres(bits):
+    lut = ColorLUT(RANGES, bits=bits, cache_dir=None)
+    assert lut.table.nbytes < 1 << 23
+    rng = np.random.default_rng(bits)
+    bgr = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    # 每个像素按所在量化格的中心颜色判定
+    q = 8 - bits
+    centres = ((bgr >> q) << q) + ((1 << q) >> 1)
+    assert np.array_equal(lut.apply(bgr), hsv_mask(centres.astype(np.uint8)))
+
+
+def test_corrupt_cache_is_rebuilt(tmp_path):
+    first = ColorLUT(RANGES, bits=5, cache_dir=str(tmp_path))
+    path = first._cache_path()
+    with open(path, "r+b") as f:
+        f.truncate(100)
+    second = ColorLUT(RANGES, bits=5, cache_dir=str(tmp_path))
+    assert not second.loaded_from_cache and second.cache_error
+    assert np.array_equal(first.table, second.table)
+    # 重建后已覆盖坏缓存
+    assert ColorLUT(RANGES, bits=5, cache_dir=str(tmp_path)).loaded_from_cache
+
+
+def test_unwritable_cache_dir_skips_save(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    lut = ColorLUT(RANGES, bits=5, cache_dir=str(blocker / "lut"))
+    assert lut.cache_error and lut.table is not None
@@ -0,0 +1,77 @@
+"""跳帧调度：目标帧率、过载时先降显示再降追踪、恢复时顺序相反"""
+
+import pytest
+
+from frame_scheduler import FrameScheduler
+
+PERIOD = 1 / 30.0
+
+
+def run(scheduler, start, seconds, track_cost, display_cost=0.005):
+    """按 30fps 模拟到达的帧，记录每次调整后的 (显示间隔, 追踪间隔)"""
+    changes = []
+    t = start
+    state = (scheduler.display_interval, scheduler.track_interval)
+    for _ in range(int(seconds / PERIOD)):
+        t += PERIOD
+        if scheduler.should_track(t):
+            scheduler.track_done(t, t, t + track_cost)
+        if scheduler.should_display(t):
+            scheduler.display_done(t, t + display_cost)
+        current = (scheduler.display_interval, scheduler.track_interval)
+        if current != state:
+            changes.append(current)
+            state = current
+    return t, changes
+
+
+def count_ticks(scheduler, method, frames=300):
+    return sum(getattr(scheduler, method)(1.0 + i * PERIOD) for i in range(frames))
+
+
+def test_target_rates():
+    assert count_ticks(FrameScheduler(display_fps=15, track_fps=0), "should_track") == 300
+    assert count_ticks(FrameScheduler(display_fps=15, track_fps=10), "should_track") == pytest.approx(100, abs=2)
+    assert count_ticks(FrameScheduler(display_fps=15), "should_display") == pytest.approx(150, abs=2)
+    scheduler = FrameScheduler(display_fps=15, track_fps=10)
+    count_ticks(scheduler, "should_track")
+    assert scheduler.counters["tracked"] + scheduler.counters["track_skipped"] == 300
+
+
+def test_overload_throttles_display_before_tracking():
+    scheduler = FrameScheduler(display_fps=15)
+    _, changes = run(scheduler, 10.0, 20.0, track_cost=0.04)
+    assert scheduler.counters["display_throttle"] > 0
+    assert scheduler.counters["track_throttle"] > 0
+    first_track = next(i for i, (_, track) in enumerate(changes) if track > 0.0)
+    # 追踪开始降帧时显示已经在下限，之后显示间隔不再变化
+    assert all(display == scheduler.max_display_interval for display, _ in changes[first_track:])
+    assert all(track == 0.0 for _, track in changes[:first_track])
+    assert scheduler.track_interval <= scheduler.max_track_interval
+
+
+def test_latency_budget_alone_throttles():
+    scheduler = FrameScheduler(display_fps=15, latency_budget=0.010)
+    run(scheduler, 10.0, 3.0, track_cost=0.015, display_cost=0.0)
+    assert scheduler.counters["display_throttle"] > 0
+
+
+def test_recovery_restores_tracking_before_display():
+    scheduler = FrameScheduler(display_fps=15)
+    t, _ = run(scheduler, 10.0, 20.0, track_cost=0.04)
+    assert scheduler.track_interval > 0.0
+    _, changes = run(scheduler, t, 30.0, track_cost=0.002, display_cost=0.001)
+    assert scheduler.counters["recover"] > 0
+    first_display = next(i for i, (display, _) in enumerate(changes) if display < scheduler.max_display_interval)
+    # 显示开始恢复前追踪已回到目标帧率
+    assert all(track == 0.0 for _, track in changes[first_display:])
+    assert scheduler.track_interval == scheduler.base_track_interval
+    assert scheduler.display_interval == pytest.approx(scheduler.base_display_interval)
+
+
+def test_recovery_stops_at_configured_rates():
+    scheduler = FrameScheduler(display_fps=10, track_fps=20)
+    run(scheduler, 10.0, 10.0, track_cost=0.001, display_cost=0.001)
+    assert scheduler.display_interval == pytest.approx(0.1)
+    assert scheduler.track_interval == pytest.approx(0.05)
+    assert scheduler.counters["recover"] == 0
@@ -0,0 +1,106 @@
+"""云台输出级：按 0.1° 比较的变化抑制、合并、保活重发和激光高优先级"""
+
+import pytest
+
+from gimbal_output import GimbalOutput
+from gimbal_protocol import FrameParser, TRIGGER_FIRE, TRIGGER_LASER
+
+
+class FakeTransport:
+    def __init__(self):
+        self.framer = None
+        self.source = None
+        self.urgent = []
+        self.wakes = 0
+
+    def set_source(self, source):
+        self.source = source
+
+    def send_urgent(self, item, flush=False, frame=False):
+        self.urgent.append((item, frame))
+        return True
+
+    def wake(self):
+        self.wakes += 1
+
+
+@pytest.fixture
+def output():
+    return GimbalOutput(FakeTransport(), keepalive=0.5)
+
+
+def poll_state(output, now):
+    entry = output.poll(now)
+    return None if entry is None else entry[0]
+
+
+def test_registers_as_source_and_framer(output):
+    transport = output.transport
+    assert transport.source is output
+    frames = FrameParser().feed(transport.framer((135.0, 90.0, 0)) + transport.framer((135.0, 90.0, 0)))
+    assert [seq for _, seq, _ in frames] == [0, 1]
+
+
+def test_new_state_is_sent_once(output):
+    output.set(100.0, 50.0)
+    assert output.transport.wakes == 1
+    assert output.wait_time(0.0) == 0.0
+    assert poll_state(output, 1.0) == (100.0, 50.0, 0)
+    assert poll_state(output, 1.1) is None
+    assert output.counters["sent"] == 1
+
+
+def test_unchanged_state_is_suppressed(output):
+    output.set(100.0, 50.0)
+    poll_state(output, 1.0)
+    output.set(100.0, 50.0)
+    # 帧内精度 0.1°，更小的变化也算相同
+    output.set(100.04, 49.96)
+    assert poll_state(output, 1.1) is None
+    assert output.counters["suppressed"] == 2
+    output.set(100.1, 50.0)
+    assert poll_state(output, 1.2) == (100.1, 50.0, 0)
+
+
+def test_trigger_change_is_not_suppressed(output):
+    output.set(100.0, 50.0)
+    poll_state(output, 1.0)
+    output.set(100.0, 50.0, TRIGGER_FIRE)
+    assert poll_state(output, 1.1) == (100.0, 50.0, TRIGGER_FIRE)
+
+
+def test_pending_commands_coalesce_to_latest(output):
+    for pan in (10.0, 20.0, 30.0):
+        output.set(pan, 50.0)
+    assert poll_state(output, 1.0) == (30.0, 50.0, 0)
+    assert output.counters["coalesced"] == 2
+    assert output.counters["sent"] == 1
+
+
+def test_returning_to_sent_state_drops_pending(output):
+    output.set(10.0, 50.0)
+    poll_state(output, 1.0)
+    output.set(20.0, 50.0)
+    output.set(10.0, 50.0)
+    assert poll_state(output, 1.1) is None
+
+
+def test_keepalive_resends_last_state(output):
+    assert output.wait_time(0.0) is None
+    output.set(10.0, 50.0)
+    poll_state(output, 1.0)
+    assert output.wait_time(1.2) == pytest.approx(0.3)
+    assert poll_state(output, 1.4) is None
+    assert poll_state(output, 1.5) == (10.0, 50.0, 0)
+    assert poll_state(output, 1.6) is None
+    assert poll_state(output, 2.0) == (10.0, 50.0, 0)
+    assert output.counters["keepalive"] == 2
+
+
+def test_laser_bypasses_coalescing(output):
+    output.set(10.0, 50.0)
+    output.set(10.0, 50.0, TRIGGER_LASER)
+    assert output.transport.urgent == [((10.0, 50.0, TRIGGER_LASER), True)]
+    # 激光不覆盖也不抑制待发的设定值
+    assert poll_state(output, 1.0) == (10.0, 50.0, 0)
+    assert output.counters["coalesced"] == 0
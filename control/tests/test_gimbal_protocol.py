@@ -0,0 +1,123 @@
+"""帧编解码，以及 FrameParser 在丢字节/多字节/误码/乱码下的重新同步"""
+
+import random
+import struct
+
+import pytest
+
+from gimbal_protocol import (
+    CRC_SIZE, HEADER_SIZE, MAX_PAYLOAD, MSG_GIMBAL_FINE, MSG_TELEMETRY,
+    FrameParser, GimbalEncoder, crc16_ccitt, decode_telemetry, encode_frame, encode_gimbal,
+)
+
+
+def gimbal_frames(count, rng):
+    encoder = GimbalEncoder()
+    return [encoder.encode(rng.uniform(0, 270), rng.uniform(0, 180), rng.randrange(3)) for _ in range(count)]
+
+
+def parse(stream, rng=None):
+    """按随机大小的块喂给解析器，返回 (帧列表, 解析器)"""
+    parser = FrameParser()
+    frames = []
+    pos = 0
+    while pos < len(stream):
+        step = rng.randint(1, 40) if rng else len(stream)
+        frames.extend(parser.feed(stream[pos:pos + step]))
+        pos += step
+    return frames, parser
+
+
+def seqs(frames):
+    return [seq for _, seq, _ in frames]
+
+
+def test_crc_check_value():
+    # CRC-16/CCITT-FALSE 的标准校验值
+    assert crc16_ccitt(b"123456789") == 0x29B1
+
+
+def test_encode_gimbal_layout():
+    frame = encode_gimbal(123.46, 90.0, 2, seq=7)
+    assert frame[:6] == bytes([0xAA, 0x55, 1, MSG_GIMBAL_FINE, 7, 5])
+    assert frame[6:11] == bytes([1235 >> 8, 1235 & 0xFF, 900 >> 8, 900 & 0xFF, 2])
+    assert len(frame) == HEADER_SIZE + 5 + CRC_SIZE
+
+
+def test_encode_frame_rejects_long_payload():
+    with pytest.raises(ValueError):
+        encode_frame(MSG_GIMBAL_FINE, bytes(MAX_PAYLOAD + 1))
+
+
+def test_encoder_sequence_wraps():
+    encoder = GimbalEncoder()
+    frames = [encoder.encode(0, 0) for _ in range(300)]
+    assert [f[4] for f in frames] == [i & 0xFF for i in range(300)]
+
+
+def test_chunked_stream_roundtrip():
+    rng = random.Random(0)
+    frames = gimbal_frames(200, rng)
+    parsed, parser = parse(b"".join(frames), rng)
+    assert [encode_frame(t, p, s) for t, s, p in parsed] == frames
+    assert parser.crc_errors == 0 and parser.dropped_bytes == 0
+
+
+def test_text_lines_between_frames_are_skipped():
+    rng = random.Random(1)
+    frames = gimbal_frames(50, rng)
+    stream = b"".join(b"Mega: status ok\r\n" + f for f in frames)
+    parsed, parser = parse(stream, rng)
+    assert seqs(parsed) == list(range(50))
+    assert parser.dropped_bytes == 50 * len(b"Mega: status ok\r\n")
+
+
+@pytest.mark.parametrize("damage", ["drop", "insert", "flip"])
+def test_damaged_frame_loses_only_itself(damage):
+    rng = random.Random(damage)
+    for _ in range(200):
+        frames = gimbal_frames(20, rng)
+        bad = rng.randrange(20)
+        frame = bytearray(frames[bad])
+        i = rng.randrange(len(frame))
+        if damage == "drop":
+            del frame[i]
+        elif damage == "insert":
+            frame.insert(i, rng.randrange(256))
+        else:
+            frame[i] ^= 1 << rng.randrange(8)
+        frames[bad] = bytes(frame)
+        parsed, _ = parse(b"".join(frames), rng)
+        expected = [s for s in range(20) if s != bad]
+        # 插入的字节可能落在帧末尾之后，坏帧本身仍然完整
+        assert seqs(parsed) in (expected, list(range(20)))
+
+
+def test_garbage_between_frames_recovers_every_frame():
+    rng = random.Random(2)
+    frames = gimbal_frames(300, rng)
+    # 乱码里多放同步头，制造假帧头
+    alphabet = [0xAA, 0x55, 0x01, 0x02, 0x10] + list(range(256))
+    stream = b"".join(bytes(rng.choice(alphabet) for _ in range(rng.randint(0, 30))) + f for f in frames)
+    parsed, parser = parse(stream, rng)
+    assert seqs(parsed) == [i & 0xFF for i in range(300)]
+    assert parser.dropped_bytes > 0
+
+
+def test_random_fuzz_keeps_buffer_bounded():
+    rng = random.Random(3)
+    parser = FrameParser()
+    for _ in range(2000):
+        parser.feed(bytes(rng.randrange(256) for _ in range(rng.randint(1, 64))))
+        assert len(parser.buf) < HEADER_SIZE + MAX_PAYLOAD + CRC_SIZE
+
+
+def test_telemetry_decode():
+    payload = struct.pack(">HHHHBHHH", 1355, 900, 1400, 855, 0b101, 1234, 3, 4)
+    parsed, _ = parse(encode_frame(MSG_TELEMETRY, payload, seq=9))
+    assert parsed == [(MSG_TELEMETRY, 9, payload)]
+    t = decode_telemetry(payload, stamp=1.5)
+    assert (t.stamp, t.pan, t.tilt, t.target_pan, t.target_tilt) == (1.5, 135.5, 90.0, 140.0, 85.5)
+    assert (t.trigger, t.laser, t.link) == (True, False, True)
+    assert (t.loop_us, t.crc_errors, t.seq_gaps) == (1234, 3, 4)
+    assert decode_telemetry(payload[:-1], stamp=0) is None
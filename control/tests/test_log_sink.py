@@ -0,0 +1,135 @@
+"""日志框批量刷新、行数上限和异步文件日志"""
+
+import threading
+
+from log_sink import LogSink
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+        self.cancelled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+
+
+class FakeText:
+    """只实现 LogSink 用到的 tk.Text 接口，按行保存内容"""
+    def __init__(self):
+        self.text = ""
+        self.inserts = 0
+
+    def config(self, **kwargs):
+        pass
+
+    def insert(self, index, text):
+        self.inserts += 1
+        self.text += text
+
+    def delete(self, start, end):
+        assert start == "1.0"
+        self.text = "".join(self.text.splitlines(True)[int(end.split(".")[0]) - 1:])
+
+    def see(self, index):
+        pass
+
+    def lines(self):
+        return self.text.splitlines()
+
+
+def make_sink(max_lines=10, log_dir=None):
+    root = FakeRoot()
+    sink = LogSink(root, max_lines=max_lines, log_dir=log_dir)
+    widget = FakeText()
+    sink.attach(widget)
+    return sink, root, widget
+
+
+def test_writes_are_batched_until_flush():
+    sink, root, widget = make_sink()
+    for i in range(5):
+        assert sink.write(f"msg {i}").endswith(f"msg {i}\n")
+    assert widget.inserts == 0
+    sink.flush()
+    assert widget.inserts == 1
+    assert [line.split("] ")[1] for line in widget.lines()] == [f"msg {i}" for i in range(5)]
+    sink.flush()
+    assert widget.inserts == 1
+
+
+def test_widget_keeps_only_newest_lines():
+    sink, _, widget = make_sink(max_lines=10)
+    for i in range(25):
+        sink.write(f"msg {i}")
+        if i % 4 == 0:
+            sink.flush()
+    sink.flush()
+    assert [line.split("] ")[1] for line in widget.lines()] == [f"msg {i}" for i in range(15, 25)]
+    assert sink.widget_lines == 10
+
+
+def test_multiline_messages_count_text_lines():
+    sink, _, widget = make_sink(max_lines=10)
+    for i in range(6):
+        sink.write(f"a{i}\nb{i}\nc{i}")
+        sink.flush()
+        assert len(widget.lines()) == sink.widget_lines <= 10
+    assert widget.lines()[-1] == "c5"
+
+
+def test_pending_backlog_is_bounded():
+    sink, _, widget = make_sink(max_lines=10)
+    for i in range(1000):
+        sink.write(f"msg {i}")
+    assert len(sink._pending) == 10
+    sink.flush()
+    assert widget.lines()[0].endswith("msg 990")
+
+
+def test_concurrent_writers_and_flush():
+    sink, _, widget = make_sink(max_lines=50)
+    errors = []
+
+    def producer():
+        try:
+            for i in range(5000):
+                sink.write(f"x{i}\ny{i}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=producer) for _ in range(4)]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        sink.flush()
+    for t in threads:
+        t.join()
+    sink.flush()
+    assert errors == []
+    assert len(widget.lines()) == sink.widget_lines == 50
+
+
+def test_tick_reschedules_and_close_cancels():
+    sink, root, widget = make_sink()
+    assert len(root.scheduled) == 1
+    sink.write("hello")
+    root.scheduled[0][1]()
+    assert widget.lines()[0].endswith("hello")
+    assert len(root.scheduled) == 2
+    sink.close()
+    assert root.cancelled == [2]
+
+
+def test_file_log_keeps_every_line(tmp_path):
+    sink, _, _ = make_sink(max_lines=5, log_dir=str(tmp_path))
+    for i in range(100):
+        sink.write(f"msg {i}")
+    sink.close()
+    with open(sink.path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert [line.split("] ")[1] for line in lines] == [f"msg {i}" for i in range(100)]
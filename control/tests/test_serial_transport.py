@@ -0,0 +1,132 @@
+"""单写者串口传输：通道优先级、紧急清空、队列上限、编码范围和写错误"""
+
+import threading
+import time
+
+import pytest
+
+from serial_transport import SerialTransport
+
+
+class GateSerial:
+    """第一次写入阻塞到 release()，让后续命令在队列里排好"""
+    def __init__(self, fail=()):
+        self.writes = []
+        self.fail = set(fail)
+        self.gate = threading.Event()
+        self.blocked = threading.Event()
+        self.lock = threading.Lock()
+
+    def write(self, data):
+        if not self.blocked.is_set():
+            self.blocked.set()
+            self.gate.wait(2.0)
+        if data in self.fail:
+            raise OSError("write failed")
+        with self.lock:
+            self.writes.append(data)
+
+    def release(self):
+        self.gate.set()
+
+    def wait_writes(self, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.writes) >= count:
+                    return list(self.writes)
+            time.sleep(0.005)
+        raise AssertionError(f"只写出 {self.writes}")
+
+
+class OneShotSource:
+    def __init__(self, item):
+        self.item = item
+
+    def poll(self, now):
+        item, self.item = self.item, None
+        return None if item is None else (item, now)
+
+    def wait_time(self, now):
+        return 0.0 if self.item is not None else None
+
+
+@pytest.fixture
+def blocked():
+    """写线程卡在第一条命令上的传输"""
+    ser = GateSerial()
+    transport = SerialTransport(ser, "测试", max_queue=4)
+    transport.start()
+    transport.send(b"first")
+    assert ser.blocked.wait(2.0)
+    yield ser, transport
+    ser.release()
+    transport.stop()
+
+
+def test_lane_priority(blocked):
+    ser, transport = blocked
+    transport.set_source(OneShotSource(b"source"))
+    transport.send(b"n1")
+    transport.send(b"n2")
+    transport.send_urgent(b"u1")
+    ser.release()
+    assert ser.wait_writes(5) == [b"first", b"u1", b"n1", b"n2", b"source"]
+    snapshot = transport.snapshot()
+    assert snapshot["sent"] == 5 and snapshot["queued"] == 0
+
+
+def test_urgent_flush_drops_queued_commands(blocked):
+    ser, transport = blocked
+    transport.send(b"n1")
+    transport.send(b"n2")
+    transport.send_urgent(b"stop", flush=True)
+    transport.send(b"after")
+    ser.release()
+    assert ser.wait_writes(3) == [b"first", b"stop", b"after"]
+    assert transport.counters["flushed"] == 2
+
+
+def test_full_queue_rejects(blocked):
+    ser, transport = blocked
+    assert all(transport.send(bytes([i])) for i in range(4))
+    assert not transport.send(b"overflow")
+    assert transport.counters["rejected"] == 1
+    # 紧急通道有自己的队列，不受普通队列占满影响
+    assert transport.send_urgent(b"stop")
+    ser.release()
+    assert ser.wait_writes(6)[:2] == [b"first", b"stop"]
+
+
+def test_framer_applies_to_source_and_marked_items_only(blocked):
+    ser, transport = blocked
+    transport.framer = lambda state: b"F" + bytes(state)
+    transport.set_source(OneShotSource((3, 4)))
+    transport.send(b"RAW\n")
+    transport.send_urgent((1, 2), frame=True)
+    ser.release()
+    assert ser.wait_writes(4) == [b"first", b"F\x01\x02", b"RAW\n", b"F\x03\x04"]
+
+
+def test_write_error_is_counted_and_writer_keeps_running():
+    ser = GateSerial(fail={b"bad"})
+    ser.blocked.set()
+    errors = []
+    transport = SerialTransport(ser, "测试", on_error=errors.append)
+    transport.start()
+    try:
+        transport.send(b"bad")
+        transport.send(b"good")
+        assert ser.wait_writes(1) == [b"good"]
+        assert transport.counters["errors"] == 1
+        assert isinstance(errors[0], OSError)
+    finally:
+        transport.stop()
+
+
+def test_stop_joins_idle_writer():
+    transport = SerialTransport(GateSerial(), "测试")
+    transport.start()
+    thread = transport._thread
+    transport.stop()
+    assert not thread.is_alive()
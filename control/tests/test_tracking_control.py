@@ -0,0 +1,127 @@
+"""卡尔曼目标估计：匀速收敛、跳变门限和丢失外推；预测瞄准的提前量"""
+
+import time
+
+import pytest
+
+from tracking_control import KalmanTracker, LatencyModel, TrackingController
+
+
+def feed(tracker, vx, vy, frames=30, dt=1 / 30, x0=100.0, y0=200.0):
+    """按匀速运动喂入测量，返回最后一帧的时间"""
+    stamp = 0.0
+    for i in range(frames):
+        stamp = i * dt
+        tracker.update(x0 + vx * stamp, y0 + vy * stamp, stamp)
+    return stamp
+
+
+def test_first_measurement_is_returned_as_is():
+    tracker = KalmanTracker()
+    assert not tracker.active
+    assert tracker.update(12.5, 34.0, 1.0) == (12.5, 34.0)
+    assert tracker.active
+    assert tracker.velocity == (0.0, 0.0)
+
+
+def test_constant_velocity_converges():
+    tracker = KalmanTracker()
+    stamp = feed(tracker, 300.0, -120.0)
+    vx, vy = tracker.velocity
+    assert vx == pytest.approx(300.0, rel=0.05)
+    assert vy == pytest.approx(-120.0, rel=0.05)
+    x, y = tracker.predict_position(stamp)
+    assert x == pytest.approx(100.0 + 300.0 * stamp, abs=1.0)
+    assert y == pytest.approx(200.0 - 120.0 * stamp, abs=1.0)
+
+
+def test_jump_outside_gate_reinitialises():
+    tracker = KalmanTracker()
+    stamp = feed(tracker, 300.0, 0.0)
+    # 远离预测位置的测量按新目标处理：位置直接取测量值，速度清零
+    assert tracker.update(600.0, 50.0, stamp + 1 / 30) == (600.0, 50.0)
+    assert tracker.velocity == (0.0, 0.0)
+
+
+def test_small_noise_inside_gate_is_filtered():
+    tracker = KalmanTracker()
+    stamp = feed(tracker, 0.0, 0.0)
+    x, y = tracker.update(103.0, 200.0, stamp + 1 / 30)
+    assert 100.0 < x < 103.0
+    assert tracker.velocity[0] > 0.0
+
+
+def test_coast_extrapolates_then_gives_up():
+    tracker = KalmanTracker(max_coast=0.25)
+    stamp = feed(tracker, 300.0, 0.0)
+    last_x = 100.0 + 300.0 * stamp
+    x, y = tracker.coast(stamp + 0.1)
+    assert x == pytest.approx(last_x + 30.0, abs=2.0)
+    assert y == pytest.approx(200.0, abs=1.0)
+    assert tracker.coast(stamp + 0.2) is not None
+    # 距最后一次测量超过 max_coast，判定丢失并清除状态
+    assert tracker.coast(stamp + 0.26) is None
+    assert not tracker.active
+    assert tracker.coast(stamp + 0.3) is None
+
+
+def test_predict_position_leaves_state_untouched():
+    tracker = KalmanTracker()
+    stamp = feed(tracker, 300.0, 0.0)
+    state = tracker.state.copy()
+    ahead = tracker.predict_position(stamp + 0.1)
+    assert ahead[0] == pytest.approx(tracker.state[0] + 30.0, abs=1.0)
+    assert (tracker.state == state).all()
+    assert KalmanTracker().predict_position(1.0) is None
+
+
+def test_latency_horizon_sums_stages():
+    model = LatencyModel(baudrate=115200, packet_bytes=13, servo_step_time=0.020)
+    model.extra = 0.01
+    horizon = model.update(0.03, 2.0)
+    assert model.serial_time == pytest.approx(130 / 115200)
+    assert model.slew_time == pytest.approx(0.04)
+    assert horizon == pytest.approx(0.03 + 130 / 115200 + 0.04 + 0.01)
+    model.gain = 0.5
+    assert model.update(0.03, -2.0) == pytest.approx(horizon * 0.5)
+
+
+def test_latency_horizon_limits():
+    model = LatencyModel()
+    assert model.update(1.0, 30.0) == model.max_horizon
+    assert model.update(-0.5, 0.0) == pytest.approx(model.serial_time)
+    model.gain = 0.0
+    assert model.update(0.05, 5.0) == 0.0
+    model.gain = 1.0
+    model.enabled = False
+    assert model.update(0.05, 5.0) == 0.0
+
+
+def run_moving_target(controller, vx=400.0, frames=20):
+    base = time.monotonic() - frames / 30 - 0.05
+    for i in range(frames):
+        stamp = base + i / 30
+        result = controller.update(200.0 + vx * (i / 30), 240.0, 30, 640, 480, stamp)
+    return result
+
+
+def test_aim_leads_moving_target():
+    result = run_moving_target(TrackingController())
+    assert result.horizon > 0.0
+    assert result.aim_x > result.x
+    off = TrackingController()
+    off.latency.enabled = False
+    result = run_moving_target(off)
+    assert result.horizon == 0.0
+    assert result.aim_x == result.x
+
+
+def test_servo_slew_uses_fresh_telemetry_only():
+    controller = TrackingController()
+    controller.last_pan, controller.last_tilt = 140.0, 90.0
+    controller.last_slew = 3.0
+    assert controller.servo_slew(10.0) == 3.0
+    controller.set_servo_position(137.5, 91.0, 10.0)
+    assert controller.servo_slew(10.1) == pytest.approx(2.5)
+    # 遥测过期后退回上一帧的角度变化
+    assert controller.servo_slew(10.0 + controller.servo_max_age + 0.01) == 3.0
@@ -0,0 +1,339 @@
+"""
+追踪控制
+
+位置估计、PID、稳定性检测和触发判定，与界面和串口无关，
+既可以在界面进程里逐帧调用，也可以放到追踪子进程中运行。
+
+目标像素位置用匀速模型卡尔曼滤波估计（按真实帧间隔 dt 预测），
+短暂丢失时按速度外推继续追踪，超过 max_coast 秒才判定丢失。
+
+预测瞄准：云台命令生效前还有采集帧龄、串口传输和舵机转动（Mega 端每 20ms 1°）
+的延迟，LatencyModel 估算这段时间，PID 瞄准目标在命令生效时刻的预测位置。
+有新鲜的云台遥测时，舵机转动时间按遥测的实际角度到上一条命令的剩余行程计算，
+而不是假设上一条命令已经执行完；遥测过期或没有遥测时才退回上一帧的角度变化。
+"""
+
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+# 一帧追踪的结果记录（子进程只回传这类小记录）
+TrackingResult = namedtuple("TrackingResult", [
+    "found", "x", "y", "radius", "distance", "pan", "tilt", "trigger", "coasting",
+    "aim_x", "aim_y", "horizon",
+])
+
+
+class SimpleFilter:
+    def __init__(self, size=6):
+        self.values = deque(maxlen=size)
+    def add(self, value):
+        self.values.append(value)
+    def get_filtered(self):
+        if not self.values:
+            return None
+        sorted_vals = sorted(self.values)
+        if len(sorted_vals) > 4:
+            trimmed = sorted_vals[1:-1]
+            return sum(trimmed) / len(trimmed)
+        else:
+            return sum(sorted_vals) / len(sorted_vals)
+
+
+class StablePID:
+    def __init__(self, kp, ki, kd):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.prev_error = 0
+        self.integral = 0
+    def compute(self, error):
+        if abs(error) < 0.015:
+            error = 0
+        self.integral = 0
+        derivative = error - self.prev_error
+        error_magnitude = abs(error)
+        if error_magnitude > 0.3:
+            adaptive_kp = self.kp * 0.8
+            adaptive_kd = self.kd * 1.2
+        elif error_magnitude > 0.1:
+            adaptive_kp = self.kp
+            adaptive_kd = self.kd
+        else:
+            adaptive_kp = self.kp * 1.2
+            adaptive_kd = self.kd * 1.5
+        output = adaptive_kp * error + self.ki * self.integral + adaptive_kd * derivative
+        if error_magnitude > 0.3:
+            output = max(-0.25, min(0.25, output))
+        else:
+            output = max(-0.4, min(0.4, output))
+        self.prev_error = error
+        return output
+
+
+class KalmanTracker:
+    """匀速模型卡尔曼滤波，状态 [x, y, vx, vy]（像素、像素/秒）"""
+    def __init__(self, process_noise=3000.0, measurement_noise=4.0, gate=5.0, max_coast=0.25):
+        self.process_noise = process_noise          # 加速度噪声谱密度 (px/s^2)^2
+        self.measurement_noise = measurement_noise  # 测量方差 px^2
+        self.gate = gate                            # 新测量超出该马氏距离则认为是新目标，重新初始化
+        self.max_coast = max_coast                  # 无测量时最多外推多少秒
+        self.state = None
+        self.P = None
+        self.stamp = None
+        self.last_measure_stamp = None
+        self.H = np.array([[1.0, 0, 0, 0], [0, 1.0, 0, 0]])
+        self.R = np.eye(2) * measurement_noise
+
+    @property
+    def active(self):
+        return self.state is not None
+
+    def reset(self):
+        self.state = None
+        self.P = None
+        self.stamp = None
+        self.last_measure_stamp = None
+
+    def _init(self, x, y, stamp):
+        self.state = np.array([x, y, 0.0, 0.0])
+        self.P = np.diag([self.measurement_noise, self.measurement_noise, 400.0 ** 2, 400.0 ** 2])
+        self.stamp = stamp
+        self.last_measure_stamp = stamp
+
+    def _predict(self, stamp):
+        dt = max(0.0, stamp - self.stamp)
+        if dt == 0.0:
+            return
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        q = self.process_noise
+        dt2, dt3 = dt * dt, dt * dt * dt
+        Q = np.array([
+            [dt3 / 3, 0, dt2 / 2, 0],
+            [0, dt3 / 3, 0, dt2 / 2],
+            [dt2 / 2, 0, dt, 0],
+            [0, dt2 / 2, 0, dt],
+        ]) * q
+        self.state = F @ self.state
+        self.P = F @ self.P @ F.T + Q
+        self.stamp = stamp
+
+    def update(self, x, y, stamp):
+        """融合一次测量，返回估计位置 (x, y)"""
+        if self.state is None:
+            self._init(x, y, stamp)
+            return x, y
+        self._predict(stamp)
+        z = np.array([x, y])
+        innovation = z - self.H @ self.state
+        S = self.H @ self.P @ self.H.T + self.R
+        S_inv = np.linalg.inv(S)
+        if innovation @ S_inv @ innovation > self.gate ** 2:
+            # 跳变太大，按新目标重新开始
+            self._init(x, y, stamp)
+            return x, y
+        K = self.P @ self.H.T @ S_inv
+        self.state = self.state + K @ innovation
+        self.P = (np.eye(4) - K @ self.H) @ self.P
+        self.last_measure_stamp = stamp
+        return float(self.state[0]), float(self.state[1])
+
+    def coast(self, stamp):
+        """无测量时外推，超过 max_coast 返回 None 并清除状态"""
+        if self.state is None:
+            return None
+        if stamp - self.last_measure_stamp > self.max_coast:
+            self.reset()
+            return None
+        self._predict(stamp)
+        return float(self.state[0]), float(self.state[1])
+
+    def predict_position(self, stamp):
+        """不改变滤波状态，给出 stamp 时刻的预测位置"""
+        if self.state is None:
+            return None
+        dt = stamp - self.stamp
+        return float(self.state[0] + self.state[2] * dt), float(self.state[1] + self.state[3] * dt)
+
+    @property
+    def velocity(self):
+        if self.state is None:
+            return 0.0, 0.0
+        return float(self.state[2]), float(self.state[3])
+
+
+class LatencyModel:
+    """从采集到舵机到位的延迟估计（秒）"""
+    def __init__(self, baudrate=115200, packet_bytes=13, servo_step_time=0.020):
+        self.enabled = True
+        self.baudrate = baudrate
+        self.packet_bytes = packet_bytes        # 一条云台命令帧的字节数
+        self.servo_step_time = servo_step_time  # Mega smoothServoMovement: 每 20ms 转 1°
+        self.extra = 0.0                        # 额外固定延迟（手动微调）
+        self.gain = 1.0                         # 补偿比例，0 表示不补偿
+        self.max_horizon = 0.3
+        self.capture_age = 0.0
+        self.serial_time = 0.0
+        self.slew_time = 0.0
+        self.horizon = 0.0
+
+    def update(self, capture_age, slew_degrees):
+        self.capture_age = max(0.0, capture_age)
+        self.serial_time = self.packet_bytes * 10.0 / self.baudrate
+        self.slew_time = abs(slew_degrees) * self.servo_step_time
+        if not self.enabled:
+            self.horizon = 0.0
+        else:
+            total = self.capture_age + self.serial_time + self.slew_time + self.extra
+            self.horizon = min(self.max_horizon, max(0.0, total * self.gain))
+        return self.horizon
+
+    def text(self):
+        return (f"提前量 {self.horizon * 1000:.0f}ms (帧龄 {self.capture_age * 1000:.0f} + "
+                f"串口 {self.serial_time * 1000:.1f} + 舵机 {self.slew_time * 1000:.0f} + "
+                f"附加 {self.extra * 1000:.0f}) × {self.gain:.2f}")
+
+
+class TrackingController:
+    """由检测结果计算云台角度和触发信号"""
+    def __init__(self):
+        self.KP = 0.4
+        self.KI = 0.0
+        self.KD = 0.9
+        self.CENTER_TOLERANCE = 18
+        self.TRIGGER_THRESHOLD = 0.06
+        self.TRIGGER_DELAY = 12
+        self.MAX_ANGLE_CHANGE = 4.0
+        self.DEAD_ZONE = 0.2            # 云台命令精度 0.1°，死区取两个量化步长
+        self.target = KalmanTracker()
+        self.latency = LatencyModel()
+        self.last_radius = None
+        self.last_slew = 0.0
+        self.servo_position = None      # 遥测回传的舵机实际角度 (pan, tilt, 接收时间)
+        self.servo_max_age = 0.2        # 超过该时间的遥测视为过期(s)
+        self.pan_filter = SimpleFilter(4)
+        self.tilt_filter = SimpleFilter(4)
+        self.pan_pid = StablePID(self.KP, self.KI, self.KD)
+        self.tilt_pid = StablePID(self.KP, self.KI, self.KD)
+        self.pan_angle = 135
+        self.tilt_angle = 90
+        self.last_pan = 135
+        self.last_tilt = 90
+        self.trigger_counter = 0
+        self.stability_history = deque(maxlen=10)
+        self.stable_frames = 0
+
+    def set_servo_position(self, pan, tilt, stamp):
+        """云台遥测回调：更新舵机实际角度"""
+        self.servo_position = (pan, tilt, stamp)
+
+    def servo_slew(self, now):
+        """舵机还需转动的角度
+
+        遥测新鲜时用实际角度到上一条命令的剩余行程（上一帧的角度变化已包含在内，不再重复累加）；
+        没有遥测或超过 servo_max_age 时用上一帧的角度变化近似。
+        """
+        servo = self.servo_position
+        if servo is None or now - servo[2] > self.servo_max_age:
+            return self.last_slew
+        return max(abs(self.last_pan - servo[0]), abs(self.last_tilt - servo[1]))
+
+    def reset(self):
+        """关闭追踪时清除目标状态、触发与稳定性状态"""
+        self.target.reset()
+        self.trigger_counter = 0
+        self.stable_frames = 0
+        self.stability_history.clear()
+
+    def update(self, x, y, radius, width, height, stamp=None):
+        """输入本帧检测结果和采集时间，返回 TrackingResult"""
+        now = time.monotonic()
+        if stamp is None:
+            stamp = now
+        center_x, center_y = width // 2, height // 2
+        trigger = False
+        coasting = x is None
+        if coasting:
+            estimate = self.target.coast(stamp)
+            if estimate is None:
+                self.trigger_counter = 0
+                self.stable_frames = 0
+                self.stability_history.clear()
+                return TrackingResult(False, None, None, None, None, self.pan_angle, self.tilt_angle,
+                                      False, False, None, None, 0.0)
+            filtered_x, filtered_y = estimate
+            radius = self.last_radius
+        else:
+            filtered_x, filtered_y = self.target.update(x, y, stamp)
+            self.last_radius = radius
+        filtered_x = min(max(filtered_x, 0.0), width - 1.0)
+        filtered_y = min(max(filtered_y, 0.0), height - 1.0)
+        # 瞄准命令生效时刻的预测位置；舵机转动时间用遥测的剩余行程估计，遥测过期时用上一帧的角度变化
+        horizon = self.latency.update(now - stamp, self.servo_slew(now))
+        aim = self.target.predict_position(stamp + horizon) if horizon > 0 else None
+        if aim is None:
+            aim_x, aim_y = filtered_x, filtered_y
+        else:
+            aim_x = min(max(aim[0], 0.0), width - 1.0)
+            aim_y = min(max(aim[1], 0.0), height - 1.0)
+        error_x = (filtered_x - center_x) / center_x
+        error_y = (filtered_y - center_y) / center_y
+        pan_output = self.pan_pid.compute((aim_x - center_x) / center_x)
+        tilt_output = self.tilt_pid.compute((aim_y - center_y) / center_y)
+        distance = float(np.sqrt((filtered_x - center_x)**2 + (filtered_y - center_y)**2))
+        aim_distance = float(np.sqrt((aim_x - center_x)**2 + (aim_y - center_y)**2))
+        if aim_distance > 40:
+            control_strength_pan = 70
+            control_strength_tilt = 55
+        elif aim_distance > 20:
+            control_strength_pan = 60
+            control_strength_tilt = 48
+        else:
+            control_strength_pan = 50
+            control_strength_tilt = 40
+        target_pan = 135 - pan_output * control_strength_pan
+        target_tilt = 90 + tilt_output * control_strength_tilt
+        self.pan_filter.add(target_pan)
+        self.tilt_filter.add(target_tilt)
+        filtered_pan = self.pan_filter.get_filtered()
+        filtered_tilt = self.tilt_filter.get_filtered()
+        smooth_pan = self.smooth_angle(filtered_pan, self.last_pan)
+        smooth_tilt = self.smooth_angle(filtered_tilt, self.last_tilt)
+        self.pan_angle = max(0, min(270, smooth_pan))
+        self.tilt_angle = max(0, min(180, smooth_tilt))
+        self.last_slew = max(abs(self.pan_angle - self.last_pan), abs(self.tilt_angle - self.last_tilt))
+        self.last_pan = self.pan_angle
+        self.last_tilt = self.tilt_angle
+        if coasting:
+            # 外推期间继续转动云台，但不累计稳定性，也不触发
+            return TrackingResult(True, filtered_x, filtered_y, radius, distance,
+                                  self.pan_angle, self.tilt_angle, False, True, aim_x, aim_y, horizon)
+        self.stability_history.append(distance)
+        if len(self.stability_history) >= 5:
+            recent_distances = list(self.stability_history)[-5:]
+            distance_variance = np.var(recent_distances)
+            if distance_variance < 2.0:
+                self.stable_frames += 1
+            else:
+                self.stable_frames = 0
+        if (abs(error_x) < self.TRIGGER_THRESHOLD and
+            abs(error_y) < self.TRIGGER_THRESHOLD and
+            radius > 20 and
+            self.stable_frames > 5):
+            self.trigger_counter += 1
+            if self.trigger_counter >= self.TRIGGER_DELAY:
+                trigger = True
+        else:
+            self.trigger_counter = max(0, self.trigger_counter - 1)
+        return TrackingResult(True, filtered_x, filtered_y, radius, distance,
+                              self.pan_angle, self.tilt_angle, trigger, False, aim_x, aim_y, horizon)
+
+    def smooth_angle(self, new_angle, last_angle):
+        diff = new_angle - last_angle
+        if abs(diff) < self.DEAD_ZONE:
+            return last_angle
+        if abs(diff) > self.MAX_ANGLE_CHANGE:
+            return last_angle + (self.MAX_ANGLE_CHANGE if diff > 0 else -self.MAX_ANGLE_CHANGE)
+        return new_angle
@@ -0,0 +1,289 @@
+"""
+多进程追踪流水线
+
+采集和检测/PID 各自运行在独立子进程中，避免与界面进程争抢 GIL。
+图像通过 multiprocessing.shared_memory 环形缓冲传递：采集进程直接把图像
+读进共享内存槽位，追踪进程和界面进程就地读取，不做整帧拷贝；
+追踪进程只回传很小的结果记录（目标 x/y/半径、pan/tilt、触发，多目标模式下附带轨迹摘要）。
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+FRAME_SHAPE = (480, 640, 3)
+RING_SLOTS = 4
+
+
+class SharedFrameRing:
+    """共享内存帧环
+
+    布局：meta 为 (slots + 1, 2) 的 float64，第 0 行 [最新序号, 0]，
+    第 i+1 行为槽位 i 的 [序号, 采集时间]；序号为 -1 表示槽位正在写入。
+    其后是 slots 个 H×W×3 的 uint8 图像。
+    """
+    def __init__(self, shape=FRAME_SHAPE, slots=RING_SLOTS, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        meta_bytes = (slots + 1) * 2 * 8
+        frame_bytes = int(np.prod(self.shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=meta_bytes + slots * frame_bytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.meta = np.ndarray((slots + 1, 2), np.float64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, buffer=self.shm.buf, offset=meta_bytes)
+        if self.owner:
+            self.meta[:] = 0
+            self.meta[1:, 0] = -1
+
+    def begin_write(self, seq):
+        """返回序号 seq 要写入的槽位视图"""
+        i = seq % self.slots
+        self.meta[i + 1, 0] = -1
+        return self.frames[i]
+
+    def publish(self, seq, stamp):
+        i = seq % self.slots
+        self.meta[i + 1, 1] = stamp
+        self.meta[i + 1, 0] = seq
+        self.meta[0, 0] = seq
+
+    def latest_seq(self):
+        return int(self.meta[0, 0])
+
+    def latest(self):
+        """返回 (序号, 采集时间, 槽位视图)，尚无图像时视图为 None"""
+        seq = self.latest_seq()
+        if seq <= 0:
+            return 0, 0.0, None
+        i = seq % self.slots
+        stamp = float(self.meta[i + 1, 1])
+        if int(self.meta[i + 1, 0]) != seq:
+            return 0, 0.0, None
+        return seq, stamp, self.frames[i]
+
+    def still_valid(self, seq):
+        """槽位在读取期间是否被覆盖（读完后调用，失效则丢弃结果）"""
+        return int(self.meta[seq % self.slots + 1, 0]) == seq
+
+    def close(self):
+        # 先释放 numpy 视图，否则 SharedMemory.close 会因仍有导出缓冲而失败
+        self.meta = None
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # 调用方仍持有槽位视图，进程退出时由系统回收映射
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def capture_worker(ring_name, shape, slots, camera_index, frame_event, stop_event):
+    """采集子进程：把摄像头图像直接读进共享内存槽位"""
+    import cv2
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    cap = cv2.VideoCapture(camera_index, cv2.CAP_V4L2)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, shape[1])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, shape[0])
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    seq = 0
+    try:
+        while not stop_event.is_set():
+            if not cap.isOpened():
+                time.sleep(0.5)
+                continue
+            slot = ring.begin_write(seq + 1)
+            ret, image = cap.read(slot)
+            if not ret:
+                time.sleep(0.01)
+                continue
+            if image is not slot and image.shape == slot.shape:
+                # 后端没有复用传入的缓冲时退化为一次拷贝
+                np.copyto(slot, image)
+            elif image.shape != slot.shape:
+                continue
+            seq += 1
+            ring.publish(seq, time.monotonic())
+            frame_event.set()
+    finally:
+        cap.release()
+        ring.close()
+
+
+def tracking_worker(ring_name, shape, slots, settings, command_queue, result_queue, frame_event, stop_event):
+    """追踪子进程：就地读取最新帧，检测 + PID，回传结果记录"""
+    from red_detector import RedTargetDetector
+    from target_association import MultiTargetTracker
+    from tracking_control import TrackingController
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    detector = RedTargetDetector(*settings["thresholds"])
+    detector.roi_enabled = settings.get("roi", True)
+    detector.pyramid_factor = settings.get("pyramid", 1)
+    detector.blob_extractor = settings.get("extractor", "contour")
+    detector.enable_lut(settings.get("lut", False))
+    controller = TrackingController()
+    multi = MultiTargetTracker()
+    multi.enabled = settings.get("multi", False)
+    state = {"track_interval": 0.0}    # 追踪进程内的可调参数
+    _apply_command(("track_fps", settings.get("track_fps", 0)), detector, controller, multi, False, state)
+    if "latency" in settings:
+        _apply_command(("latency", settings["latency"]), detector, controller, multi, False, state)
+    tracking = False
+    last_seq = 0
+    last_stamp = 0.0
+    try:
+        while not stop_event.is_set():
+            while True:
+                try:
+                    command = command_queue.get_nowait()
+                except queue.Empty:
+                    break
+                tracking = _apply_command(command, detector, controller, multi, tracking, state)
+            if not frame_event.wait(0.1):
+                continue
+            frame_event.clear()
+            if not tracking:
+                continue
+            seq, stamp, frame = ring.latest()
+            if frame is None or seq == last_seq:
+                continue
+            last_seq = seq
+            # 追踪帧率低于相机帧率时按采集时间跳帧（留 10% 余量）
+            if stamp - last_stamp < state["track_interval"] * 0.9:
+                continue
+            last_stamp = stamp
+            start = time.monotonic()
+            height, width = frame.shape[:2]
+            if multi.enabled:
+                x, y, radius, switched = multi.measure(detector.detect_candidates(frame))
+                if switched:
+                    controller.target.reset()
+            else:
+                x, y, radius = detector.detect(frame)
+            if not ring.still_valid(seq):
+                # 处理期间槽位被采集进程覆盖，结果作废
+                continue
+            result = controller.update(x, y, radius, width, height, stamp)
+            if result.found:
+                detector.set_hint(result.x, result.y, result.radius)
+            try:
+                tracks = multi.records() if multi.enabled else []
+                result_queue.put_nowait((seq, stamp, time.monotonic() - start, tuple(result), tracks, multi.pinned_id))
+            except queue.Full:
+                # 界面进程来不及取时丢弃，不阻塞追踪
+                pass
+    finally:
+        ring.close()
+
+
+def _apply_command(command, detector, controller, multi, tracking, state):
+    name, value = command
+    if name == "tracking":
+        tracking = value[0]
+        if tracking:
+            controller.pan_angle, controller.tilt_angle = value[1], value[2]
+        else:
+            controller.reset()
+            detector.reset()
+            multi.reset()
+    elif name == "multi":
+        multi.enabled = value
+        multi.reset()
+        controller.target.reset()
+    elif name == "pin":
+        if value is None:
+            multi.unpin()
+        elif multi.pin_nearest(*value) is not None:
+            controller.target.reset()
+    elif name == "roi":
+        detector.roi_enabled = value
+        detector.reset()
+    elif name == "pyramid":
+        detector.pyramid_factor = value
+    elif name == "extractor":
+        detector.blob_extractor = value
+    elif name == "latency":
+        controller.latency.enabled, controller.latency.gain, controller.latency.extra = value
+    elif name == "servo":
+        controller.set_servo_position(*value)
+    elif name == "track_fps":
+        state["track_interval"] = 1.0 / value if value > 0 else 0.0
+    elif name == "lut":
+        detector.enable_lut(value)
+    return tracking
+
+
+class TrackingPipeline:
+    """界面进程一侧：启动/停止子进程，收发命令和结果"""
+    def __init__(self, camera_index=0, shape=FRAME_SHAPE, slots=RING_SLOTS):
+        self.camera_index = camera_index
+        self.shape = shape
+        self.slots = slots
+        self.ring = None
+        self.processes = []
+        # 子进程不继承界面进程的线程和 Tk 状态
+        self.ctx = mp.get_context("spawn")
+        self.command_queue = None
+        self.result_queue = None
+        self.stop_event = None
+
+    def start(self, settings):
+        self.ring = SharedFrameRing(self.shape, self.slots)
+        self.command_queue = self.ctx.Queue()
+        self.result_queue = self.ctx.Queue(maxsize=64)
+        self.stop_event = self.ctx.Event()
+        frame_event = self.ctx.Event()
+        self.processes = [
+            self.ctx.Process(target=capture_worker, daemon=True,
+                             args=(self.ring.name, self.shape, self.slots, self.camera_index, frame_event, self.stop_event)),
+            self.ctx.Process(target=tracking_worker, daemon=True,
+                             args=(self.ring.name, self.shape, self.slots, settings, self.command_queue,
+                                   self.result_queue, frame_event, self.stop_event)),
+        ]
+        for p in self.processes:
+            p.start()
+
+    def send(self, name, value):
+        if self.command_queue is not None:
+            self.command_queue.put((name, value))
+
+    def get_result(self, timeout=0.1):
+        """返回 (序号, 采集时间, 处理耗时, TrackingResult 元组, 轨迹摘要, 锁定 ID)，超时返回 None"""
+        try:
+            return self.result_queue.get(timeout=timeout)
+        except (queue.Empty, OSError, ValueError):
+            return None
+
+    def latest_frame(self):
+        """界面显示用：返回最新帧的拷贝 (序号, 采集时间, 图像)"""
+        seq, stamp, frame = self.ring.latest()
+        if frame is None:
+            return 0, 0.0, None
+        image = frame.copy()
+        if not self.ring.still_valid(seq):
+            return 0, 0.0, None
+        return seq, stamp, image
+
+    def stop(self, timeout=1.0):
+        if self.stop_event is not None:
+            self.stop_event.set()
+        for p in self.processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.processes = []
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,64 @@
+"""
+界面更新分发
+
+Tk 控件只能在主线程里安全操作。工作线程（视频、追踪、摇杆控制）不再直接调用
+configure/config，而是把最新状态 publish 到一个按键名覆盖的槽位里；主线程的
+root.after 定时器按固定刷新率取出各键的最新值，只对和上次不同的值调用处理函数。
+publish 只做一次 dict 赋值，不加锁、不阻塞工作线程。
+"""
+
+_MISSING = object()
+
+
+class UIDispatcher:
+    """工作线程 → Tk 主线程的最新值分发器"""
+    def __init__(self, root, interval_ms=33):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._pending = {}      # 键 → 尚未应用的最新值
+        self._applied = {}      # 键 → 上次应用的值
+        self._handlers = {}     # 键 → (处理函数, 是否跳过相同值)
+        self._after_id = None
+        self.published = 0
+        self.applied = 0
+
+    def register(self, key, handler, dedupe=True):
+        """注册处理函数，handler(value) 在主线程调用；图像等不可比较的值用 dedupe=False"""
+        self._handlers[key] = (handler, dedupe)
+
+    def publish(self, key, value):
+        """任意线程调用：覆盖该键的待应用值"""
+        self._pending[key] = value
+        self.published += 1
+
+    def start(self):
+        if self._after_id is None:
+            self._tick()
+
+    def stop(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def flush(self):
+        """在主线程立即应用所有待更新的值"""
+        # 逐键 pop 而不是整体替换字典，保证与 publish 并发时不丢值
+        for key in list(self._pending):
+            value = self._pending.pop(key, _MISSING)
+            if value is _MISSING or key not in self._handlers:
+                continue
+            handler, dedupe = self._handlers[key]
+            if dedupe and self._applied.get(key, _MISSING) == value:
+                continue
+            self._applied[key] = value
+            handler(value)
+            self.applied += 1
+
+    def _tick(self):
+        try:
+            self.flush()
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
@@ -0,0 +1,55 @@
+"""
+视频显示引擎
+
+原来每显示一帧都要 cvtColor → Image.fromarray → resize(LANCZOS) → ImageTk.PhotoImage，
+四次整帧分配，画面本来就是 640x480 时 LANCZOS 也照样执行。
+这里预分配一块 RGB 缓冲和一个持久的 PhotoImage：颜色转换直接写进缓冲，
+PIL 图像共享这块缓冲，再用 paste 原地更新 PhotoImage，Label 只在尺寸变化时重新绑定。
+尺寸一致时不缩放，需要缩放时用 OpenCV 双线性插值。
+"""
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class VideoDisplay:
+    """把 BGR 图像显示到 Tk Label 上，复用缓冲和 PhotoImage"""
+    def __init__(self, label):
+        self.label = label
+        self.size = None        # 当前显示尺寸 (w, h)
+        self._rgb = None        # 显示用 RGB 缓冲
+        self._scaled = None     # 需要缩放时的 BGR 中间缓冲
+        self._image = None      # 共享 _rgb 内存的 PIL 图像
+        self.photo = None
+        self.resized = 0        # 缩放过的帧数
+        self.rebuilt = 0        # 因尺寸变化重建缓冲的次数
+
+    def show(self, frame, size=None):
+        """显示一帧 BGR 图像，size 为显示尺寸 (w, h)，None 表示按原尺寸"""
+        h, w = frame.shape[:2]
+        if size is None:
+            size = (w, h)
+        size = (int(size[0]), int(size[1]))
+        if size != self.size:
+            self._allocate(size)
+        if size == (w, h):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        else:
+            if self._scaled is None:
+                self._scaled = np.empty((size[1], size[0], 3), np.uint8)
+            cv2.resize(frame, size, dst=self._scaled, interpolation=cv2.INTER_LINEAR)
+            cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            self.resized += 1
+        self.photo.paste(self._image)
+
+    def _allocate(self, size):
+        w, h = size
+        self.size = size
+        self._rgb = np.zeros((h, w, 3), np.uint8)
+        self._scaled = None
+        self._image = Image.frombuffer("RGB", size, self._rgb, "raw", "RGB", 0, 1)
+        self.photo = ImageTk.PhotoImage(self._image)
+        self.label.configure(image=self.photo)
+        self.label.image = self.photo
+        self.rebuilt += 1
@@ -0,0 +1,474 @@
+"""
+网页控制台（运行在工控机上）
+
+用 asyncio 提供一个局域网网页控制台，任何浏览器打开即可操作，不需要远程桌面转发整个 Tk 界面：
+- GET /            控制页面
+- GET /video.mjpg  MJPEG 视频流（所有客户端共用同一次 JPEG 编码）
+- GET /ws          WebSocket 控制通道，JSON 消息：
+    {"cmd": "WF,1500,1600"}      运动命令，与 README 中的 WF/WL/WR/WS/TF/.../US/RESET 相同
+    {"gimbal": [pan, tilt]}      云台绝对角度
+    {"nudge": [dpan, dtilt]}     云台相对移动
+    {"center": true}             云台归中
+    {"laser": true}              激光发射
+    {"stop": true}               紧急停止（TS + WS）
+  服务端回复 {"ok": bool, "pan": .., "tilt": .., "msg": ..}；
+  控制连接断开时若之前发过运动命令，自动发送 TS + WS。
+
+安全：WebSocket 握手的 Origin 必须与 Host 一致，防止局域网内其他网页借操作员的浏览器连上控制通道；
+未设置 --token 时只监听 127.0.0.1，对局域网开放必须设置口令。
+串口写入交给每个串口的 SerialTransport 写线程，串口卡住不会阻塞事件循环。
+云台串口由 TelemetryReader 持续读取 Mega 回传的遥测，避免接收缓冲被填满。
+
+只依赖标准库 + OpenCV + pyserial。用法：
+    python web_station.py --motion-port /dev/ttyUSB0 --gimbal-port /dev/ttyACM0 --port 8080 --token 口令
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from urllib.parse import urlsplit, parse_qs
+
+import cv2
+
+from frame_capture import LatestFrameCapture
+from gimbal_output import GimbalOutput
+from gimbal_protocol import clamp_angles, TRIGGER_NONE, TRIGGER_LASER, PAN_CENTER, TILT_CENTER
+from gimbal_telemetry import TelemetryReader
+from serial_transport import SerialTransport
+
+try:
+    import serial
+    SERIAL_AVAILABLE = True
+except ImportError:
+    SERIAL_AVAILABLE = False
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MOTION_COMMAND = re.compile(r"^(WF,\d{4},\d{4}|WL|WR|WS|TF|TB|TL|TR|TS|UF|UB|UL|UR|US|RESET)$")
+MAX_WS_MESSAGE = 4096
+
+
+class JpegEncoder:
+    """后台线程按固定帧率把最新帧编码为 JPEG，供所有视频客户端共用"""
+    def __init__(self, capture, fps=15, quality=70):
+        self.capture = capture
+        self.interval = 1.0 / fps
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.jpeg = None
+        self.seq = 0
+        self.clients = 0        # 没有观看者时不编码
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _loop(self):
+        last_seq = 0
+        while self._running:
+            start = time.monotonic()
+            if self.clients > 0:
+                seq, _, frame = self.capture.read(last_seq, timeout=0.2)
+                if frame is not None and seq != last_seq:
+                    last_seq = seq
+                    ok, buf = cv2.imencode(".jpg", frame, self.params)
+                    if ok:
+                        self.jpeg = buf.tobytes()
+                        self.seq += 1
+            remain = self.interval - (time.monotonic() - start)
+            if remain > 0:
+                time.sleep(remain)
+
+
+class SerialLink:
+    """运动/云台串口（与 MergedControlUI 使用相同的命令格式）
+
+    只入队不直接写串口，可以在事件循环里调用；返回值表示命令是否已入队。
+    """
+    def __init__(self, motion_port=None, gimbal_port=None, baudrate=115200):
+        self.motion = self._open(motion_port, baudrate)
+        self.gimbal = self._open(gimbal_port, baudrate)
+        self.pan = PAN_CENTER
+        self.tilt = TILT_CENTER
+        self.motion_link = self._transport(self.motion, "运动")
+        self.gimbal_link = self._transport(self.gimbal, "云台")
+        self.gimbal_output = GimbalOutput(self.gimbal_link) if self.gimbal_link else None
+        for link in (self.motion_link, self.gimbal_link):
+            if link:
+                link.start()
+        # Mega 每 50ms 回传遥测，必须有线程读走
+        self.gimbal_telemetry = TelemetryReader(self.gimbal) if self.gimbal else None
+        if self.gimbal_telemetry:
+            self.gimbal_telemetry.start()
+
+    @staticmethod
+    def _open(port, baudrate):
+        if not port or not SERIAL_AVAILABLE:
+            return None
+        try:
+            return serial.Serial(port, baudrate, timeout=1, write_timeout=0.2)
+        except Exception as e:
+            print(f"无法打开串口 {port}: {e}")
+            return None
+
+    @staticmethod
+    def _transport(ser, name):
+        if ser is None:
+            return None
+        return SerialTransport(ser, name, on_error=lambda e: print(f"{name}串口发送失败: {e}"))
+
+    def send_motion(self, command, urgent=False, flush=False):
+        if self.motion_link is None:
+            return False, "运动串口未连接"
+        data = (command + "\n").encode("utf-8")
+        queued = self.motion_link.send_urgent(data, flush) if urgent else self.motion_link.send(data)
+        return (True, command) if queued else (False, "发送队列已满")
+
+    def send_gimbal(self, pan, tilt, trigger=TRIGGER_NONE):
+        self.pan, self.tilt = clamp_angles(pan, tilt)
+        if self.gimbal_output is None:
+            return False, "云台串口未连接"
+        self.gimbal_output.set(self.pan, self.tilt, trigger)
+        return True, "ok"
+
+    def emergency_stop(self):
+        # 高优先级通道，并丢弃尚未写出的运动命令
+        self.send_motion("TS", urgent=True, flush=True)
+        return self.send_motion("WS", urgent=True)
+
+    def close(self):
+        for link in (self.motion_link, self.gimbal_link):
+            if link:
+                link.stop()
+        if self.gimbal_telemetry:
+            # 读取线程在关闭串口后自行退出
+            self.gimbal_telemetry.stop(0)
+        if self.motion is not None:
+            # 写线程已停止，直接写出停车命令再关闭
+            try:
+                self.motion.write(b"TS\nWS\n")
+            except Exception as e:
+                print(f"停车命令发送失败: {e}")
+        for ser in (self.motion, self.gimbal):
+            if ser is not None:
+                ser.close()
+
+
+class WebStation:
+    """asyncio HTTP/WebSocket 服务"""
+    def __init__(self, link, encoder, token=None):
+        self.link = link
+        self.encoder = encoder
+        self.token = token
+
+    async def handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        try:
+            if method != "GET":
+                await self._respond(writer, 405, "text/plain", b"method not allowed")
+            elif self.token and query.get("token", [None])[0] != self.token:
+                await self._respond(writer, 403, "text/plain", b"forbidden")
+            elif url.path == "/":
+                await self._respond(writer, 200, "text/html; charset=utf-8", INDEX_HTML.encode("utf-8"))
+            elif url.path == "/video.mjpg":
+                await self._mjpeg(writer)
+            elif url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                if self._same_origin(headers):
+                    await self._websocket(reader, writer, headers)
+                else:
+                    await self._respond(writer, 403, "text/plain", b"cross-origin websocket rejected")
+            else:
+                await self._respond(writer, 404, "text/plain", b"not found")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _same_origin(headers):
+        """浏览器发起的 WebSocket 都带 Origin，只接受与 Host 相同的来源（缺少 Origin 也拒绝）"""
+        origin = urlsplit(headers.get("origin", ""))
+        host = headers.get("host", "").lower()
+        return bool(host) and origin.scheme in ("http", "https") and origin.netloc.lower() == host
+
+    @staticmethod
+    async def _respond(writer, status, content_type, body):
+        reason = {200: "OK", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    async def _mjpeg(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nCache-Control: no-cache\r\nConnection: close\r\n"
+                     b"Content-Type: multipart/x-mixed-replace; boundary=frame\r\n\r\n")
+        self.encoder.clients += 1
+        try:
+            last_seq = 0
+            while True:
+                if self.encoder.seq == last_seq:
+                    await asyncio.sleep(self.encoder.interval / 2)
+                    continue
+                last_seq, jpeg = self.encoder.seq, self.encoder.jpeg
+                writer.write(b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                             + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                # 网络慢时 drain 阻塞，期间的帧直接跳过，只发最新帧
+                await writer.drain()
+        finally:
+            self.encoder.clients -= 1
+
+    async def _websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "").encode("latin-1")
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID).digest()).decode("latin-1")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        moved = False
+        try:
+            while True:
+                opcode, payload = await self._ws_read(reader)
+                if opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    self._ws_send(writer, payload, 0xA)
+                    await writer.drain()
+                    continue
+                if opcode != 0x1:
+                    continue
+                reply, is_motion = self.dispatch(payload)
+                moved = moved or is_motion
+                self._ws_send(writer, json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+                await writer.drain()
+        finally:
+            if moved:
+                # 操作端断开时停车，避免保持最后一条运动命令
+                self.link.emergency_stop()
+
+    @staticmethod
+    async def _ws_read(reader):
+        b0, b1 = await reader.readexactly(2)
+        opcode = b0 & 0x0F
+        length = b1 & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if length > MAX_WS_MESSAGE:
+            raise ConnectionError("WebSocket 消息过长")
+        mask = await reader.readexactly(4) if b1 & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    @staticmethod
+    def _ws_send(writer, payload, opcode=0x1):
+        if len(payload) < 126:
+            header = struct.pack("!BB", 0x80 | opcode, len(payload))
+        else:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, len(payload))
+        writer.write(header + payload)
+
+    def dispatch(self, payload):
+        """处理一条控制消息，返回 (回复, 是否运动命令)"""
+        try:
+            msg = json.loads(payload)
+        except ValueError:
+            return {"ok": False, "msg": "无效的 JSON"}, False
+        if not isinstance(msg, dict):
+            return {"ok": False, "msg": "无效的消息"}, False
+        try:
+            return self._dispatch(msg)
+        except (TypeError, ValueError):
+            return {"ok": False, "msg": "参数错误"}, False
+
+    def _dispatch(self, msg):
+        link = self.link
+        is_motion = False
+        if "cmd" in msg:
+            command = str(msg["cmd"]).strip().upper()
+            if not MOTION_COMMAND.match(command):
+                ok, text = False, f"未知命令: {command}"
+            else:
+                ok, text = link.send_motion(command)
+                is_motion = True
+        elif "stop" in msg:
+            ok, text = link.emergency_stop()
+            text = "紧急停止" if ok else text
+        elif "gimbal" in msg:
+            pan, tilt = msg["gimbal"]
+            ok, text = link.send_gimbal(float(pan), float(tilt))
+        elif "nudge" in msg:
+            dpan, dtilt = msg["nudge"]
+            ok, text = link.send_gimbal(link.pan + float(dpan), link.tilt + float(dtilt))
+        elif "center" in msg:
+            ok, text = link.send_gimbal(PAN_CENTER, TILT_CENTER)
+        elif "laser" in msg:
+            ok, text = link.send_gimbal(link.pan, link.tilt, TRIGGER_LASER)
+            text = "激光发射" if ok else text
+        else:
+            ok, text = False, "未知消息"
+        return {"ok": ok, "msg": text, "pan": round(link.pan), "tilt": round(link.tilt)}, is_motion
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="zh">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>综合控制中心</title>
+<style>
+body { font-family: "Microsoft YaHei", "PingFang SC", sans-serif; background: #f7f9fa; color: #23272b; margin: 0; }
+main { display: flex; flex-wrap: wrap; gap: 16px; padding: 16px; }
+section { background: #fff; border-radius: 8px; padding: 12px; box-shadow: 0 1px 3px #0002; }
+h3 { margin: 0 0 8px; }
+img { width: 640px; max-width: 100%; background: #000; }
+button { font-size: 16px; margin: 3px; padding: 10px 14px; border: 0; border-radius: 6px; background: #3498db; color: #fff; }
+button.stop { background: #e74c3c; }
+#status { font-weight: bold; color: #27ae60; }
+.grid { display: grid; grid-template-columns: repeat(3, 64px); gap: 4px; }
+</style>
+</head>
+<body>
+<main>
+<section><h3>📹 实时图传</h3><img id="video" alt="video"><div id="status">未连接</div></section>
+<section>
+<h3>🚤 推进器</h3>
+<div class="grid">
+<span></span><button data-hold="WF,1500,1500" data-release="WS">前进</button><span></span>
+<button data-hold="WL" data-release="WS">左转</button><button data-cmd="WS">停止</button><button data-hold="WR" data-release="WS">右转</button>
+</div>
+<h3>🚜 履带</h3>
+<div class="grid">
+<span></span><button data-hold="TF" data-release="TS">前进</button><span></span>
+<button data-hold="TL" data-release="TS">左转</button><button data-cmd="TS">停止</button><button data-hold="TR" data-release="TS">右转</button>
+<span></span><button data-hold="TB" data-release="TS">后退</button><span></span>
+</div>
+<button class="stop" id="estop">🛑 紧急停止</button>
+</section>
+<section>
+<h3>🎯 云台</h3>
+<div class="grid">
+<span></span><button data-nudge="0,-5">上</button><span></span>
+<button data-nudge="5,0">左</button><button id="center">归中</button><button data-nudge="-5,0">右</button>
+<span></span><button data-nudge="0,5">下</button><span></span>
+</div>
+<button class="stop" id="laser">🔴 发射激光</button>
+<p>键盘：W/A/D 推进器，方向键 履带，空格 紧急停止</p>
+</section>
+</main>
+<script>
+const q = location.search;
+document.getElementById("video").src = "/video.mjpg" + q;
+const status = document.getElementById("status");
+let ws;
+function connect() {
+  ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws" + q);
+  ws.onopen = () => status.textContent = "已连接";
+  ws.onclose = () => { status.textContent = "连接断开，重连中..."; setTimeout(connect, 1000); };
+  ws.onmessage = e => { const r = JSON.parse(e.data); status.textContent = `${r.msg}  角度: ${r.pan}°, ${r.tilt}°`; };
+}
+function send(obj) { if (ws && ws.readyState === 1) ws.send(JSON.stringify(obj)); }
+document.querySelectorAll("[data-cmd]").forEach(b => b.onclick = () => send({cmd: b.dataset.cmd}));
+document.querySelectorAll("[data-hold]").forEach(b => {
+  // 只有按下过的按钮才发松开命令；捕获指针后拖出按钮也只在松手时发一次
+  let pressed = false;
+  const release = () => { if (pressed) { pressed = false; send({cmd: b.dataset.release}); } };
+  b.onpointerdown = e => { pressed = true; b.setPointerCapture(e.pointerId); send({cmd: b.dataset.hold}); };
+  b.onpointerup = b.onpointercancel = b.onlostpointercapture = release;
+});
+document.querySelectorAll("[data-nudge]").forEach(b => b.onclick = () => send({nudge: b.dataset.nudge.split(",").map(Number)}));
+document.getElementById("center").onclick = () => send({center: true});
+document.getElementById("laser").onclick = () => send({laser: true});
+document.getElementById("estop").onclick = () => send({stop: true});
+const keys = {w: ["WF,1500,1500", "WS"], a: ["WL", "WS"], d: ["WR", "WS"],
+              arrowup: ["TF", "TS"], arrowdown: ["TB", "TS"], arrowleft: ["TL", "TS"], arrowright: ["TR", "TS"]};
+const down = new Set();
+onkeydown = e => {
+  const k = e.key.toLowerCase();
+  if (k === " ") { send({stop: true}); e.preventDefault(); return; }
+  if (keys[k] && !down.has(k)) { down.add(k); send({cmd: keys[k][0]}); e.preventDefault(); }
+};
+onkeyup = e => { const k = e.key.toLowerCase(); if (keys[k]) { down.delete(k); send({cmd: keys[k][1]}); } };
+connect();
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="局域网网页控制台")
+    parser.add_argument("--motion-port", help="运动控制串口，如 /dev/ttyUSB0")
+    parser.add_argument("--gimbal-port", help="云台串口，如 /dev/ttyACM0")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--host", help="监听地址，默认设置 --token 时为 0.0.0.0，否则为 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fps", type=float, default=15, help="视频流帧率")
+    parser.add_argument("--quality", type=int, default=70, help="JPEG 质量")
+    parser.add_argument("--token", help="访问口令，设置后需以 ?token=... 打开页面")
+    args = parser.parse_args()
+    if args.host is None:
+        args.host = "0.0.0.0" if args.token else "127.0.0.1"
+    elif not args.token and args.host not in ("127.0.0.1", "localhost", "::1"):
+        parser.error("对局域网开放（--host 非本机地址）时必须设置 --token")
+
+    cap = cv2.VideoCapture(args.camera, cv2.CAP_V4L2)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    capture = LatestFrameCapture(cap)
+    capture.start()
+    encoder = JpegEncoder(capture, args.fps, args.quality)
+    encoder.start()
+    link = SerialLink(args.motion_port, args.gimbal_port, args.baud)
+    station = WebStation(link, encoder, args.token)
+
+    async def serve():
+        server = await asyncio.start_server(station.handle, args.host, args.port)
+        print(f"网页控制台: http://{args.host}:{args.port}/")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        encoder.stop()
+        capture.stop()
+        cap.release()
+        # 停止写线程并直接发送 TS + WS
+        link.close()
+
+
+if __name__ == "__main__":
+    main()